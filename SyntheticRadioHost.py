@@ -31,6 +31,9 @@ Environment Variables:
 - ELEVENLABS_API_KEY: Your ElevenLabs API key
 - ELEVENLABS_voice_id_A: First voice ID for speaker A
 - ELEVENLABS_voice_id_B: Second voice ID for speaker B
+- ELEVENLABS_voice_id_C, ...: Further speakers (with --speakers "Priya,Kirti,Arjun")
+  Comma separated values give several API keys / a pool of equivalent voices,
+  e.g. ELEVENLABS_API_KEY="key1,key2" ELEVENLABS_voice_id_A="voice1,voice2"
 
 Usage:
     Streamlit Mode (stlit = True):
@@ -41,13 +44,44 @@ Usage:
         
     Example:
         python SyntheticRadioHost.py --text "Artificial Intelligence"
+        
+    Show length (default: first 5 sentences of the summary):
+        python SyntheticRadioHost.py --text "India" --sentences 10
+        python SyntheticRadioHost.py --text "India" --max-chars 2000
+        python SyntheticRadioHost.py --text "India" --full-article --duration 900
+        
+    Live radio (listen at http://localhost:8000/stream.wav while it is generated):
+        python SyntheticRadioHost.py --text "India" --live 8000
+        python SyntheticRadioHost.py --live 8000 --playlist topics.txt --loop
+        
+    Editable episodes (edit shows/india/script.txt, then re-render only the changed turns):
+        python SyntheticRadioHost.py --text "India" --project shows/india
+        python SyntheticRadioHost.py --rerender shows/india
+        
+    Profiling (cProfile, per-stage time/memory, flamegraph stacks in prof/):
+        python SyntheticRadioHost.py --text "India" --profile prof
+        
+    Several languages / styles of one topic from a single fetch:
+        python SyntheticRadioHost.py --text "India" --variants hinglish,english,hindi,kids
+        
+    Time budget (Ctrl-C or the deadline cancels the rest and keeps the partial show):
+        python SyntheticRadioHost.py --text "India" --deadline 300 --llm-timeout 60
+        
+    Offline topic resolution (titles dump from dumps.wikimedia.org, built once):
+        python SyntheticRadioHost.py --build-title-index enwiki-latest-all-titles-in-ns0.gz --title-index titles.idx
+        python SyntheticRadioHost.py --title-index titles.idx --lookup "Albert Einstien"
+        python SyntheticRadioHost.py --title-index titles.idx --text "india"
+        
+    Record a run's network calls and replay them offline (e.g. while profiling):
+        python SyntheticRadioHost.py --text "India" --record india.tape
+        python SyntheticRadioHost.py --text "India" --replay india.tape --replay-speed 0 --profile prof
 
 Output:
     GeneratedAudio.wav - Final audio file saved in the script directory
 """
 
-from nltk.tokenize import sent_tokenize
 from langchain_ollama import OllamaLLM
+from langchain_core.callbacks import BaseCallbackHandler
 import wikipedia as wiki
 from datetime import datetime
 from elevenlabs import ElevenLabs
@@ -56,11 +90,76 @@ import soundfile as sf
 import io,os,sys
 import argparse
 import requests
+import re
+import time
+import json
+import pickle
+import threading
+import hashlib
+import shutil
+import subprocess
+import asyncio
+import contextlib
+import contextvars
+import atexit
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import queue
+import struct
+import signal
+import difflib
 
 #*************** Update Value of stlit to True for running in streamlit and False for running using CLI
 stlit = False
 
 LLM_Model = "llama3:8b"
+LLM_OpenAI_URL = os.getenv("LLM_OPENAI_URL", "http://localhost:8080/v1")   # llama.cpp server / vLLM
+LLM_OpenAI_Extra_Body = json.loads(os.getenv("LLM_OPENAI_EXTRA_BODY") or "{}")  # server specific fields, e.g. {"top_k": 40, "repeat_penalty": 1.18} for llama.cpp
+LLM_Concurrency = 1             # sentences in flight at once in hinglish_converter()
+Prompt_Version = "v1"           # system prompt variant, see Prompt_Versions ("v1" = original, "compact", "minimal")
+Ollama_URL = "http://localhost:11434"
+Ollama_Keep_Alive = "30m"       # how long Ollama keeps the model loaded after a request
+Ollama_Rewarm_Seconds = 600     # re-warm interval of OllamaReadiness in long running servers
+Metrics_Port = int(os.getenv("METRICS_PORT") or 0)       # /metrics of the Streamlit app, 0 = off (CLI: --metrics-port)
+Metrics_Host = os.getenv("METRICS_HOST", "127.0.0.1")    # its bind address; 0.0.0.0 exposes it to the network
+
+#*************** Show length defaults (can be overridden from CLI / Streamlit)
+Show_Max_Sentences = 5          # sentences of the article sent to the LLM
+Show_Chunk_Chars = 600          # paragraph sized chunk handed to the LLM in full-article mode
+Seconds_Per_Dialogue = 22       # approx. spoken length of one 50-60 word LLM reply
+Sentence_Splitter = "auto"      # "punkt" (NLTK only), "fast" (rule based, no NLTK) or "auto" (punkt, fast if punkt data is missing)
+Punkt_Pickle_Path = os.getenv("PUNKT_PICKLE_PATH")   # optional pre-trained pickled PunktSentenceTokenizer
+Title_Index_Path = os.getenv("WIKI_TITLE_INDEX")     # optional TitleIndex file; topics are resolved offline first
+Fuzzy_Max_Candidates = 200      # titles with most shared trigrams re-ranked with difflib by TitleIndex.fuzzy()
+TTS_Model_ID = 'eleven_v3'
+TTS_Output_Format = "pcm_24000"  # raw PCM is decoded while it streams; works on every plan, pcm_44100 (Pro plan) via --tts-format
+Common_Fillers = ("sahi baat hai", "matlab", "dekhiye", "waise")
+Show_Intro_Text = "Namaskar! Aap sun rahe hain Synthetic Radio."
+Show_Outro_Text = "Sunne ke liye shukriya, phir milenge!"
+Espeak_Voices = ("en+f3", "en+f4")   # voices used by the local espeak backend
+Speaker_Names = ("Priya", "Kirti")   # name tag per speaker role; role A, B, C... speaks with ELEVENLABS_voice_id_A, _B, _C...
+ElevenLabs_Key_Concurrency = 0  # requests in flight per ElevenLabs API key (0 = no limit)
+Splice_Gap_Seconds = 0.06       # silence between a spliced tag/filler and the line
+Pack_Short_Chars = 160          # turns shorter than this may share a TTS request (--pack-lines)
+Pack_Max_Chars = 900            # text limit of one packed TTS request
+
+#*************** Continuous station (ProgrammingScheduler)
+Schedule_Low_Watermark = 45     # seconds of audio runway kept ahead of playback
+Schedule_High_Watermark = 180   # buffered seconds above which TTS pauses
+#*************** LLM output validation (ScriptValidator)
+Script_Max_Words = 70           # word budget of one reply (prompt asks for 50-60, some slack)
+Script_Max_Repairs = 1          # targeted regenerations per failing sentence
+Allowed_Audio_Cues = ("happy", "smile", "sad", "thinking", "sigh", "pause", "laugh", "serious",
+                      "relief", "excited", "surprised", "hmm", "clears throat")
+#*************** Timeouts and deadlines (RunDeadline)
+Wiki_Timeout_Seconds = 20       # one Wikipedia page fetch
+LLM_Timeout_Seconds = 120       # one LLM request
+TTS_Timeout_Seconds = 60        # one TTS request (ElevenLabs: per network read)
+Run_Deadline_Seconds = 0        # overall budget of one run, 0 = no deadline
+Cancel_Check_Seconds = 0.05     # how often a blocked call looks for a cancelled run
+Skip_Wiki_Sections = ("See also", "References", "External links", "Further reading",
+                      "Notes", "Bibliography", "Sources", "Citations")
 import streamlit as st
 
 def Ollama_Status():
@@ -84,7 +183,164 @@ def Ollama_Status():
         print("Ollama connection fail" + str(e))
         return False
 
-def Conversation_Prompt():
+class OllamaReadiness:
+    """
+    Make sure the Ollama model is loaded and warm before the first real request.
+    
+    Ollama_Status() only tells that the server answers. ensure_ready() also
+    checks that the model is installed, pre-loads it with keep_alive (unless
+    it is already in memory) and times a tiny warm-up generation, so the
+    first hinglish_converter() call
+    does not pay the model load. start_rewarm() repeats the warm-up in the
+    background for long running servers (live station), and status() is
+    served next to the station status.
+    
+    Args:
+        model (str): Ollama model name (default LLM_Model).
+        base_url (str): Ollama server URL (default Ollama_URL).
+        keep_alive (str): keep_alive sent with every request (default Ollama_Keep_Alive).
+        timeout (float): Timeout of load and warm-up requests in seconds.
+    """
+    
+    def __init__(self, model=None, base_url=None, keep_alive=None, timeout=300):
+        self.model = model or LLM_Model
+        self.base_url = (base_url or Ollama_URL).rstrip("/")
+        self.keep_alive = keep_alive or Ollama_Keep_Alive
+        self.timeout = timeout
+        self.state = {"server": False, "model_present": False, "loaded": False, "ready": False,
+                      "load_seconds": None, "warmup_seconds": None,
+                      "tokens_per_sec": None, "last_warm": None, "error": None}
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def _update(self, **values):
+        with self._lock:
+            self.state.update(values)
+    
+    def _same_model(self, name):
+        wanted = self.model if ":" in self.model else self.model + ":latest"
+        return name == wanted or name == self.model
+    
+    def check_model(self):
+        """
+        Check that the server answers and the model is installed.
+        
+        Returns:
+            bool: True if the model is listed by /api/tags.
+        """
+        try:
+            r = requests.get(f"{self.base_url}/api/tags", timeout=2)
+            r.raise_for_status()
+            names = [m.get("name") or m.get("model") for m in r.json().get("models", [])]
+        except Exception as ex:
+            self._update(server=False, model_present=False, ready=False, error=str(ex))
+            return False
+        present = any(self._same_model(name) for name in names)
+        self._update(server=True, model_present=present,
+                     error=None if present else f"model {self.model} not installed (ollama pull {self.model})")
+        return present
+    
+    def is_loaded(self):
+        """True if the model is currently in memory (/api/ps)."""
+        try:
+            r = requests.get(f"{self.base_url}/api/ps", timeout=2)
+            r.raise_for_status()
+            loaded = any(self._same_model(m.get("name") or m.get("model"))
+                         for m in r.json().get("models", []))
+        except Exception:
+            loaded = False
+        self._update(loaded=loaded)
+        return loaded
+    
+    def preload(self):
+        """Load the model into memory without generating (empty prompt)."""
+        t0 = time.perf_counter()
+        r = requests.post(f"{self.base_url}/api/generate",
+                          json={"model": self.model, "prompt": "", "keep_alive": self.keep_alive},
+                          timeout=self.timeout)
+        r.raise_for_status()
+        seconds = time.perf_counter() - t0
+        self._update(load_seconds=round(seconds, 3))
+        return seconds
+    
+    def warm_up(self):
+        """
+        Run a tiny generation, refreshing keep_alive and measuring latency.
+        
+        Returns:
+            float: Wall time of the warm-up request in seconds.
+        """
+        t0 = time.perf_counter()
+        r = requests.post(f"{self.base_url}/api/generate",
+                          json={"model": self.model, "prompt": "Namaste", "stream": False,
+                                "keep_alive": self.keep_alive, "options": {"num_predict": 8}},
+                          timeout=self.timeout)
+        r.raise_for_status()
+        seconds = time.perf_counter() - t0
+        data = r.json()
+        tokens_per_sec = None
+        if data.get("eval_count") and data.get("eval_duration"):
+            tokens_per_sec = round(data["eval_count"] / (data["eval_duration"] / 1e9), 1)
+        self._update(warmup_seconds=round(seconds, 3), tokens_per_sec=tokens_per_sec,
+                     last_warm=datetime.now().strftime("%H:%M:%S"))
+        return seconds
+    
+    def ensure_ready(self, progress=None):
+        """
+        Check, pre-load and warm up the model.
+        
+        Args:
+            progress (callable): Optional progress(message, error) callback.
+        
+        Returns:
+            bool: True if the model is loaded and answered the warm-up.
+        """
+        if not self.check_model():
+            report_progress(progress, f"Ollama not ready: {self.state['error']}", error=True)
+            return False
+        try:
+            loaded = self.is_loaded()
+            load_seconds = 0.0 if loaded else self.preload()
+            warm_seconds = self.warm_up()
+        except Exception as ex:
+            self._update(ready=False, error=str(ex))
+            report_progress(progress, f"Ollama warm-up failed: {ex}", error=True)
+            return False
+        self._update(loaded=True, ready=True, error=None)
+        report_progress(progress, f"Ollama model {self.model} ready "
+                                  f"({'already loaded' if loaded else f'load {load_seconds:.2f}s'}, "
+                                  f"warm-up {warm_seconds:.2f}s)", streamlit=False)
+        return True
+    
+    def start_rewarm(self, interval=None):
+        """Re-warm the model every interval seconds in a daemon thread."""
+        interval = Ollama_Rewarm_Seconds if interval is None else interval
+        
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.warm_up()
+                    self._update(ready=True, error=None)
+                except Exception as ex:
+                    self._update(ready=False, error=str(ex))
+                    print(f"Ollama re-warm failed: {ex}")
+        
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop the re-warm thread."""
+        self._stop.set()
+    
+    def status(self):
+        """Readiness and latency of the model."""
+        with self._lock:
+            return {"ollama": dict(self.state, model=self.model)}
+
+
+def Conversation_Prompt(version=None):
     """
     Generate the system prompt for converting English text to Hinglish conversation.
     
@@ -92,9 +348,18 @@ def Conversation_Prompt():
     into natural Hinglish dialogue between two speakers. The prompt includes
     guidelines for language style, grammar, fillers, and audio cues.
     
+    Args:
+        version (str): Prompt variant from Prompt_Versions (default
+                     Prompt_Version). "v1" is the original prompt below.
+    
     Returns:
         str: A formatted prompt string containing instructions for Hinglish conversion.
     """
+    version = version or Prompt_Version
+    if version != "v1":
+        if version not in Prompt_Versions:
+            raise ValueError(f"Unknown prompt version: {version} (known: v1, {', '.join(Prompt_Versions)})")
+        return Prompt_Versions[version] + cast_prompt_note()
     prompt_Hinglish = """
 Role: Expert Hinglish Scriptwriter specialized in natural, structured debates.
 
@@ -130,10 +395,488 @@ Constraints:
 2. Output should contain only conversation 
 3. Strictly Avoid any Auto generated Note etc.
 """
-    return prompt_Hinglish
+    return prompt_Hinglish + cast_prompt_note()
+
+
+def cast_prompt_note():
+    """Extra prompt line for shows with more than two speakers (empty otherwise)."""
+    count = len(Speaker_Names)
+    if count <= 2:
+        return ""
+    tags = ", ".join(f"<speaker_{chr(ord('A') + i)}>" for i in range(count))
+    return (f"\nCast: {count} speakers instead of two. They take turns strictly in the "
+            f"order {tags}, then again from <speaker_A>.\n")
+
+
+# Compact variants of the v1 prompt: same rules, deduplicated and without the
+# whitespace, so every llm.invoke re-evaluates fewer prompt tokens.
+Prompt_Versions = {
+    "compact": (
+        "Role: Hinglish scriptwriter. Turn the English text into a natural Hinglish (Roman Hindi) "
+        "dialogue between two women, max 50-60 words.\n"
+        "Rules: no speaker names; every turn builds on the previous one, no repeated facts; "
+        "Hindi grammar with English keywords, no English sentences; respectful plural and correct "
+        "gender agreement; fillers like matlab, dekhiye, waise, sahi baat hai; ElevenLabs cues "
+        "[happy] [smile] [sad] [thinking] [sigh] [pause] [laugh] [serious] [relief] [excited] "
+        "[surprised] [hmm] [clears throat].\n"
+        "Output only the dialogue, no intro or notes:\n"
+        '<speaker_A>: "Aaj ki news dekhi?"\n'
+        '<speaker_B>: "Haan, matlab kamaal ho gaya!"'),
+    "minimal": (
+        "Rewrite the text as a Hinglish (Roman Hindi) dialogue of two women, max 60 words, "
+        "fillers (matlab, dekhiye) and cues like [happy] [pause] allowed. "
+        'Only lines like <speaker_A>: "..." and <speaker_B>: "...", nothing else.'),
+}
+
+
+# Style / language variants of a show for --variants; "hinglish" is the normal
+# Conversation_Prompt() show. All keep the <speaker_X> output format.
+Show_Variants = {
+    "english": (
+        "Role: radio scriptwriter. Turn the English text into a lively English radio dialogue "
+        "between two women, max 50-60 words. Every turn builds on the previous one, no repeated "
+        "facts, no speaker names. ElevenLabs cues like [happy] [thinking] [pause] [laugh] allowed.\n"
+        "Output only the dialogue, no intro or notes:\n"
+        '<speaker_A>: "Did you catch the news today?"\n'
+        '<speaker_B>: "I did, and honestly it surprised me!"'),
+    "hindi": (
+        "Role: radio scriptwriter. Turn the English text into a natural Hindi dialogue in "
+        "Devanagari script between two women, max 50-60 words. Respectful plural, correct gender "
+        "agreement, no speaker names, no repeated facts. ElevenLabs cues like [happy] [thinking] "
+        "[pause] allowed.\n"
+        "Output only the dialogue, no intro or notes:\n"
+        '<speaker_A>: "आज की खबर देखी आपने?"\n'
+        '<speaker_B>: "हाँ, सच में कमाल हो गया!"'),
+    "kids": (
+        "Role: children's radio scriptwriter. Turn the English text into a simple, cheerful "
+        "Hinglish (Roman Hindi) dialogue between two women for 8 year olds, max 50-60 words, "
+        "short sentences, easy words, no speaker names. Cues like [excited] [laugh] [pause] allowed.\n"
+        "Output only the dialogue, no intro or notes:\n"
+        '<speaker_A>: "Bachcho, pata hai aaj hum kya seekhenge?"\n'
+        '<speaker_B>: "[excited] Batao na, jaldi batao!"'),
+}
+
+
+def variant_prompt(name):
+    """
+    System prompt of a show variant.
+    
+    Args:
+        name (str): "hinglish" (the Conversation_Prompt() show) or a key of Show_Variants.
+    
+    Returns:
+        str: The prompt, with the cast note for more than two speakers.
+    """
+    if name == "hinglish":
+        return Conversation_Prompt()
+    if name not in Show_Variants:
+        raise ValueError(f"Unknown show variant: {name} (known: hinglish, {', '.join(Show_Variants)})")
+    return Show_Variants[name] + cast_prompt_note()
+
+
+class TokenBudget:
+    """
+    Per-call prompt/completion token accounting for an LLMBackend.
+    
+    attach() registers the budget on a backend; every invoke() is then
+    recorded with its token counts and latency (counts are estimated for
+    engines that do not report usage).
+    
+    Args:
+        max_prompt_tokens (int): Optional per-call prompt budget.
+        max_completion_tokens (int): Optional per-call completion budget.
+    """
+    
+    def __init__(self, max_prompt_tokens=None, max_completion_tokens=None):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_completion_tokens = max_completion_tokens
+        self.calls = []
+        self._lock = threading.Lock()
+    
+    def attach(self, backend):
+        """Record every call of backend; returns the backend."""
+        backend.usage_hooks.append(self.record)
+        return backend
+    
+    def record(self, usage):
+        """Add one call's usage dict (prompt_tokens, completion_tokens, seconds)."""
+        with self._lock:
+            self.calls.append(dict(usage))
+    
+    def summary(self):
+        """
+        Totals and per-call averages.
+        
+        Returns:
+            dict: calls, prompt/completion totals and means, mean seconds,
+                  prompt share of all tokens and calls over budget.
+        """
+        with self._lock:
+            calls = list(self.calls)
+        n = len(calls)
+        prompt = sum(c["prompt_tokens"] for c in calls)
+        completion = sum(c["completion_tokens"] for c in calls)
+        over = sum(1 for c in calls
+                   if (self.max_prompt_tokens and c["prompt_tokens"] > self.max_prompt_tokens)
+                   or (self.max_completion_tokens and c["completion_tokens"] > self.max_completion_tokens))
+        return {
+            "calls": n,
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "prompt_tokens_per_call": round(prompt / n, 1) if n else 0,
+            "completion_tokens_per_call": round(completion / n, 1) if n else 0,
+            "seconds_per_call": round(sum(c["seconds"] for c in calls) / n, 3) if n else 0,
+            "prompt_share": round(prompt / (prompt + completion), 3) if prompt + completion else 0,
+            "over_budget": over,
+        }
+
+
+def prompt_ab_test(backend, sentences, versions=("v1", "compact"), repeat=1, validator=None):
+    """
+    Offline A/B comparison of prompt versions on a fixed sentence set.
+    
+    Every sentence is converted with each prompt version (sequentially, so
+    latencies are comparable) and the replies are checked with a
+    ScriptValidator without repair.
+    
+    Args:
+        backend (LLMBackend): Engine to test (a local model or FakeLLMBackend).
+        sentences (list): Fixed input texts.
+        versions (iterable): Prompt versions to compare.
+        repeat (int): Passes over the sentence set.
+        validator (ScriptValidator): Compliance checker (default ScriptValidator()).
+    
+    Returns:
+        dict: version -> calls, seconds_per_call, prompt/completion tokens per
+              call, compliance (share of replies passing the checks) and
+              mean words per reply.
+    """
+    validator = validator or ScriptValidator()
+    results = {}
+    for version in versions:
+        prompt = Conversation_Prompt(version)
+        budget = TokenBudget()
+        budget.attach(backend)
+        compliant = 0
+        words = 0
+        total = 0
+        try:
+            for _ in range(repeat):
+                for sentence in sentences:
+                    reply = backend.invoke([{"role": "system", "content": prompt},
+                                            {"role": "user", "content": sentence}])
+                    lines, dropped, issues = validator.clean(reply)
+                    compliant += not issues and not dropped
+                    words += sum(len(strip_audio_cues(line).split()) for line in lines)
+                    total += 1
+        finally:
+            backend.usage_hooks.remove(budget.record)
+        summary = budget.summary()
+        results[version] = {
+            "calls": total,
+            "system_prompt_tokens": estimate_tokens(prompt),
+            "seconds_per_call": summary["seconds_per_call"],
+            "prompt_tokens_per_call": summary["prompt_tokens_per_call"],
+            "completion_tokens_per_call": summary["completion_tokens_per_call"],
+            "compliance": round(compliant / total, 3) if total else 0,
+            "words_per_reply": round(words / total, 1) if total else 0,
+        }
+    return results
+
+
+def _title_key(title):
+    """Lookup key of a title: underscores as spaces, single spaces, case folded."""
+    return " ".join(str(title).replace("_", " ").split()).casefold()
+
+
+def _trigrams(key):
+    """Character trigrams of a lookup key, padded so the first letters count too."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _open_dump(path):
+    import gzip
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+class TitleIndex:
+    """
+    Local index of Wikipedia titles for resolving topics before any network call.
+    
+    Built offline from dumps on disk (see build()) and saved as a pickle, it
+    answers in milliseconds:
+    
+        prefix("artificial in")   titles starting with the text (autocomplete)
+        fuzzy("Elbert Einstein")  close spellings (trigram index + difflib)
+        resolve("india")          canonical title, following redirects, or
+                                  why the topic cannot be used
+    
+    Attributes:
+        keys (list): Sorted lookup keys (see _title_key()).
+        titles (list): Canonical title of each key (the first one seen when
+                       several titles share a key).
+        variants (dict): Key -> every title with that key, for titles that
+                       differ only in case ("Us", "US").
+        redirects (dict): Key of a redirect -> canonical target title.
+        ambiguous (set): Keys of disambiguation pages.
+        grams (dict): Character trigram -> sorted uint32 array of key positions.
+    """
+    
+    version = 3
+    
+    def __init__(self, titles=(), redirects=None, ambiguous=()):
+        by_key = {}
+        for title in titles:
+            title = " ".join(str(title).replace("_", " ").split())
+            if title:
+                by_key.setdefault(_title_key(title), {})[title] = None
+        pairs = sorted((key, list(found)) for key, found in by_key.items())
+        self.keys = [key for key, _ in pairs]
+        self.titles = [found[0] for _, found in pairs]
+        self.variants = {key: found for key, found in pairs if len(found) > 1}
+        self.redirects = {_title_key(source): " ".join(str(target).replace("_", " ").split())
+                          for source, target in (redirects or {}).items()}
+        self.ambiguous = {_title_key(t) for t in ambiguous}
+        self.grams = self._index_grams(self.keys)
+    
+    @staticmethod
+    def _index_grams(keys):
+        from array import array
+        postings = {}
+        for number, key in enumerate(keys):
+            for gram in _trigrams(key):
+                postings.setdefault(gram, array("I")).append(number)
+        return {gram: np.asarray(numbers, dtype=np.uint32) for gram, numbers in postings.items()}
+    
+    @classmethod
+    def build(cls, titles_path, redirects_path=None, disambiguation_path=None):
+        """
+        Build the index from dump files (plain or .gz, UTF-8).
+        
+        Args:
+            titles_path (str): One title per line, e.g. enwiki-latest-all-titles-in-ns0.gz
+                               (a header line "page_title" is skipped).
+            redirects_path (str): Optional "source<TAB>target" lines, one per redirect.
+            disambiguation_path (str): Optional disambiguation page titles, one per line
+                               (e.g. the members of Category:All disambiguation pages).
+                               Only these are treated as ambiguous; an "X (disambiguation)"
+                               page does not make X ambiguous, since X is often the
+                               primary topic.
+        
+        Returns:
+            TitleIndex: The index.
+        """
+        with _open_dump(titles_path) as fh:
+            titles = [line.rstrip("\n") for line in fh if line.strip() and line.strip() != "page_title"]
+        redirects = {}
+        if redirects_path:
+            with _open_dump(redirects_path) as fh:
+                for line in fh:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) >= 2 and parts[0] and parts[1]:
+                        redirects[parts[0]] = parts[1]
+        ambiguous = []
+        if disambiguation_path:
+            with _open_dump(disambiguation_path) as fh:
+                ambiguous = [line.rstrip("\n") for line in fh if line.strip()]
+        return cls(titles, redirects, ambiguous)
+    
+    def save(self, path):
+        """Pickle the index to path."""
+        with open(path, "wb") as fh:
+            pickle.dump((self.version, self.keys, self.titles, self.variants, self.redirects,
+                         self.ambiguous, self.grams), fh, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save()."""
+        with open(path, "rb") as fh:
+            data = pickle.load(fh)
+        if data[0] != cls.version:
+            raise ValueError(f"Title index {path} has version {data[0]}, expected {cls.version}; "
+                             f"rebuild it with --build-title-index")
+        index = cls()
+        index.keys, index.titles, index.variants, index.redirects, index.ambiguous, index.grams = data[1:]
+        return index
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def _prefix_range(self, key):
+        import bisect
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_left(self.keys, key + "\U0010ffff", start)
+        return start, end
+    
+    def prefix(self, text, limit=10):
+        """
+        Titles starting with text, shortest first.
+        
+        Returns:
+            list: Up to limit canonical titles.
+        """
+        key = _title_key(text)
+        if not key:
+            return []
+        start, end = self._prefix_range(key)
+        candidates = self.titles[start:min(end, start + limit * 20)]
+        return sorted(candidates, key=len)[:limit]
+    
+    def fuzzy(self, text, limit=5, cutoff=0.8):
+        """
+        Titles spelled like text.
+        
+        Candidates come from the trigram index: the Fuzzy_Max_Candidates
+        titles sharing the most character trigrams with text are ranked by
+        difflib similarity. A typo only costs the trigrams around it, so
+        misspelled first letters are found too.
+        
+        Returns:
+            list: Up to limit canonical titles, best first.
+        """
+        key = _title_key(text)
+        if not key:
+            return []
+        postings = sorted((self.grams[gram] for gram in _trigrams(key) if gram in self.grams), key=len)
+        if not postings:
+            return []
+        # trigrams found in a tenth of all titles say little and dominate the cost
+        common = max(len(self.keys) // 10, Fuzzy_Max_Candidates)
+        postings = postings[:3] + [numbers for numbers in postings[3:] if len(numbers) <= common]
+        numbers, shared = np.unique(np.concatenate(postings), return_counts=True)
+        if len(numbers) > Fuzzy_Max_Candidates:
+            numbers = numbers[np.argpartition(-shared, Fuzzy_Max_Candidates)[:Fuzzy_Max_Candidates]]
+        candidates = {self.keys[number]: self.titles[number] for number in numbers.tolist()}
+        return [candidates[match] for match in
+                difflib.get_close_matches(key, list(candidates), n=limit, cutoff=cutoff)]
+    
+    def _exact_title(self, number, text):
+        """Title at position number, preferring the variant spelled like text."""
+        variants = self.variants.get(self.keys[number])
+        if not variants:
+            return self.titles[number]
+        wanted = " ".join(str(text).replace("_", " ").split())
+        # Wikipedia treats the first letter case-insensitively, the rest is exact
+        wanted = wanted[:1].upper() + wanted[1:]
+        return wanted if wanted in variants else self.titles[number]
+    
+    def resolve(self, topic):
+        """
+        Resolve a topic to the title wiki.page() should be asked for.
+        
+        Returns:
+            dict: title (canonical title or None), match ("exact", "redirect",
+                  "ambiguous" or "missing") and suggestions (other titles).
+        """
+        key = _title_key(topic)
+        if key in self.redirects:
+            title, match = self.redirects[key], "redirect"
+            key = _title_key(title)
+        else:
+            title, match = None, "exact"
+        if key in self.ambiguous:
+            start, end = self._prefix_range(key + " (")
+            options = [t for t in self.titles[start:end] if not t.endswith("(disambiguation)")]
+            return {"title": None, "match": "ambiguous", "suggestions": options[:10]}
+        start, end = self._prefix_range(key)
+        if start < end and self.keys[start] == key:
+            return {"title": self._exact_title(start, title or topic), "match": match, "suggestions": []}
+        if title is not None:
+            # redirect into a page missing from the titles dump: trust the redirect
+            return {"title": title, "match": match, "suggestions": []}
+        return {"title": None, "match": "missing",
+                "suggestions": self.fuzzy(topic) or self.prefix(topic, 5)}
+
+
+_title_index = None
+_title_index_lock = threading.Lock()
+
+
+@st.cache_resource(show_spinner=False)
+def _streamlit_title_index(path):
+    return TitleIndex.load(path)
+
+
+def get_title_index(path=None):
+    """
+    The TitleIndex at path (default Title_Index_Path), loaded once.
+    
+    Streamlit runs the script in a fresh module on every rerun (every
+    keystroke in the topic box), so there the index is kept by
+    st.cache_resource instead of the module global.
+    
+    Returns:
+        TitleIndex or None: None when no index is configured.
+    """
+    global _title_index
+    path = path or Title_Index_Path
+    if not path:
+        return None
+    if stlit:
+        return _streamlit_title_index(path)
+    with _title_index_lock:
+        if _title_index is None or _title_index[0] != path:
+            _title_index = (path, TitleIndex.load(path))
+        return _title_index[1]
+
+
+def report_progress(progress, message, error=False, console=None, streamlit=True):
+    """
+    Send a progress message to progress(message, error), or to the console
+    and Streamlit when no callback is given.
+    
+    Args:
+        progress (callable): Callback of a library caller (None: print).
+        message (str): The message.
+        error (bool): Report as an error (st.error instead of st.write).
+        console (str): Console text when it differs from message.
+        streamlit (bool): Also show the message in the Streamlit app.
+    """
+    if progress is not None:
+        progress(message, error)
+        return
+    if stlit and streamlit:
+        if error:
+            st.error(message)
+        else:
+            st.write(message)
+    print(message if console is None else console)
+
+
+def resolve_topic(topic, progress=None):
+    """
+    Canonical Wikipedia title of a topic, checked against the local title index.
+    
+    Without an index the topic is returned unchanged (wiki.page decides).
+    
+    Args:
+        topic (str): Topic as typed by the user.
+        progress (callable): Optional progress(message, error) callback.
+    
+    Returns:
+        str or None: The title to fetch, or None if the index shows the
+                     topic is ambiguous or does not exist (the reason and
+                     suggestions are reported).
+    """
+    index = get_title_index()
+    if index is None:
+        return topic
+    result = index.resolve(topic)
+    if result["title"] is not None:
+        if result["title"] != topic:
+            report_progress(progress, f"Topic '{topic}' resolved to '{result['title']}' ({result['match']})",
+                            streamlit=False)
+        return result["title"]
+    hint = f" Did you mean: {', '.join(result['suggestions'])}?" if result["suggestions"] else ""
+    message = f"Topic '{topic}' is {'ambiguous' if result['match'] == 'ambiguous' else 'not a Wikipedia title'}.{hint}"
+    report_progress(progress, message, error=True)
+    return None
 
 
-def fetch_article_from_wiki(topic):
+def fetch_article_from_wiki(topic, full_article=False, progress=None, resolved=False):
     """
     Fetch article summary from Wikipedia based on the given topic.
     
@@ -143,6 +886,13 @@ def fetch_article_from_wiki(topic):
     Args:
         topic (str): The Wikipedia article topic to search for. Will be stripped
                      of leading/trailing whitespace.
+        full_article (bool): When True the complete page text (all sections,
+                     with "== Heading ==" markers) is returned instead of
+                     the summary. Used by the long-form show mode.
+        progress (callable): Optional progress(message, error) callback; when
+                     given nothing is printed or written to Streamlit.
+        resolved (bool): topic already is a canonical title from
+                     resolve_topic()/TitleIndex.resolve(); skip the lookup.
     
     Returns:
         str or None: The first 500 characters of the article summary if successful,
@@ -150,32 +900,33 @@ def fetch_article_from_wiki(topic):
     """    
     topic = topic.lstrip()
     topic = topic.strip()
+    if len(topic) > 0 and not resolved:
+        topic = resolve_topic(topic, progress=progress)
+        if topic is None:
+            return None
     
-    if stlit:
-        st.write(f"Article on {topic} fetching from wikipedia : {datetime.now().strftime("%H:%M:%S")}")
-    print(f"Article on {topic} fetching from wikipedia : {datetime.now().strftime("%H:%M:%S")}")
+    report_progress(progress, f"Article on {topic} fetching from wikipedia : {datetime.now().strftime("%H:%M:%S")}")
     
     wiki.set_lang('en')
     
     if len(topic) > 0:
         try:
-            data = wiki.page(topic, auto_suggest=False)
+            def page_text():
+                page = wiki.page(topic, auto_suggest=False)
+                return page.content if full_article else page.summary
             
-            if stlit:
-                st.write((f"Article on {topic} Fetched from wikipedia : {datetime.now().strftime("%H:%M:%S")}"))
-            print(f"Article on {topic} Fetched from wikipedia : {datetime.now().strftime("%H:%M:%S")}")
+            text = tape_call("wiki.page", {"topic": topic, "full_article": full_article},
+                             lambda: call_with_timeout(page_text, call_timeout(Wiki_Timeout_Seconds)))
+            
+            report_progress(progress, f"Article on {topic} Fetched from wikipedia : {datetime.now().strftime("%H:%M:%S")}")
             
-            return data.summary
+            return text
         
         except Exception as ex:
-            if stlit:
-                st.error("Error in getting data from Wikipedia " +str(ex))
-            print("Error in getting data from Wikipedia " +str(ex))
+            report_progress(progress, "Error in getting data from Wikipedia " +str(ex), error=True)
             return None
     else:
-        print("Invalid/Empty article")
-        if stlit:
-            st.error("Invalid/Empty article")
+        report_progress(progress, "Invalid/Empty article", error=True)
         return None
     
 def sentence_splitter(HinglishData):
@@ -220,7 +971,240 @@ def sentence_splitter(HinglishData):
         return []
     
 
-def sentence_token(corpus):
+_punkt_tokenizers = {}
+_punkt_lock = threading.Lock()
+_punkt_fallback_warned = set()
+
+# Abbreviations that end with a period but do not end a sentence (lower case, no period)
+Fast_Splitter_Abbreviations = frozenset([
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "ft", "lt", "col", "gen", "capt",
+    "sgt", "rev", "hon", "gov", "pres", "inc", "ltd", "co", "corp", "bros", "dept", "univ",
+    "vs", "etc", "e.g", "i.e", "cf", "al", "approx", "ca", "c", "fl", "b", "d", "no", "nos",
+    "vol", "vols", "pp", "p", "fig", "figs", "ed", "eds", "jan", "feb", "mar", "apr", "jun",
+    "jul", "aug", "sep", "sept", "oct", "nov", "dec", "u.s", "u.k", "u.n", "a.d", "b.c",
+])
+_fast_boundary = re.compile(r'[.!?]+["\'\)\]]*\s+')
+
+
+def load_punkt_tokenizer(language='english', pickle_path=None):
+    """
+    Load the NLTK Punkt sentence tokenizer once and keep it in memory.
+    
+    sent_tokenize() in NLTK resolves the punkt model through nltk.data on
+    every call. For batch runs this loader is used instead: the tokenizer is
+    built on first use and the same instance is returned afterwards.
+    
+    Args:
+        language (str): Punkt model name (default 'english').
+        pickle_path (str): Optional path to a pre-trained, pickled
+                     PunktSentenceTokenizer (see save_punkt_tokenizer()).
+    
+    Returns:
+        PunktSentenceTokenizer: The cached tokenizer.
+    
+    Raises:
+        LookupError: If the punkt data is not installed.
+        ImportError: If NLTK is not installed.
+    """
+    key = (language, pickle_path)
+    tokenizer = _punkt_tokenizers.get(key)
+    if tokenizer is not None:
+        return tokenizer
+    
+    with _punkt_lock:
+        tokenizer = _punkt_tokenizers.get(key)
+        if tokenizer is None:
+            if pickle_path:
+                with open(pickle_path, "rb") as fh:
+                    tokenizer = pickle.load(fh)
+            else:
+                try:
+                    from nltk.tokenize import PunktTokenizer
+                    tokenizer = PunktTokenizer(language)
+                except ImportError:
+                    # NLTK < 3.8.2 ships the pickled models only
+                    import nltk.data
+                    tokenizer = nltk.data.load(f"tokenizers/punkt/{language}.pickle")
+            _punkt_tokenizers[key] = tokenizer
+    return tokenizer
+
+
+def save_punkt_tokenizer(path, language='english'):
+    """
+    Pickle the loaded Punkt tokenizer so batch hosts can use it via
+    PUNKT_PICKLE_PATH without the nltk_data lookup.
+    
+    Args:
+        path (str): Output file path.
+        language (str): Punkt model name (default 'english').
+    """
+    tokenizer = load_punkt_tokenizer(language)
+    with open(path, "wb") as fh:
+        pickle.dump(tokenizer, fh)
+
+
+def fast_sent_tokenize(text):
+    """
+    Rule based sentence splitter that does not import NLTK.
+    
+    Splits after '.', '!' or '?' (plus closing quotes/brackets) followed by
+    whitespace, when the next word starts with an upper case letter, digit
+    or opening quote. Known abbreviations and single letter initials
+    ("J. R. R. Tolkien") are not treated as sentence ends.
+    
+    Args:
+        text (str): English text.
+    
+    Returns:
+        list: Sentence strings.
+    """
+    sentences = []
+    start = 0
+    for match in _fast_boundary.finditer(text):
+        end = match.end()
+        if end >= len(text):
+            break
+        following = text[end]
+        if not (following.isupper() or following.isdigit() or following in "\"'(["):
+            continue
+        
+        if text[match.start()] == ".":
+            word_start = text.rfind(" ", start, match.start()) + 1
+            word = text[word_start:match.start()].lstrip("(\"'").lower()
+            if word in Fast_Splitter_Abbreviations or (len(word) == 1 and word.isalpha()):
+                continue
+        
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = end
+    
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def sent_tokenize(text, language='english'):
+    """
+    Split text into sentences using the splitter selected by Sentence_Splitter.
+    
+    Drop-in replacement for nltk.tokenize.sent_tokenize backed by the cached
+    tokenizer from load_punkt_tokenizer(). In "auto" mode a missing punkt
+    model (or NLTK install) falls back to fast_sent_tokenize() instead of
+    failing the run.
+    
+    Args:
+        text (str): English text.
+        language (str): Punkt model name (default 'english').
+    
+    Returns:
+        list: Sentence strings.
+    """
+    if Sentence_Splitter == "fast":
+        return fast_sent_tokenize(text)
+    
+    try:
+        tokenizer = load_punkt_tokenizer(language, Punkt_Pickle_Path)
+    except (LookupError, ImportError, OSError) as ex:
+        if Sentence_Splitter != "auto":
+            raise
+        if language not in _punkt_fallback_warned:
+            _punkt_fallback_warned.add(language)
+            print(f"Punkt tokenizer not available ({type(ex).__name__}), using fast sentence splitter")
+        return fast_sent_tokenize(text)
+    return tokenizer.tokenize(text)
+
+
+def _sentence_boundaries(sentences):
+    """Return the set of end offsets (ignoring whitespace) for a sentence list."""
+    boundaries = set()
+    offset = 0
+    for sentence in sentences:
+        offset += len("".join(sentence.split()))
+        boundaries.add(offset)
+    return boundaries
+
+
+def benchmark_sentence_splitters(texts, repeat=3, language='english'):
+    """
+    Compare throughput and agreement of the Punkt and fast sentence splitters.
+    
+    Punkt is treated as the reference. Agreement is reported both as the share
+    of texts split identically and as boundary precision/recall/F1.
+    
+    Args:
+        texts (list): Text samples, e.g. Wikipedia summaries.
+        repeat (int): Timing repetitions; the best run is reported.
+        language (str): Punkt model name.
+    
+    Returns:
+        dict: {"punkt": {...}, "fast": {...}, "agreement": {...}} where each
+              splitter entry has seconds, sentences and chars_per_sec.
+    """
+    texts = [t for t in texts if t and t.strip()]
+    total_chars = sum(len(t) for t in texts)
+    punkt = load_punkt_tokenizer(language, Punkt_Pickle_Path)
+    splitters = {"punkt": punkt.tokenize, "fast": fast_sent_tokenize}
+    
+    results = {}
+    outputs = {}
+    for name, split in splitters.items():
+        best = None
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            out = [split(t) for t in texts]
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        outputs[name] = out
+        results[name] = {
+            "seconds": best,
+            "sentences": sum(len(o) for o in out),
+            "chars_per_sec": total_chars / best if best else float("inf"),
+        }
+    
+    exact = 0
+    true_pos = 0
+    ref_total = 0
+    fast_total = 0
+    for ref, fast in zip(outputs["punkt"], outputs["fast"]):
+        exact += ref == fast
+        ref_b = _sentence_boundaries(ref)
+        fast_b = _sentence_boundaries(fast)
+        true_pos += len(ref_b & fast_b)
+        ref_total += len(ref_b)
+        fast_total += len(fast_b)
+    precision = true_pos / fast_total if fast_total else 1.0
+    recall = true_pos / ref_total if ref_total else 1.0
+    results["agreement"] = {
+        "texts": len(texts),
+        "exact_match": exact / len(texts) if texts else 1.0,
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+    }
+    return results
+
+
+def load_benchmark_texts(path):
+    """
+    Read benchmark samples from a file: one text per line, or JSON lines
+    with a "summary" or "text" field.
+    """
+    texts = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                row = json.loads(line)
+                line = row.get("summary") or row.get("text") or ""
+            texts.append(line)
+    return texts
+
+
+def sentence_token(corpus, progress=None):
     """
     Tokenize English text corpus into individual sentences.
     
@@ -230,6 +1214,7 @@ def sentence_token(corpus):
     
     Args:
         corpus (str): The English text to tokenize. Must be a non-empty string.
+        progress (callable): Optional progress(message, error) callback.
     
     Returns:
         list: A list of sentence strings extracted from the corpus.
@@ -241,372 +1226,5018 @@ def sentence_token(corpus):
     """
     try:
         if corpus is None or not isinstance(corpus, str) or len(corpus.strip()) == 0:
-            if stlit:
-                st.error("Invalid corpus: corpus must be a non-empty string")
-            print("Error: Invalid corpus input")
+            report_progress(progress, "Invalid corpus: corpus must be a non-empty string", error=True,
+                            console="Error: Invalid corpus input")
             return []
         
-        corpus_token = sent_tokenize(corpus, language='english')
-        print("Tokenization completed")
-        if stlit:
-            st.write("Tokenization completed")
+        with profile_stage("tokenize"):
+            corpus_token = sent_tokenize(corpus, language='english')
+        report_progress(progress, "Tokenization completed")
         return corpus_token
     except Exception as ex:
-        if stlit:
-            st.error(f"Error during tokenization: {str(ex)}")
-        print(f"Tokenization error: {ex}")
+        report_progress(progress, f"Error during tokenization: {str(ex)}", error=True,
+                        console=f"Tokenization error: {ex}")
         return []    
     
-def hinglish_converter(data):
+def stream_article_sections(article):
     """
-    Convert English sentences into Hinglish conversation using LLM.
+    Split a full Wikipedia page text into its sections, lazily.
     
-    Takes a list of English sentences and converts each into natural Hinglish
-    dialogue between two speakers using the Ollama LLM. The conversion follows
-    the guidelines specified in Conversation_Prompt() to create conversational
-    Hinglish text suitable for audio generation.
+    The wikipedia package returns page content with "== Heading ==" style
+    markers. This generator yields one section at a time so the caller can
+    stop reading (and tokenizing) as soon as the show budget is used up.
+    Reference style sections listed in Skip_Wiki_Sections are dropped.
     
     Args:
-        data (list): A list of English sentence strings to convert to Hinglish.
+        article (str): Full page text from fetch_article_from_wiki(..., full_article=True).
     
-    Returns:
-        list: A list of Hinglish conversation lines/sentences ready for audio
-              generation. Each element represents dialogue that can be spoken.
+    Yields:
+        tuple: (section_title, section_text). The lead section has title "Summary".
+    """
+    if not article:
+        return
     
-    Note:
-        - Uses the global LLM_Model variable (default: "llama3:8b")
-        - Automatically splits the output using sentence_splitter()
+    title = "Summary"
+    body = []
+    skipping = False
+    for line in article.splitlines():
+        stripped = line.strip()
+        if len(stripped) > 4 and stripped.startswith("==") and stripped.endswith("=="):
+            text = " ".join(body).strip()
+            if text and not skipping:
+                yield title, text
+            title = stripped.strip("=").strip()
+            skipping = title in Skip_Wiki_Sections
+            body = []
+        elif stripped:
+            body.append(stripped)
+    
+    text = " ".join(body).strip()
+    if text and not skipping:
+        yield title, text
+
+
+def chunk_sentences(sentences, chunk_chars=None):
     """
+    Group consecutive sentences into paragraph sized chunks for the LLM.
     
-    llm = OllamaLLM(model=LLM_Model,temperature=0.35,top_p=0.9,top_k=40,repeat_penalty=1.18)
-    HinglishData=[]
+    Each chunk becomes a single llm.invoke call, so the number of LLM calls
+    scales with the amount of text rather than with the sentence count.
+    A sentence longer than the budget is kept whole as its own chunk.
+    
+    Args:
+        sentences (list): Sentence strings in reading order.
+        chunk_chars (int): Max characters per chunk (default Show_Chunk_Chars).
+    
+    Returns:
+        list: Chunk strings, each one or more sentences joined by a space.
+    """
+    if chunk_chars is None:
+        chunk_chars = Show_Chunk_Chars
+    
+    chunks = []
+    current = []
+    current_len = 0
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and current_len + 1 + len(sentence) > chunk_chars:
+            chunks.append(" ".join(current))
+            current = []
+            current_len = 0
+        current.append(sentence)
+        current_len += len(sentence) + (1 if current_len else 0)
+    
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def select_show_sentences(sentences, max_sentences=None, max_chars=None,
+                          target_seconds=None, chunk_chars=None):
+    """
+    Apply the show length budget to a list of article sentences.
+    
+    Replaces the old fixed "first 5 sentences" copy loop. Budgets can be
+    combined; the tightest one wins.
+    
+    Args:
+        sentences (list): Sentences from sentence_token().
+        max_sentences (int): Max number of source sentences to use.
+        max_chars (int): Max number of source characters to use.
+        target_seconds (float): Approximate show duration. Converted into a
+                     number of LLM replies using Seconds_Per_Dialogue.
+        chunk_chars (int): When set, sentences are grouped with chunk_sentences()
+                     and the duration budget counts chunks instead of sentences.
+    
+    Returns:
+        list: Texts to send to hinglish_converter(), in order.
+    """
+    selected = []
+    used_chars = 0
+    for sentence in sentences:
+        if max_sentences is not None and len(selected) >= max_sentences:
+            break
+        if max_chars is not None and selected and used_chars + len(sentence) > max_chars:
+            break
+        selected.append(sentence)
+        used_chars += len(sentence)
+    
+    if chunk_chars:
+        selected = chunk_sentences(selected, chunk_chars)
+    
+    if target_seconds is not None:
+        max_units = max(1, int(round(float(target_seconds) / Seconds_Per_Dialogue)))
+        selected = selected[:max_units]
+    
+    return selected
+
+
+def build_show_corpus(topic, max_sentences=None, max_chars=None, target_seconds=None,
+                      full_article=False, chunk_chars=None, progress=None, resolved=False):
+    """
+    Fetch a topic and turn it into the list of texts for the LLM.
+    
+    Shared by the Streamlit handler and main(). In summary mode this is
+    fetch -> sentence_token -> select_show_sentences. In full-article mode
+    the page is read section by section, each section is tokenized and
+    chunked on its own (chunks never cross a section boundary), and reading
+    stops as soon as the budget is reached.
+    
+    Args:
+        topic (str): Wikipedia article topic.
+        max_sentences (int): Max number of source sentences (None = no limit).
+        max_chars (int): Max number of source characters (None = no limit).
+        target_seconds (float): Approximate show duration (None = no limit).
+        full_article (bool): Read the whole page instead of the summary.
+        chunk_chars (int): Chunk size for the LLM. Defaults to Show_Chunk_Chars
+                     in full-article mode and to no chunking otherwise.
+        progress (callable): Optional progress(message, error) callback that
+                     receives the fetch and tokenize messages instead of the
+                     console and Streamlit (used by RadioPipeline).
+        resolved (bool): topic is already a canonical title (see
+                     fetch_article_from_wiki()).
+    
+    Returns:
+        list: Texts for hinglish_converter(); empty list if nothing was fetched.
+    """
+    with profile_stage("fetch"):
+        corpus = fetch_article_from_wiki(topic, full_article=full_article, progress=progress,
+                                         resolved=resolved)
+    if not corpus:
+        return []
+    
+    if not full_article:
+        Corpus_token_full = sentence_token(corpus, progress=progress)
+        return select_show_sentences(Corpus_token_full, max_sentences, max_chars,
+                                     target_seconds, chunk_chars)
+    
+    if chunk_chars is None:
+        chunk_chars = Show_Chunk_Chars
+    max_units = None
+    if target_seconds is not None:
+        max_units = max(1, int(round(float(target_seconds) / Seconds_Per_Dialogue)))
+    
+    Corpus_chunks = []
+    used_sentences = 0
+    used_chars = 0
+    for title, text in stream_article_sections(corpus):
+        kept = []
+        budget_hit = False
+        for sentence in sentence_token(text, progress=progress):
+            if max_sentences is not None and used_sentences >= max_sentences:
+                budget_hit = True
+                break
+            if max_chars is not None and used_sentences and used_chars + len(sentence) > max_chars:
+                budget_hit = True
+                break
+            kept.append(sentence)
+            used_sentences += 1
+            used_chars += len(sentence)
+        
+        if kept:
+            Corpus_chunks.extend(chunk_sentences(kept, chunk_chars))
+            report_progress(progress, f"Section '{title}' added, {len(Corpus_chunks)} chunks so far",
+                            streamlit=False)
+        if max_units is not None and len(Corpus_chunks) >= max_units:
+            Corpus_chunks = Corpus_chunks[:max_units]
+            break
+        if budget_hit or (max_sentences is not None and used_sentences >= max_sentences):
+            break
+    
+    return Corpus_chunks
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms rendered in Prometheus text format.
+    
+    Metrics are declared once with describe() and updated with inc() and
+    observe(); labels are passed as keyword arguments. render() produces
+    the exposition text served on /metrics (LiveRadioServer, MetricsServer)
+    and written by start_file_dump() for the node_exporter textfile collector.
+    """
+    
+    def __init__(self):
+        self._meta = {}
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def describe(self, name, kind, help_text, buckets=None):
+        """Declare a metric; kind is "counter" or "histogram"."""
+        with self._lock:
+            self._meta[name] = (kind, help_text, tuple(buckets or ()))
+            self._values.setdefault(name, {})
+    
+    def inc(self, name, value=1, **labels):
+        """Add value to a counter."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+    
+    def observe(self, name, value, **labels):
+        """Record one observation in a histogram."""
+        key = tuple(sorted(labels.items()))
+        buckets = self._meta[name][2]
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [[0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+    
+    def value(self, name, **labels):
+        """Current counter value (histograms: observation count)."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            state = self._values.get(name, {}).get(key, 0)
+        return state[2] if isinstance(state, list) else state
+    
+    def reset(self):
+        """Forget all recorded values (declarations are kept)."""
+        with self._lock:
+            self._values = {name: {} for name in self._meta}
+    
+    @staticmethod
+    def _labels(key, extra=()):
+        pairs = list(key) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+    
+    def render(self):
+        """Prometheus text exposition of all metrics."""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in sorted(self._meta.items()):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, state in sorted(self._values.get(name, {}).items()):
+                    if kind == "histogram":
+                        counts, total, count = state
+                        for bound, n in zip(buckets, counts):
+                            lines.append(f"{name}_bucket{self._labels(key, [('le', bound)])} {n}")
+                        lines.append(f"{name}_bucket{self._labels(key, [('le', '+Inf')])} {count}")
+                        lines.append(f"{name}_sum{self._labels(key)} {total}")
+                        lines.append(f"{name}_count{self._labels(key)} {count}")
+                    else:
+                        lines.append(f"{name}{self._labels(key)} {state}")
+        return "\n".join(lines) + "\n"
+    
+    def write_file(self, path):
+        """Write render() atomically to path."""
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(self.render())
+        os.replace(tmp, path)
+    
+    def start_file_dump(self, path, interval=15.0):
+        """
+        Dump the metrics to path every interval seconds (daemon thread).
+        
+        Returns:
+            callable: stop() ends the dumping after writing a last dump.
+        """
+        stopped = threading.Event()
+        
+        def loop():
+            while not stopped.wait(interval):
+                self.write_file(path)
+            self.write_file(path)
+        
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        
+        def stop():
+            stopped.set()
+            thread.join()
+        return stop
+
+
+Metrics = MetricsRegistry()
+_latency_buckets = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+Metrics.describe("radio_llm_requests_total", "counter", "LLM requests by backend")
+Metrics.describe("radio_llm_failures_total", "counter", "Failed LLM requests by backend")
+Metrics.describe("radio_llm_tokens_total", "counter", "LLM tokens by backend and kind (prompt/completion)")
+Metrics.describe("radio_tts_requests_total", "counter", "TTS requests by backend")
+Metrics.describe("radio_tts_failures_total", "counter", "Failed or empty TTS requests by backend")
+Metrics.describe("radio_tts_characters_total", "counter", "Characters sent to TTS by backend")
+Metrics.describe("radio_retries_total", "counter", "Retried requests by stage")
+Metrics.describe("radio_cache_hits_total", "counter", "Work avoided by caches and dedup, by cache")
+Metrics.describe("radio_audio_seconds_total", "counter", "Seconds of audio synthesised")
+Metrics.describe("radio_stage_seconds", "histogram", "Wall time of pipeline stages", _latency_buckets)
+Metrics.describe("radio_request_seconds", "histogram", "Latency of single LLM/TTS requests", _latency_buckets)
+Metrics.describe("radio_audio_seconds", "histogram", "Seconds of audio per synthesised line",
+                 (1, 2, 5, 10, 20, 30, 60))
+
+
+class MetricsServer:
+    """
+    Standalone /metrics endpoint for batch and Streamlit deployments.
+    
+    Args:
+        port (int): TCP port (0 picks a free port).
+        host (str): Bind address. Loopback by default; pass "0.0.0.0"
+                    (--metrics-host) only when a Prometheus server on
+                    another machine has to scrape it.
+        registry (MetricsRegistry): Registry to serve (default Metrics).
+    """
+    
+    def __init__(self, port=9108, host="127.0.0.1", registry=None):
+        self.host = host
+        registry = registry or Metrics
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+            
+            def do_GET(self):
+                if not self.path.startswith("/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+    
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        print(f"Metrics on http://{self.host}:{self.port}/metrics")
+        return self
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@st.cache_resource(show_spinner=False)
+def _streamlit_metrics_server(port, host):
+    return MetricsServer(port, host=host).start()
+
+
+def start_streamlit_metrics():
+    """
+    Serve /metrics on Metrics_Port for the Streamlit app.
+    
+    Streamlit re-executes the script on every interaction, so the server is
+    kept by st.cache_resource and started once per process, not per rerun.
+    
+    Returns:
+        MetricsServer or None: The server, or None when disabled or the port
+                               cannot be bound.
+    """
+    if not Metrics_Port:
+        return None
+    try:
+        return _streamlit_metrics_server(Metrics_Port, Metrics_Host)
+    except OSError as ex:
+        print(f"Metrics server not started on port {Metrics_Port}: {ex}")
+        return None
+
+
+def instrumented_synthesize(backend):
+    """
+    Wrap backend.synthesize with TTS request, failure, character, latency
+    and audio-seconds metrics.
+    """
+    def synthesize(voice_id, text):
+        check_cancelled()
+        Metrics.inc("radio_tts_requests_total", backend=backend.name)
+        Metrics.inc("radio_tts_characters_total", len(text), backend=backend.name)
+        t0 = time.perf_counter()
+        try:
+            audio_np = backend.synthesize(voice_id, text)
+        except Exception:
+            Metrics.inc("radio_tts_failures_total", backend=backend.name)
+            raise
+        Metrics.observe("radio_request_seconds", time.perf_counter() - t0, kind="tts")
+        if audio_np is None:
+            Metrics.inc("radio_tts_failures_total", backend=backend.name)
+        else:
+            seconds = len(audio_np) / float(backend.sample_rate)
+            Metrics.inc("radio_audio_seconds_total", seconds)
+            Metrics.observe("radio_audio_seconds", seconds)
+        return audio_np
+    return synthesize
+
+
+# per run like _active_deadline: stages of other sessions stay out of the report
+_active_profiler = contextvars.ContextVar("active_profiler", default=None)
+
+# Since 3.12 cProfile is built on sys.monitoring and sees every thread; older
+# interpreters profile only the enabling thread, so RunProfiler starts one
+# profiler per new thread and merges them.
+_cprofile_all_threads = sys.version_info >= (3, 12)
+
+
+class StackSampler:
+    """
+    Minimal sampling profiler: records the stacks of all threads every interval.
+    
+    Stacks are kept in collapsed form ("thread;file:func;file:func count"),
+    the input format of flamegraph.pl, speedscope and inferno. Any object
+    with start(), stop() and collapsed() can be passed to RunProfiler as a
+    sampler instead (e.g. a wrapper around py-spy).
+    
+    Args:
+        interval (float): Seconds between samples.
+    """
+    
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.counts = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def _sample(self):
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            key = ";".join(reversed(stack))
+            self.counts[key] = self.counts.get(key, 0) + 1
+        self.samples += 1
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def collapsed(self):
+        """Collapsed stack lines, most frequent first."""
+        return [f"{stack} {count}" for stack, count in
+                sorted(self.counts.items(), key=lambda item: item[1], reverse=True)]
+
+
+class RunProfiler:
+    """
+    Profile a whole pipeline run (used by --profile DIR).
+    
+    While active, cProfile records per-function CPU time in every thread
+    (LLM and TTS work runs in pool threads), tracemalloc tracks allocations
+    and profile_stage() blocks record wall time, CPU time and the allocation
+    peak of each pipeline stage (fetch, tokenize, llm, tts, write). On exit
+    the results are written to output_dir:
+    
+        profile.pstats      cProfile data (snakeviz, pstats)
+        functions.txt       top functions by cumulative and own time
+        stages.json         per-stage seconds, cpu_seconds, peak_kb, calls
+        stacks.collapsed    sampled stacks for flamegraph tools (with a sampler)
+    
+    Args:
+        output_dir (str): Directory for the reports.
+        sampler (object): Optional sampler (start/stop/collapsed), e.g. StackSampler().
+        trace_memory (bool): Track allocations with tracemalloc.
+    """
+    
+    def __init__(self, output_dir, sampler=None, trace_memory=True):
+        import cProfile
+        self.output_dir = output_dir
+        self.sampler = sampler
+        self.trace_memory = trace_memory
+        self.profile = cProfile.Profile()
+        self.thread_profiles = []
+        self.stages = {}
+        self._stack = []
+        self._lock = threading.Lock()
+        self._token = None
+        self._owner = None
+    
+    def __enter__(self):
+        import tracemalloc
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.sampler is not None:
+            self.sampler.start()
+        self._token = _active_profiler.set(self)
+        self._owner = threading.current_thread()
+        self._t0 = time.perf_counter()
+        self.profile.enable()
+        if not _cprofile_all_threads:
+            threading.setprofile(self._profile_thread)
+        return self
+    
+    def _profile_thread(self, frame, event, arg):
+        # first profiling event of a new thread: hand the thread its own cProfile
+        import cProfile
+        profile = cProfile.Profile()
+        with self._lock:
+            self.thread_profiles.append(profile)
+        profile.enable()
+    
+    def __exit__(self, exc_type, exc, tb):
+        import tracemalloc
+        if not _cprofile_all_threads:
+            threading.setprofile(None)
+        self.profile.disable()
+        _active_profiler.reset(self._token)
+        total = time.perf_counter() - self._t0
+        if self.sampler is not None:
+            self.sampler.stop()
+        peak = tracemalloc.get_traced_memory()[1] if self.trace_memory else 0
+        if self.trace_memory:
+            tracemalloc.stop()
+        self.stages.setdefault("total", {"calls": 1, "seconds": round(total, 4),
+                                         "cpu_seconds": None, "peak_kb": round(peak / 1024, 1)})
+        paths = self.write_reports()
+        print(f"Profile written to {self.output_dir} ({', '.join(os.path.basename(p) for p in paths)})")
+        return False
+    
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Record wall time, CPU time and allocation peak of a block."""
+        import tracemalloc
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        # only stages on the profiled thread nest; stages from worker threads just time themselves
+        nested = threading.current_thread() is self._owner
+        if tracing and nested:
+            with self._lock:
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+                self._stack.append([name, 0])
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - t0
+            cpu = time.process_time() - c0
+            peak = 0
+            if tracing and nested:
+                with self._lock:
+                    entry = self._stack.pop()
+                    peak = max(entry[1], tracemalloc.get_traced_memory()[1])
+                    if self._stack:
+                        self._stack[-1][1] = max(self._stack[-1][1], peak)
+            with self._lock:
+                stats = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0,
+                                                      "cpu_seconds": 0.0, "peak_kb": 0.0})
+                stats["calls"] += 1
+                stats["seconds"] = round(stats["seconds"] + seconds, 4)
+                stats["cpu_seconds"] = round(stats["cpu_seconds"] + cpu, 4)
+                stats["peak_kb"] = max(stats["peak_kb"], round(peak / 1024, 1))
+    
+    def write_reports(self, top=40):
+        """Write the report files; returns their paths."""
+        import pstats
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        
+        merged = pstats.Stats(self.profile)
+        with self._lock:
+            for profile in self.thread_profiles:
+                merged.add(profile)
+        pstats_path = os.path.join(self.output_dir, "profile.pstats")
+        merged.dump_stats(pstats_path)
+        paths.append(pstats_path)
+        
+        path = os.path.join(self.output_dir, "functions.txt")
+        with open(path, "w", encoding="utf-8") as fh:
+            stats = pstats.Stats(pstats_path, stream=fh).strip_dirs()
+            fh.write("== by cumulative time ==\n")
+            stats.sort_stats("cumulative").print_stats(top)
+            fh.write("\n== by own time ==\n")
+            stats.sort_stats("tottime").print_stats(top)
+        paths.append(path)
+        
+        path = os.path.join(self.output_dir, "stages.json")
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.stages, fh, indent=2)
+        paths.append(path)
+        
+        if self.sampler is not None:
+            path = os.path.join(self.output_dir, "stacks.collapsed")
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write("\n".join(self.sampler.collapsed()) + "\n")
+            paths.append(path)
+        return paths
+
+
+def active_profiler():
+    """The RunProfiler of the current run, None outside one."""
+    return _active_profiler.get()
+
+
+@contextlib.contextmanager
+def _metered_stage(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        Metrics.observe("radio_stage_seconds", time.perf_counter() - t0, stage=name)
+
+
+def profile_stage(name):
+    """
+    Context manager for a pipeline stage: its wall time goes to the
+    radio_stage_seconds histogram, and to the RunProfiler when one is active.
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return _metered_stage(name)
+    stack = contextlib.ExitStack()
+    stack.enter_context(_metered_stage(name))
+    stack.enter_context(profiler.stage(name))
+    return stack
+
+
+# per run like _active_deadline: a recording session must not capture (or
+# answer) another session's calls
+_active_tape = contextvars.ContextVar("active_tape", default=None)
+
+
+class NetworkTape:
+    """
+    Record or replay the network calls of a run (used by --record / --replay).
+    
+    The calls whose answers change between runs -- wiki.page, the LLM
+    engine call and ElevenLabs text_to_speech.convert /
+    convert_with_timestamps -- go through tape_call() and tape_stream().
+    While recording, every request is kept with its response (or error) and
+    its timing, and close() writes them to a zip archive:
+    
+        index.json      one entry per call: kind, request, start, seconds,
+                        response or error, chunk offsets of streamed audio
+        blobs/N.bin     streamed TTS audio bytes
+    
+    While replaying, calls are answered from the archive in recorded order
+    per identical request, after sleeping for the recorded latency divided
+    by speed; speed 0 replays as fast as possible. The last answer to a
+    request is reused if it is asked for more often than it was recorded,
+    and a request that was never recorded raises LookupError. Recorded
+    errors are raised again as the same exception class (timeouts,
+    RunCancelled, the wikipedia exceptions, ...), so callers take the same
+    branch on replay; unknown classes fall back to RuntimeError.
+    
+    Args:
+        path (str): Archive file.
+        mode (str): "record" or "replay".
+        speed (float): Replay speed, 1.0 is the original timing.
+    """
+    
+    def __init__(self, path, mode="record", speed=1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown tape mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.entries = []
+        self._blobs = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self._token = None
+        if mode == "replay":
+            self._load()
+    
+    def __enter__(self):
+        self._token = _active_tape.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        _active_tape.reset(self._token)
+        self.close()
+        return False
+    
+    @staticmethod
+    def request_key(kind, request):
+        """Stable key of a request (exact, not normalised like dedup_key)."""
+        payload = json.dumps([kind, request], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    
+    def _load(self):
+        import zipfile
+        with zipfile.ZipFile(self.path) as zf:
+            self.entries = json.loads(zf.read("index.json"))["calls"]
+            for entry in self.entries:
+                if "blob" in entry:
+                    self._blobs[entry["blob"]] = zf.read(entry["blob"])
+                self._pending.setdefault(entry["key"], deque()).append(entry)
+    
+    def _add(self, kind, request, t0, blob=None, **fields):
+        entry = {"kind": kind, "key": self.request_key(kind, request), "request": request,
+                 "start": round(t0 - self._t0, 4),
+                 "seconds": round(time.perf_counter() - t0, 4), **fields}
+        with self._lock:
+            if blob is not None:
+                entry["blob"] = f"blobs/{len(self._blobs)}.bin"
+                self._blobs[entry["blob"]] = blob
+            self.entries.append(entry)
+    
+    def _next(self, kind, request):
+        with self._lock:
+            pending = self._pending.get(self.request_key(kind, request))
+            if not pending:
+                raise LookupError(f"No recorded {kind} call for {json.dumps(request, default=str)[:120]}")
+            return pending.popleft() if len(pending) > 1 else pending[0]
+    
+    def _wait(self, seconds):
+        if self.speed and seconds > 0:
+            time.sleep(seconds / self.speed)
+    
+    @staticmethod
+    def _error_fields(ex):
+        fields = {"error": f"{type(ex).__name__}: {ex}", "error_type": type(ex).__name__}
+        try:
+            fields["error_args"] = json.loads(json.dumps(list(ex.args)))
+        except (TypeError, ValueError):
+            pass
+        return fields
+    
+    @staticmethod
+    def _error(entry):
+        """Rebuild a recorded error as its original exception class."""
+        cls = Tape_Error_Types.get(entry.get("error_type"))
+        if cls is not None and "error_args" in entry:
+            try:
+                return cls(*entry["error_args"])
+            except Exception:
+                pass
+        return RuntimeError(entry["error"])
+    
+    def call(self, kind, request, fn):
+        """
+        Run fn() and record it, or answer it from the archive when replaying.
+        
+        Args:
+            kind (str): Touchpoint name, e.g. "llm.invoke".
+            request (dict): JSON-able description of the request; replay
+                            matches on it exactly.
+            fn (callable): Performs the call; must return JSON-able data.
+        
+        Returns:
+            object: The (recorded) response.
+        """
+        if self.mode == "replay":
+            entry = self._next(kind, request)
+            self._wait(entry["seconds"])
+            if "error" in entry:
+                raise self._error(entry)
+            return entry["response"]
+        t0 = time.perf_counter()
+        try:
+            response = fn()
+        except Exception as ex:
+            self._add(kind, request, t0, **self._error_fields(ex))
+            raise
+        self._add(kind, request, t0, response=response)
+        return response
+    
+    def stream(self, kind, request, fn):
+        """
+        Like call() for a response that arrives as byte chunks; replay
+        yields the same chunks at their recorded arrival offsets.
+        """
+        if self.mode == "replay":
+            entry = self._next(kind, request)
+            data = self._blobs.get(entry.get("blob"), b"")
+            pos, last = 0, 0.0
+            for offset, size in entry.get("chunks", []):
+                self._wait(offset - last)
+                last = offset
+                yield data[pos:pos + size]
+                pos += size
+            if "error" in entry:
+                self._wait(entry["seconds"] - last)
+                raise self._error(entry)
+            return
+        t0 = time.perf_counter()
+        chunks, parts = [], []
+        try:
+            for chunk in fn():
+                chunks.append([round(time.perf_counter() - t0, 4), len(chunk)])
+                parts.append(chunk)
+                yield chunk
+        except Exception as ex:
+            self._add(kind, request, t0, blob=b"".join(parts), chunks=chunks,
+                      **self._error_fields(ex))
+            raise
+        self._add(kind, request, t0, blob=b"".join(parts), chunks=chunks)
+    
+    def summary(self):
+        """Calls and recorded seconds per touchpoint."""
+        result = {}
+        for entry in self.entries:
+            stats = result.setdefault(entry["kind"], {"calls": 0, "errors": 0, "seconds": 0.0})
+            stats["calls"] += 1
+            stats["errors"] += "error" in entry
+            stats["seconds"] = round(stats["seconds"] + entry["seconds"], 4)
+        return result
+    
+    def close(self):
+        """Write the archive (record mode only)."""
+        import zipfile
+        if self.mode != "record":
+            return
+        tmp = self.path + ".tmp"
+        with self._lock:
+            entries = sorted(self.entries, key=lambda e: e["start"])
+            with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr("index.json", json.dumps({"version": 1, "calls": entries}))
+                for name, blob in self._blobs.items():
+                    zf.writestr(name, blob)
+        os.replace(tmp, self.path)
+        print(f"Recorded {len(entries)} network calls to {self.path}")
+
+
+def active_tape():
+    """The NetworkTape of the current run, None outside one."""
+    return _active_tape.get()
+
+
+def tape_call(kind, request, fn):
+    """Run a network call through the active NetworkTape, or directly when none is active."""
+    tape = _active_tape.get()
+    if tape is None:
+        return fn()
+    return tape.call(kind, request, fn)
+
+
+def tape_stream(kind, request, fn):
+    """Streaming variant of tape_call(); fn returns an iterable of byte chunks."""
+    tape = _active_tape.get()
+    if tape is None:
+        return fn()
+    return tape.stream(kind, request, fn)
+
+
+# per run, not per process: Streamlit sessions run side by side in one
+# interpreter, so the active deadline lives in a context variable and worker
+# threads get a copy of their caller's context (ContextThreadPoolExecutor,
+# context_thread)
+_active_deadline = contextvars.ContextVar("active_deadline", default=None)
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose tasks run in a copy of the submitting thread's context."""
+    
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def context_thread(target, **kwargs):
+    """threading.Thread running target in a copy of the caller's context."""
+    return threading.Thread(target=contextvars.copy_context().run, args=(target,), **kwargs)
+
+
+class RunCancelled(Exception):
+    """Raised by work started after its run was cancelled or ran past its deadline."""
+
+
+# exception classes a replayed NetworkTape raises again as themselves
+Tape_Error_Types = {cls.__name__: cls for cls in (
+    TimeoutError, ConnectionError, LookupError, KeyError, ValueError, RunCancelled,
+    wiki.exceptions.WikipediaException, wiki.exceptions.PageError,
+    wiki.exceptions.DisambiguationError, wiki.exceptions.RedirectError,
+    wiki.exceptions.HTTPTimeoutError)}
+
+
+class RunDeadline:
+    """
+    Overall deadline and cooperative cancellation of a run (--deadline, Ctrl-C).
+    
+    While active, the network touchpoints (Wikipedia, LLM, TTS) and the
+    worker loops check it through check_cancelled() and size their timeouts
+    with call_timeout(), so no call waits past the deadline. Once cancelled,
+    queued LLM/TTS work fails fast with RunCancelled instead of holding
+    worker slots, and work already finished is kept: generate_audio()
+    still writes the lines synthesised so far. Leaving the with-block by an
+    exception (e.g. a Streamlit rerun) cancels the run too.
+    
+    Args:
+        seconds (float): Time budget of the run; None or 0 for no deadline.
+    """
+    
+    def __init__(self, seconds=None):
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.reason = None
+        self.on_cancel = []
+        self._cancelled = threading.Event()
+        self._token = None
+    
+    def __enter__(self):
+        self._token = _active_deadline.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.cancel(exc_type.__name__)
+        _active_deadline.reset(self._token)
+        return False
+    
+    def cancel(self, reason="cancelled"):
+        """Cancel the run; on_cancel hooks run once."""
+        if self._cancelled.is_set():
+            return
+        self.reason = reason
+        self._cancelled.set()
+        print(f"Run cancelled: {reason}")
+        for hook in self.on_cancel:
+            hook()
+    
+    @property
+    def cancelled(self):
+        if not self._cancelled.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline passed")
+        return self._cancelled.is_set()
+    
+    def remaining(self):
+        """Seconds left before the deadline, None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def check(self):
+        """Raise RunCancelled once the run is cancelled."""
+        if self.cancelled:
+            raise RunCancelled(self.reason)
+    
+    def handle_sigint(self, signum, frame):
+        """SIGINT handler: the first Ctrl-C cancels gracefully, the second aborts."""
+        if self._cancelled.is_set():
+            raise KeyboardInterrupt
+        print("Cancelling, partial output is kept (Ctrl-C again to abort)")
+        self.cancel("interrupted")
+
+
+def active_deadline():
+    """The RunDeadline of the current run, None outside one."""
+    return _active_deadline.get()
+
+
+def run_cancelled():
+    """True when the active run (if any) is cancelled."""
+    deadline = _active_deadline.get()
+    return deadline is not None and deadline.cancelled
+
+
+def check_cancelled():
+    """Raise RunCancelled when the active run (if any) is cancelled."""
+    deadline = _active_deadline.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def call_timeout(seconds):
+    """
+    Timeout for one network call: seconds, cut to what is left of the run.
+    
+    Raises:
+        RunCancelled: The run is already cancelled.
+    """
+    check_cancelled()
+    deadline = _active_deadline.get()
+    remaining = None if deadline is None else deadline.remaining()
+    if remaining is None:
+        return seconds
+    return max(0.001, min(seconds, remaining)) if seconds else max(0.001, remaining)
+
+
+def call_with_timeout(fn, seconds):
+    """
+    Wait at most `seconds` for a blocking call that has no timeout of its own,
+    and only as long as the active run is not cancelled.
+    
+    The call runs in a daemon thread; after the timeout, or as soon as the
+    run is cancelled (Ctrl-C, Streamlit rerun, deadline), it is abandoned
+    (not killed) and TimeoutError or RunCancelled is raised, so the caller's
+    worker slot is free at once.
+    """
+    deadline = _active_deadline.get()
+    if not seconds and deadline is None:
+        return fn()
+    outcome = {}
+    done = threading.Event()
+    
+    def run():
+        try:
+            outcome["value"] = fn()
+        except BaseException as ex:
+            outcome["error"] = ex
+        finally:
+            done.set()
+    
+    context_thread(run, daemon=True).start()
+    limit = time.monotonic() + seconds if seconds else None
+    while not done.wait(Cancel_Check_Seconds if limit is None
+                        else max(0.0, min(Cancel_Check_Seconds, limit - time.monotonic()))):
+        if deadline is not None and deadline.cancelled:
+            raise RunCancelled(deadline.reason)
+        if limit is not None and time.monotonic() >= limit:
+            raise TimeoutError(f"call did not finish within {seconds:.1f}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def normalise_text(text, casefold=True):
+    """Collapse whitespace (and case-fold) so trivially different copies match."""
+    text = str(text).casefold() if casefold else str(text)
+    return " ".join(text.split())
+
+
+def dedup_key(*parts, casefold=True):
+    """
+    Build a dedup index key from normalised text parts.
+    
+    Args:
+        *parts: Strings identifying the work, e.g. ("tts", voice_id, line).
+        casefold (bool): Also ignore case. TTS keys pass False: case changes
+                         the audio ("Polish" vs "polish") and voice IDs are
+                         case-sensitive.
+    
+    Returns:
+        str: SHA-1 hex digest of the normalised parts.
+    """
+    joined = "\x1f".join(normalise_text(p, casefold) for p in parts)
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    In-run dedup index that coalesces identical LLM/TTS requests.
+    
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait on the same Future, and (with remember=True) later callers get
+    the stored result. Failed calls are not remembered so a later caller can
+    retry. Used by run_batch() across topics and threads.
+    
+    Args:
+        name (str): Label used in the run report.
+        remember (bool): Keep completed results for the rest of the run.
+    """
+    
+    def __init__(self, name="", remember=True):
+        self.name = name
+        self.remember = remember
+        self.calls = 0
+        self.saved = 0
+        self._futures = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key, fn):
+        """
+        Run fn() once per key and fan its result out to every requester.
+        
+        Args:
+            key (str): Dedup key, see dedup_key().
+            fn (callable): Zero argument function doing the real work.
+        
+        Returns:
+            The result of fn() (possibly computed for another requester).
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+                self.calls += 1
+            else:
+                self.saved += 1
+        
+        if not owner:
+            Metrics.inc("radio_cache_hits_total", cache=f"dedup_{self.name}" if self.name else "dedup")
+            return future.result()
+        
+        try:
+            result = fn()
+        except BaseException as ex:
+            with self._lock:
+                self._futures.pop(key, None)
+            future.set_exception(ex)
+            raise
+        if not self.remember:
+            with self._lock:
+                self._futures.pop(key, None)
+        future.set_result(result)
+        return result
+    
+    def stats(self):
+        """Return calls made and duplicates saved."""
+        with self._lock:
+            return {"calls": self.calls, "duplicates_saved": self.saved}
+
+
+def map_concurrent(fn, items, workers=1):
+    """
+    Apply fn to every item with up to `workers` calls in flight.
+    
+    Returns:
+        list: Results in input order; a call that raised is represented by
+              its exception instance instead of a result.
+    """
+    def call(item):
+        try:
+            check_cancelled()
+            return fn(item)
+        except Exception as ex:
+            return ex
+    
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+    with ContextThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(call, items))
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token) for engines that do not report usage."""
+    text = str(text or "")
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+class LLMBackend:
+    """
+    Interface of an LLM engine used by hinglish_converter().
+    
+    Subclasses implement _generate(messages) returning (text, prompt_tokens,
+    completion_tokens); token counts may be None and are then estimated.
+    invoke() adds timing and token accounting so every backend reports
+    tokens/sec the same way.
+    
+    Attributes:
+        name (str): Short backend name used on the CLI.
+        model (str): Model name sent to the engine.
+        stats (dict): calls, failures, prompt_tokens, completion_tokens, seconds.
+    """
+    
+    name = "base"
+    
+    def __init__(self, model=None):
+        self.model = model or LLM_Model
+        self.stats = {"calls": 0, "failures": 0, "prompt_tokens": 0,
+                      "completion_tokens": 0, "seconds": 0.0}
+        self.usage_hooks = []
+        self._lock = threading.Lock()
+    
+    def _generate(self, messages):
+        raise NotImplementedError
+    
+    def invoke(self, messages):
+        """
+        Run one chat completion.
+        
+        Args:
+            messages (list): [{"role": ..., "content": ...}, ...]
+        
+        Returns:
+            str: Completion text.
+        """
+        check_cancelled()
+        t0 = time.perf_counter()
+        try:
+            text, prompt_tokens, completion_tokens = tape_call(
+                "llm.invoke", {"backend": self.name, "model": self.model, "messages": messages},
+                lambda: list(self._generate(messages)))
+        except Exception:
+            with self._lock:
+                self.stats["failures"] += 1
+            Metrics.inc("radio_llm_failures_total", backend=self.name)
+            raise
+        elapsed = time.perf_counter() - t0
+        if prompt_tokens is None:
+            prompt_tokens = sum(estimate_tokens(m.get("content")) for m in messages)
+        if completion_tokens is None:
+            completion_tokens = estimate_tokens(text)
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += completion_tokens
+            self.stats["seconds"] += elapsed
+        Metrics.inc("radio_llm_requests_total", backend=self.name)
+        Metrics.inc("radio_llm_tokens_total", prompt_tokens, backend=self.name, kind="prompt")
+        Metrics.inc("radio_llm_tokens_total", completion_tokens, backend=self.name, kind="completion")
+        Metrics.observe("radio_request_seconds", elapsed, kind="llm")
+        for hook in self.usage_hooks:
+            hook({"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "seconds": elapsed})
+        return text
+    
+    def batch(self, messages_list, max_concurrency=8):
+        """
+        Submit many chat completions at once.
+        
+        Requests are sent concurrently so engines with continuous batching
+        (llama.cpp server, vLLM, Ollama with OLLAMA_NUM_PARALLEL) process
+        them together.
+        
+        Returns:
+            list: Completion texts in input order; failed requests are
+                  represented by their exception instance.
+        """
+        return map_concurrent(self.invoke, messages_list, max_concurrency)
+    
+    def tokens_per_second(self):
+        """Completion tokens per second of summed request time."""
+        with self._lock:
+            seconds = self.stats["seconds"]
+            return self.stats["completion_tokens"] / seconds if seconds else 0.0
+
+
+class OllamaUsageHandler(BaseCallbackHandler):
+    """
+    Callback that keeps Ollama's token counts of one request.
+    
+    Ollama reports prompt_eval_count and eval_count in the generation_info
+    of the final chunk; invoke() only returns the text, so the counts are
+    picked up in on_llm_end. One handler is created per call.
+    """
+    
+    def __init__(self):
+        self.prompt_tokens = None
+        self.completion_tokens = None
+    
+    def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                info = generation.generation_info or {}
+                self.prompt_tokens = info.get("prompt_eval_count", self.prompt_tokens)
+                self.completion_tokens = info.get("eval_count", self.completion_tokens)
+
+
+class OllamaBackend(LLMBackend):
+    """
+    Ollama through langchain-ollama (the original engine of this tool).
+    
+    The ollama client takes its HTTP timeout at construction, so every call
+    is additionally bounded by call_with_timeout() with
+    min(timeout, time left before the run deadline).
+    
+    Args:
+        model (str): Ollama model name (default LLM_Model).
+        timeout (float): Request timeout in seconds (default LLM_Timeout_Seconds
+                     at call time).
+    """
+    
+    name = "ollama"
+    
+    def __init__(self, model=None, timeout=None):
+        super().__init__(model)
+        self.timeout = timeout
+        self.llm = OllamaLLM(model=self.model,temperature=0.35,top_p=0.9,top_k=40,repeat_penalty=1.18,
+                             keep_alive=Ollama_Keep_Alive,
+                             client_kwargs={"timeout": (LLM_Timeout_Seconds if timeout is None else timeout) or None})
+    
+    def _generate(self, messages):
+        usage = OllamaUsageHandler()
+        timeout = LLM_Timeout_Seconds if self.timeout is None else self.timeout
+        text = call_with_timeout(lambda: self.llm.invoke(messages, config={"callbacks": [usage]}),
+                                 call_timeout(timeout))
+        return text, usage.prompt_tokens, usage.completion_tokens
+
+
+class OpenAICompatBackend(LLMBackend):
+    """
+    OpenAI compatible chat completions server, e.g. llama.cpp server or vLLM.
+    
+    Args:
+        base_url (str): Server URL including /v1 (default LLM_OpenAI_URL).
+        model (str): Model name as served (default LLM_Model).
+        api_key (str): Optional bearer token.
+        timeout (float): Request timeout in seconds (default LLM_Timeout_Seconds).
+        extra_body (dict): Server specific request fields merged into the
+                           body, e.g. llama.cpp's top_k / repeat_penalty
+                           (default LLM_OpenAI_Extra_Body). Only standard
+                           OpenAI fields are sent otherwise, since strict
+                           servers reject unknown ones.
+    """
+    
+    name = "openai"
+    
+    def __init__(self, base_url=None, model=None, api_key=None, timeout=None, extra_body=None):
+        super().__init__(model)
+        self.base_url = (base_url or LLM_OpenAI_URL).rstrip("/")
+        self.extra_body = dict(LLM_OpenAI_Extra_Body if extra_body is None else extra_body)
+        self.timeout = LLM_Timeout_Seconds if timeout is None else timeout
+        self.session = requests.Session()
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+    
+    def _generate(self, messages):
+        timeout = call_timeout(self.timeout) or None
+        response = call_with_timeout(lambda: self.session.post(
+            f"{self.base_url}/chat/completions",
+            json={"model": self.model, "messages": messages, "temperature": 0.35,
+                  "top_p": 0.9, **self.extra_body},
+            timeout=timeout), timeout)
+        response.raise_for_status()
+        body = response.json()
+        text = body["choices"][0]["message"]["content"]
+        usage = body.get("usage") or {}
+        return text, usage.get("prompt_tokens"), usage.get("completion_tokens")
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Deterministic offline stand-in for an LLM.
+    
+    Turns each sentence into a short two speaker dialogue in the prompt's
+    output format, so the rest of the pipeline can be exercised and load
+    tested without a model.
+    
+    Args:
+        latency (float): Seconds to sleep per call, to simulate a server.
+    """
+    
+    name = "fake"
+    
+    def __init__(self, model="fake", latency=0.0):
+        super().__init__(model)
+        self.latency = latency
+    
+    def _generate(self, messages):
+        if self.latency:
+            time.sleep(self.latency)
+        sentence = " ".join(str(messages[-1]["content"]).split())
+        words = sentence.split()
+        half = max(1, len(words) // 2)
+        text = (f'<speaker_A>: "Dekhiye, {" ".join(words[:half])}"\n\n'
+                f'<speaker_B>: "Sahi baat hai, {" ".join(words[half:]) or "bilkul"}"')
+        return text, None, None
+
+
+def create_llm_backend(name, model=None, base_url=None):
+    """
+    Build an LLM backend by name ("ollama", "openai" or "fake").
+    
+    Returns:
+        LLMBackend: The backend instance.
+    """
+    if name == "ollama":
+        return OllamaBackend(model)
+    if name == "openai":
+        return OpenAICompatBackend(base_url, model)
+    if name == "fake":
+        return FakeLLMBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
+
+
+def benchmark_llm_backends(backends, sentences, concurrency=4):
+    """
+    Measure throughput of several LLM backends on the same sentences.
+    
+    Args:
+        backends (list): LLMBackend instances.
+        sentences (list): English sentences to convert.
+        concurrency (int): Requests in flight per backend.
+    
+    Returns:
+        dict: backend name -> {"seconds", "calls", "failures", "tokens_per_sec",
+              "requests_per_sec"}.
+    """
+    prompt = Conversation_Prompt()
+    messages_list = [[{"role": "system", "content": prompt}, {"role": "user", "content": s}]
+                     for s in sentences]
+    results = {}
+    for backend in backends:
+        t0 = time.perf_counter()
+        backend.batch(messages_list, max_concurrency=concurrency)
+        wall = time.perf_counter() - t0
+        results[f"{backend.name}:{backend.model}"] = {
+            "seconds": round(wall, 3),
+            "calls": backend.stats["calls"],
+            "failures": backend.stats["failures"],
+            "tokens_per_sec": round(backend.stats["completion_tokens"] / wall, 2) if wall else 0.0,
+            "requests_per_sec": round(len(messages_list) / wall, 2) if wall else 0.0,
+        }
+    return results
+
+
+class ScriptValidator:
+    """
+    Fast checks and cheap repair of LLM replies before they reach the TTS.
+    
+    A reply is first cleaned locally for free: intro/outro meta lines
+    ("Here is the script", "Note: ...") and markdown are dropped, audio cues
+    outside Allowed_Audio_Cues are removed and speaker tags are normalised
+    to <speaker_X>: "...". Remaining problems (no dialogue, lines without a
+    speaker tag, English lines, word budget exceeded) trigger a targeted
+    regeneration of only that sentence, telling the model what was wrong.
+    If the reply still fails, offending lines are dropped (or the whole
+    reply when nothing usable is left), and stats record the TTS requests
+    and characters that were not spent on them.
+    
+    Args:
+        max_words (int): Word budget of a reply (default Script_Max_Words).
+        max_repairs (int): Regenerations per sentence (default Script_Max_Repairs).
+        allowed_cues (iterable): Allowed audio cues (default Allowed_Audio_Cues).
+    """
+    
+    _speaker_re = re.compile(r'^\s*[*_]*\s*<?\s*speaker[\s_]*([A-Za-z0-9])\s*>?\s*[*_]*\s*:\s*(.*)$',
+                             re.IGNORECASE)
+    _meta_re = re.compile(
+        r'^\s*(?:here\s+(?:is|are|\'s)\b|sure\b|okay\b|certainly\b|note\b|notes\b|translation\b'
+        r'|explanation\b|i\s+hope\b|let\s+me\s+know\b|as\s+an\s+ai\b|\(?\s*word\s+count\b'
+        r'|this\s+(?:script|dialogue|conversation)\b|the\s+(?:script|dialogue|conversation)\b|#+\s|-{3,}|\*{3,})',
+        re.IGNORECASE)
+    _cue_re = re.compile(r'\[([^\]]*)\]')
+    _english_words = frozenset(
+        "the is are was were this that these those with from have has will would which what "
+        "they there their it its and of to in on for by an be been as at or not but can".split())
+    _hindi_words = frozenset(
+        "hai hain tha thi ka ki ke ko se mein par aur bhi toh nahi nahin kya kyun "
+        "yeh ye woh wo matlab dekhiye waise hum aap apne jo ek bahut bhut sahi baat ho raha rahi "
+        "karte karti kar gaya gayi liye".split())
+    
+    def __init__(self, max_words=None, max_repairs=None, allowed_cues=None):
+        self.max_words = Script_Max_Words if max_words is None else max_words
+        self.max_repairs = Script_Max_Repairs if max_repairs is None else max_repairs
+        self.allowed_cues = frozenset(c.lower() for c in (allowed_cues or Allowed_Audio_Cues))
+        self.stats = {"checked": 0, "passed": 0, "cleaned": 0, "repair_calls": 0, "repaired": 0,
+                      "lines_dropped": 0, "rejected": 0, "tts_requests_saved": 0,
+                      "tts_chars_saved": 0}
+        self._lock = threading.Lock()
+    
+    def _count(self, **deltas):
+        with self._lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+    
+    def _clean_cues(self, text):
+        def keep(match):
+            return match.group(0) if match.group(1).strip().lower() in self.allowed_cues else ""
+        return " ".join(self._cue_re.sub(keep, text).split())
+    
+    def is_english(self, text):
+        """Heuristic: many English function words and no Roman Hindi ones."""
+        words = re.findall(r"[a-z']+", strip_audio_cues(text).lower())
+        if len(words) < 5:
+            return False
+        english = sum(w in self._english_words for w in words)
+        hindi = sum(w in self._hindi_words for w in words)
+        return hindi == 0 and english >= 0.25 * len(words)
+    
+    def clean(self, reply):
+        """
+        Free local repair of a reply.
+        
+        Returns:
+            tuple: (lines, dropped, issues) - normalised dialogue lines, text
+                   of dropped lines, and problems that need regeneration.
+        """
+        lines, dropped, issues = [], [], []
+        for raw in str(reply).replace("\r", "").split("\n"):
+            raw = raw.strip()
+            if not raw:
+                continue
+            match = self._speaker_re.match(raw)
+            if match is None:
+                dropped.append(raw)
+                if not (self._meta_re.match(raw) or raw.startswith(("(", "*", "#"))):
+                    issues.append(f'a line without a speaker tag: "{raw[:40]}"')
+                continue
+            text = self._clean_cues(match.group(2).strip().strip('*').strip())
+            text = text.strip('"').strip()
+            if not strip_audio_cues(text):
+                continue
+            if self.is_english(text):
+                dropped.append(raw)
+                issues.append(f'an English sentence instead of Hinglish: "{text[:40]}"')
+                continue
+            lines.append(f'<speaker_{match.group(1).upper()}>: "{text}"')
+        
+        if not lines:
+            issues.append("no dialogue lines in the required format")
+        words = sum(len(strip_audio_cues(line).split()) for line in lines)
+        if words > self.max_words:
+            issues.append(f"{words} words, the limit is {self.max_words}")
+        return lines, dropped, issues
+    
+    def repair_message(self, issues):
+        """User message asking for a corrected reply."""
+        return ("Your reply broke the rules: " + "; ".join(issues) + ". "
+                "Rewrite it in Hinglish as <speaker_A>/<speaker_B> lines only, "
+                f"max {self.max_words} words, no intro and no notes.")
+    
+    def validate(self, reply, regenerate=None):
+        """
+        Validate one reply, regenerating it if needed.
+        
+        Args:
+            reply (str): Raw LLM reply.
+            regenerate (callable): fn(reply, issues) -> new reply, or None to
+                     skip repair.
+        
+        Returns:
+            str: Normalised dialogue ("\\n\\n" between lines), or "" if rejected.
+        """
+        self._count(checked=1)
+        original = str(reply)
+        lines, dropped, issues = self.clean(original)
+        repairs = 0
+        while issues and regenerate is not None and repairs < self.max_repairs:
+            repairs += 1
+            self._count(repair_calls=1)
+            Metrics.inc("radio_retries_total", stage="llm_repair")
+            try:
+                reply = regenerate(reply, issues)
+            except Exception as ex:
+                print(f"Repair request failed: {ex}")
+                break
+            lines, dropped, issues = self.clean(reply)
+            if not issues:
+                self._count(repaired=1)
+        
+        if not issues:
+            self._count(passed=1)
+            if dropped or "\n".join(lines) != original.strip():
+                self._count(cleaned=1)
+            self._count(lines_dropped=len(dropped), tts_requests_saved=len(dropped),
+                        tts_chars_saved=sum(len(d) for d in dropped))
+            return "\n\n".join(lines)
+        
+        over_budget = any(i.endswith(f"the limit is {self.max_words}") for i in issues)
+        if lines and not over_budget:
+            # keep the usable lines, drop the rest
+            self._count(passed=1, lines_dropped=len(dropped), tts_requests_saved=len(dropped),
+                        tts_chars_saved=sum(len(d) for d in dropped))
+            return "\n\n".join(lines)
+        
+        print(f"Rejected LLM reply ({'; '.join(issues)})")
+        rejected = [l for l in str(reply).split("\n") if l.strip()]
+        self._count(rejected=1, tts_requests_saved=len(rejected),
+                    tts_chars_saved=sum(len(l) for l in rejected))
+        return ""
+
+
+def hinglish_converter(data, dedup=None, backend=None, validator=None, prompt=None):
+    """
+    Convert English sentences into Hinglish conversation using LLM.
+    
+    Takes a list of English sentences and converts each into natural Hinglish
+    dialogue between two speakers using the Ollama LLM. The conversion follows
+    the guidelines specified in Conversation_Prompt() to create conversational
+    Hinglish text suitable for audio generation.
+    
+    Args:
+        data (list): A list of English sentence strings to convert to Hinglish.
+        dedup (SingleFlight): Optional dedup index; identical sentences (also
+                     across topics of a batch) are sent to the LLM only once.
+        backend (LLMBackend): LLM engine (default: OllamaBackend with LLM_Model).
+        validator (ScriptValidator): Optional output check; failing replies
+                     are repaired or dropped before they cost TTS requests.
+        prompt (str): System prompt (default Conversation_Prompt()), e.g. a
+                     show variant from variant_prompt().
+    
+    Returns:
+        list: A list of Hinglish conversation lines/sentences ready for audio
+              generation. Each element represents dialogue that can be spoken.
+    
+    Note:
+        - Uses the global LLM_Model variable (default: "llama3:8b")
+        - Up to LLM_Concurrency sentences are in flight at once
+        - Automatically splits the output using sentence_splitter()
+    """
+    
+    if backend is None:
+        backend = OllamaBackend()
+    HinglishData=[]
     
     if stlit:
         st.write("Hinglish conversion started : " + str(datetime.now().strftime("%H:%M:%S")))
     print("Hinglish conversation started : " + str(datetime.now().strftime("%H:%M:%S")))   
     
-    prompt = Conversation_Prompt()
+    prompt = prompt or Conversation_Prompt()
+    
+    def generate(sentence):
+        messages = [{"role": "system", "content": prompt}, {"role": "user", "content": sentence}]
+        reply = backend.invoke(messages)
+        if validator is None:
+            return reply
+        
+        def regenerate(bad_reply, issues):
+            return backend.invoke(messages + [
+                {"role": "assistant", "content": str(bad_reply)},
+                {"role": "user", "content": validator.repair_message(issues)}])
+        return validator.validate(reply, regenerate)
+    
+    def convert(sentence):
+        if dedup is None:
+            return generate(sentence)
+        kind = "llm" if validator is None else "llm-validated"
+        return dedup.do(dedup_key(kind, backend.name, backend.model, prompt, sentence),
+                        lambda: generate(sentence))
+    
+    # sentences are submitted together so servers with continuous batching can overlap them
+    with profile_stage("llm"):
+        if stlit:
+            with st.spinner("Hinglish Conversion ongoing... please wait ⏳"):
+                results = map_concurrent(convert, data, LLM_Concurrency)
+        else:
+            results = map_concurrent(convert, data, LLM_Concurrency)
+    
+    for sentence, Conversation in zip(data, results):
+        if isinstance(Conversation, Exception):
+            if stlit:
+                st.error(f"Failed to convert sentence: {sentence[:50]}... Error: {str(Conversation)}")
+            print(f"Error processing sentence '{sentence[:50]}...': {Conversation}")
+            # Continue with next sentence instead of failing completely
+            continue
+        if Conversation and len(str(Conversation).strip()) > 0:
+            HinglishData.append(Conversation)
+        else:
+            if stlit:
+                st.warning(f"Empty response for sentence: {sentence[:50]}...")
+            print(f"Warning: Empty LLM response for sentence: {sentence[:50]}...")
+
+    # Check if we have any valid data after processing
+    if not HinglishData or len(HinglishData) == 0:
+        error_msg = "No valid Hinglish conversion data generated. All sentences may have failed."
+        if stlit:
+            st.error(error_msg)
+        print(error_msg)
+        return []
+    
+    print("Hinglish conversion Done : " + str(datetime.now().strftime("%H:%M:%S")))
+    if stlit:
+        st.write("Hinglish conversion Done : " + str(datetime.now().strftime("%H:%M:%S")))
+    if validator is not None:
+        print(f"LLM output validation: {validator.stats}")
+
+    Sent_token = sentence_splitter(HinglishData)
+    return Sent_token
+
+
+def resample_audio(audio_np, from_rate, to_rate):
+    """
+    Linear-interpolation resample of mono audio (for short clips such as
+    cached phrases; not meant as a high quality converter).
+    
+    Returns:
+        numpy.ndarray: float32 samples at to_rate (the input if the rates match).
+    """
+    audio_np = np.asarray(audio_np, dtype=np.float32)
+    if not from_rate or not to_rate or from_rate == to_rate or audio_np.size == 0:
+        return audio_np
+    length = max(1, int(round(len(audio_np) * to_rate / float(from_rate))))
+    positions = np.linspace(0, len(audio_np) - 1, length)
+    return np.interp(positions, np.arange(len(audio_np)), audio_np).astype(np.float32)
+
+
+def sanitize_audio(audio_np):
+    """
+    Sanitize and normalize audio numpy array for processing.
+    
+    Processes raw audio data to ensure it's in the correct format for
+    concatenation and file writing. Converts stereo to mono, handles edge
+    cases like empty arrays or scalars, and reshapes to 1D array.
+    
+    Args:
+        audio_np (numpy.ndarray or None): Raw audio data as numpy array.
+                                         Can be mono or stereo, or None.
+    
+    Returns:
+        numpy.ndarray or None: Sanitized 1D audio array ready for processing,
+                              or None if input is invalid/empty.
+    
+    Processing:
+        - Converts input to numpy array
+        - Rejects scalar values (0-dimensional arrays)
+        - Converts stereo (2D) to mono by averaging channels
+        - Rejects empty arrays
+        - Reshapes to 1D array
+    """
+
+    try:
+        if audio_np is None:
+            return None
+        
+        audio_np = np.asarray(audio_np)
+
+        # Reject scalar
+        if audio_np.ndim == 0:
+            return None
+
+        # Stereo → mono
+        if audio_np.ndim == 2:
+            audio_np = audio_np.mean(axis=1)
+
+        # Reject empty
+        if audio_np.size == 0:
+            return None
+
+        return audio_np.reshape(-1)
+    except Exception as ex:
+        print(f"Error sanitizing audio: {ex}")
+        return None
+
+
+def downmix_matrix(in_channels, out_channels=1, weights=None):
+    """
+    Channel mixing matrix of shape (in_channels, out_channels).
+    
+    Args:
+        in_channels (int): Channels of the source.
+        out_channels (int): Channels wanted (1 = mono).
+        weights (array-like): Explicit matrix, e.g. [[0.7], [0.3]] to favour
+                     the left channel; overrides the defaults below.
+    
+    Returns:
+        numpy.ndarray: float32 matrix. Defaults: equal-weight average to
+                       mono, identity for same layout, copy of a mono
+                       source to every output channel, otherwise channel i
+                       is averaged into output i % out_channels.
+    """
+    if weights is not None:
+        matrix = np.asarray(weights, dtype=np.float32)
+        if matrix.shape != (in_channels, out_channels):
+            raise ValueError(f"downmix matrix must be {in_channels}x{out_channels}, got {matrix.shape}")
+        return matrix
+    if out_channels == 1:
+        return np.full((in_channels, 1), 1.0 / in_channels, dtype=np.float32)
+    if in_channels == 1:
+        return np.ones((1, out_channels), dtype=np.float32)
+    matrix = np.zeros((in_channels, out_channels), dtype=np.float32)
+    matrix[np.arange(in_channels), np.arange(in_channels) % out_channels] = 1.0
+    return matrix / matrix.sum(axis=0, keepdims=True)
+
+
+def sanitize_audio_batch(chunks, channels=1, dtype=np.float32, matrix=None,
+                         remove_dc=False, guard=True, concatenate=False):
+    """
+    Normalise many audio chunks in one pass into a single preallocated buffer.
+    
+    Batched counterpart of sanitize_audio(): every chunk is written straight
+    into its slice of one output array of the target dtype (integer PCM is
+    scaled on the way, multi-channel input goes through a mixing matrix),
+    so there are no per-chunk float64 temporaries or a second concatenate
+    copy. NaN/Inf samples are replaced (NaN -> 0, +/-Inf -> +/-1) and the
+    DC offset of each chunk can be removed.
+    
+    Args:
+        chunks (list): Arrays of shape (frames,) or (frames, channels); None,
+                     scalar and empty entries are rejected like in sanitize_audio().
+        channels (int): Output channels (1 = mono downmix, 2 keeps stereo).
+        dtype: Output dtype (default float32).
+        matrix (array-like): Mixing matrix (in_channels x channels); default
+                     from downmix_matrix(). Chunks whose channel count does
+                     not fit it are mixed with the default matrix instead.
+        remove_dc (bool): Subtract each chunk's per-channel mean.
+        guard (bool): Replace NaN/Inf samples.
+        concatenate (bool): Return the whole buffer instead of per-chunk views.
+    
+    Returns:
+        list or numpy.ndarray: Per-chunk views (None for rejected chunks), or
+                     the concatenated buffer (None if nothing was valid).
+                     Mono results are 1D, others (frames, channels).
+    """
+    dtype = np.dtype(dtype)
+    arrays = []
+    total = 0
+    for chunk in chunks:
+        try:
+            audio_np = None if chunk is None else np.asarray(chunk)
+        except Exception as ex:
+            print(f"Error sanitizing audio: {ex}")
+            audio_np = None
+        if (audio_np is None or audio_np.ndim == 0 or audio_np.ndim > 2 or audio_np.size == 0
+                or not (np.issubdtype(audio_np.dtype, np.number))):
+            arrays.append(None)
+            continue
+        if audio_np.ndim == 1:
+            audio_np = audio_np.reshape(-1, 1)
+        in_channels = audio_np.shape[1]
+        mix = None
+        if matrix is not None or in_channels != channels:
+            try:
+                mix = downmix_matrix(in_channels, channels, matrix)
+            except ValueError as ex:
+                # one odd chunk (e.g. mono among stereo) must not sink the whole batch
+                print(f"Error sanitizing audio: {ex}, using the default mix for this chunk")
+                mix = downmix_matrix(in_channels, channels)
+        arrays.append((audio_np, mix))
+        total += audio_np.shape[0]
+    
+    # integer PCM is mixed in float32 (not promoted to float64 by matmul)
+    work_dtype = dtype if np.issubdtype(dtype, np.floating) else np.dtype(np.float32)
+    out = np.empty((total, channels), dtype=dtype)
+    views = []
+    position = 0
+    for entry in arrays:
+        if entry is None:
+            views.append(None)
+            continue
+        audio_np, mix = entry
+        frames = audio_np.shape[0]
+        view = out[position:position + frames]
+        position += frames
+        scale = 1.0
+        if np.issubdtype(audio_np.dtype, np.integer):
+            scale = 1.0 / (np.iinfo(audio_np.dtype).max + 1)
+        if mix is None:
+            if scale == 1.0:
+                np.copyto(view, audio_np, casting="unsafe")
+            else:
+                np.multiply(audio_np, dtype.type(scale), out=view, casting="unsafe")
+        else:
+            mix = mix.astype(work_dtype, copy=False)
+            if scale != 1.0:
+                mix = mix * work_dtype.type(scale)
+            np.matmul(audio_np.astype(work_dtype, copy=False), mix, out=view, casting="unsafe")
+        if guard:
+            np.nan_to_num(view, copy=False, nan=0.0, posinf=1.0, neginf=-1.0)
+        if remove_dc:
+            view -= view.mean(axis=0, dtype=dtype)
+        views.append(view.reshape(-1) if channels == 1 else view)
+    
+    if concatenate:
+        if not total:
+            return None
+        return out.reshape(-1) if channels == 1 else out
+    return views
+
+
+def benchmark_audio_sanitize(chunk_seconds=(0.1, 1.0, 10.0), n_chunks=40, sample_rate=44100,
+                             in_channels=2, repeat=5):
+    """
+    Microbenchmark of per-chunk sanitize_audio() + concatenate vs sanitize_audio_batch().
+    
+    Chunks are random float32 audio of realistic TTS sizes (0.1 s network
+    chunks up to 10 s lines) with in_channels channels.
+    
+    Returns:
+        list: One dict per chunk size with loop_ms, batch_ms and speedup.
+    """
+    rng = np.random.default_rng(0)
+    results = []
+    for seconds in chunk_seconds:
+        frames = int(sample_rate * seconds)
+        chunks = [rng.standard_normal((frames, in_channels), dtype=np.float32) * 0.1
+                  for _ in range(n_chunks)]
+        
+        def loop():
+            return np.concatenate([sanitize_audio(c) for c in chunks]).astype(np.float32)
+        
+        def batch():
+            return sanitize_audio_batch(chunks, concatenate=True)
+        
+        timings = {}
+        for name, fn in (("loop", loop), ("batch", batch)):
+            best = None
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                fn()
+                elapsed = time.perf_counter() - t0
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best * 1000
+        results.append({"chunk_seconds": seconds, "chunks": n_chunks, "channels": in_channels,
+                        "loop_ms": round(timings["loop"], 3), "batch_ms": round(timings["batch"], 3),
+                        "speedup": round(timings["loop"] / timings["batch"], 2) if timings["batch"] else None})
+    return results
+
+
+def Get_Key_Env_varibles():
+    """
+    Retrieve ElevenLabs API credentials from environment variables.
+    
+    Fetches the required API key and voice IDs from environment variables.
+    Exits the program if any required credentials are missing.
+    
+    Returns:
+        tuple: A tuple containing (api_key, voice_id_A, voice_id_B) if all
+               credentials are found, followed by voice_id_C, ... when
+               Speaker_Names has more than two speakers.
+    
+    Environment Variables Required:
+        - ELEVENLABS_API_KEY: ElevenLabs API key for authentication
+        - ELEVENLABS_voice_id_A: First voice ID for speaker A
+        - ELEVENLABS_voice_id_B: Second voice ID for speaker B
+        - ELEVENLABS_voice_id_C, ...: Voices of further speakers
+    
+    Each value may be a comma separated list: several API keys share the
+    load of a run (see ElevenLabsTTSBackend), several voice IDs form the
+    voice pool of a speaker (see show_cast()).
+    
+    Exits:
+        sys.exit(0): If any required environment variable is missing.
+    """
+    # Get keys from environment
+    api_key = os.getenv("ELEVENLABS_API_KEY")
+    if not api_key:
+        print(" Eleven Labs API key Not available")
+        sys.exit(0)
+            
+    voice_id_A = os.getenv("ELEVENLABS_voice_id_A")
+    if not voice_id_A:
+        print("1st Voice ID Not available")
+        sys.exit(0)
+
+    voice_id_B = os.getenv("ELEVENLABS_voice_id_B")
+    if not voice_id_B:
+        print("2nd Voice ID Not available")  
+        sys.exit(0)
+    
+    more_voices = []
+    for i in range(2, len(Speaker_Names)):
+        role = chr(ord("A") + i)
+        voice_id = os.getenv(f"ELEVENLABS_voice_id_{role}")
+        if not voice_id:
+            print(f"Voice ID for speaker {role} Not available")
+            sys.exit(0)
+        more_voices.append(voice_id)
+    return (api_key ,voice_id_A , voice_id_B, *more_voices)
+
+
+class VoicePool:
+    """
+    Equivalent voices for one speaker role.
+    
+    pick() hands out the voice used by the fewest shows on air, so
+    parallel shows are spread over the pool instead of all queuing on one
+    voice. A show keeps the voice it picked for all of its lines and
+    hands it back with release() when it ends.
+    
+    Args:
+        voices (str or list): Voice IDs, or a comma separated string of them.
+    """
+    
+    def __init__(self, voices):
+        if isinstance(voices, str):
+            voices = voices.split(",")
+        self.voices = [v.strip() for v in voices if v and v.strip()]
+        if not self.voices:
+            raise ValueError("A voice pool needs at least one voice ID")
+        self.assigned = dict.fromkeys(self.voices, 0)
+        self._lock = threading.Lock()
+    
+    def pick(self, exclude=()):
+        """
+        Least used voice of the pool (ties go in pool order).
+        
+        Args:
+            exclude (collection): Voices to avoid, e.g. those already cast
+                                  in the same show; ignored if it covers
+                                  the whole pool.
+        """
+        with self._lock:
+            candidates = [v for v in self.voices if v not in exclude] or self.voices
+            voice = min(candidates, key=self.assigned.__getitem__)
+            self.assigned[voice] += 1
+            return voice
+    
+    def release(self, voice):
+        """Hand back a voice picked for a show that has ended."""
+        with self._lock:
+            if self.assigned.get(voice):
+                self.assigned[voice] -= 1
+
+
+_voice_pools = {}
+_voice_pools_lock = threading.Lock()
+
+
+def voice_pool(spec):
+    """VoicePool for a voice spec ("id1,id2"), shared by all shows of the process."""
+    with _voice_pools_lock:
+        if spec not in _voice_pools:
+            _voice_pools[spec] = VoicePool(spec)
+        return _voice_pools[spec]
+
+
+def show_cast(Keys, names=None):
+    """
+    Voices and name tags of one show, one entry per speaker role.
+    
+    Lines are spoken by the roles in turn (A, B, C, A, ...). Each role's
+    voice comes from its pool (Keys[1] for A, Keys[2] for B, ...); a voice
+    already cast for an earlier role is skipped when pools overlap. Pick
+    the cast once per show and hand it back with release_cast(), or use
+    cast_of_show().
+    
+    Args:
+        Keys (tuple): (api_key, voice_A, voice_B, ...); each voice entry may
+                      be a comma separated pool of equivalent voices.
+        names (sequence): Name tag per role (default Speaker_Names).
+    
+    Returns:
+        list: (voice_id, 'Name ') per role.
+    """
+    names = list(names or Speaker_Names)
+    voices = list(Keys[1:])
+    if len(voices) < len(names):
+        raise ValueError(f"{len(names)} speakers need {len(names)} voices, got {len(voices)}")
+    cast = []
+    for i, name in enumerate(names):
+        taken = {voice for voice, _ in cast}
+        cast.append((voice_pool(voices[i]).pick(exclude=taken), f"{name} "))
+    return cast
+
+
+def release_cast(Keys, cast):
+    """Hand the voices of a show_cast() back to their pools."""
+    for spec, (voice, _) in zip(Keys[1:], cast):
+        voice_pool(spec).release(voice)
+
+
+@contextlib.contextmanager
+def cast_of_show(Keys, cast=None):
+    """
+    The cast of one show: `cast` if the caller already picked it, otherwise
+    a new show_cast() that is released when the block ends.
+    """
+    if cast is not None:
+        yield cast
+        return
+    cast = show_cast(Keys)
+    try:
+        yield cast
+    finally:
+        release_cast(Keys, cast)
+    
+
+class PCMStreamDecoder:
+    """
+    Incremental decoder for raw signed 16-bit little-endian PCM.
+    
+    HTTP chunks do not respect sample boundaries, so an odd trailing byte is
+    carried over to the next feed(). Samples are converted straight to
+    float32 without an intermediate float64 copy.
+    """
+    
+    def __init__(self):
+        self._carry = b""
+    
+    def feed(self, chunk):
+        """
+        Decode one network chunk.
+        
+        Args:
+            chunk (bytes): Raw bytes as received.
+        
+        Returns:
+            numpy.ndarray: float32 samples in [-1, 1) (may be empty).
+        """
+        if self._carry:
+            chunk = self._carry + chunk
+        usable = len(chunk) - (len(chunk) % 2)
+        self._carry = chunk[usable:]
+        samples = np.frombuffer(chunk, dtype="<i2", count=usable // 2).astype(np.float32)
+        samples *= 1.0 / 32768.0
+        return samples
+
+
+def output_format_sample_rate(output_format):
+    """Sample rate encoded in an ElevenLabs output format such as "pcm_44100" or "mp3_44100_128"."""
+    parts = str(output_format or "").split("_")
+    if len(parts) > 1 and parts[1].isdigit():
+        return int(parts[1])
+    return 44100
+
+
+def tts_stream(client, voice, text, output_format=None):
+    """
+    Synthesize text with ElevenLabs and yield decoded audio as it arrives.
+    
+    With a PCM output format each network chunk is decoded immediately, so
+    the caller can write or play samples before the download finishes and
+    the response is never buffered twice. Other formats (MP3) cannot be
+    decoded incrementally here and fall back to buffering the response.
+    
+    Args:
+        client (ElevenLabs): Initialized ElevenLabs client.
+        voice (str): Voice ID.
+        text (str): Text to speak.
+        output_format (str): ElevenLabs output format (default TTS_Output_Format).
+    
+    Yields:
+        numpy.ndarray: Mono float32 chunks.
+    """
+    output_format = output_format or TTS_Output_Format
+    timeout = call_timeout(TTS_Timeout_Seconds)
+    request_options = {"timeout_in_seconds": max(1, int(timeout + 0.999))} if timeout else None
+    audio_generator = tape_stream(
+        "tts.convert", {"voice": voice, "text": text, "model": TTS_Model_ID, "format": output_format},
+        lambda: client.text_to_speech.convert(
+            voice_id=voice,
+            text=text,
+            voice_settings={
+                "stability": 0.5,
+                "similarity_boost": 0.6,
+                "style": 0.4,
+                "use_speaker_boost": True
+            },
+            model_id=TTS_Model_ID,
+            output_format=output_format,
+            request_options=request_options))
+    
+    if output_format.startswith("pcm_"):
+        decoder = PCMStreamDecoder()
+        for chunk in audio_generator:
+            check_cancelled()
+            samples = decoder.feed(chunk)
+            if samples.size:
+                yield samples
+        return
+    
+    audio_bytes = b"".join(chunk for chunk in audio_generator)
+    if not audio_bytes:
+        return
+    audio_np, sr = sf.read(io.BytesIO(audio_bytes), dtype="float32")
+    audio_np = sanitize_audio(audio_np)
+    if audio_np is not None:
+        yield audio_np
+
+
+def tts_convert(client, voice, text, output_format=None):
+    """
+    Synthesize one piece of text with ElevenLabs and decode it.
+    
+    Args:
+        client (ElevenLabs): Initialized ElevenLabs client.
+        voice (str): Voice ID.
+        text (str): Text to speak.
+        output_format (str): ElevenLabs output format (default TTS_Output_Format).
+    
+    Returns:
+        numpy.ndarray or None: Sanitized mono float32 samples, or None if the
+                              API returned no audio.
+    """
+    chunks = list(tts_stream(client, voice, text, output_format))
+    if not chunks:
+        print(f" Skipped empty audio chunk for voice {text}")
+        return None
+    return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+
+def tts_convert_with_timestamps(client, voice, text, output_format=None):
+    """
+    Synthesize text with ElevenLabs and return per-character timings.
+    
+    Returns:
+        tuple: (samples, (start_times, end_times)) with one start/end time in
+               seconds per character of text; the alignment is None if the
+               API did not return one.
+    """
+    import base64
+    output_format = output_format or TTS_Output_Format
+    timeout = call_timeout(TTS_Timeout_Seconds)
+    request_options = {"timeout_in_seconds": max(1, int(timeout + 0.999))} if timeout else None
+    
+    def convert():
+        response = client.text_to_speech.convert_with_timestamps(
+            voice_id=voice,
+            text=text,
+            voice_settings={
+                "stability": 0.5,
+                "similarity_boost": 0.6,
+                "style": 0.4,
+                "use_speaker_boost": True
+            },
+            model_id=TTS_Model_ID,
+            output_format=output_format,
+            request_options=request_options)
+        alignment = getattr(response, "alignment", None)
+        starts = getattr(alignment, "character_start_times_seconds", None)
+        ends = getattr(alignment, "character_end_times_seconds", None)
+        return {"audio_base_64": getattr(response, "audio_base_64", None) or getattr(response, "audio_base64", None),
+                "starts": list(starts) if starts else None,
+                "ends": list(ends) if ends else None}
+    
+    response = tape_call("tts.convert_with_timestamps",
+                         {"voice": voice, "text": text, "model": TTS_Model_ID, "format": output_format},
+                         lambda: call_with_timeout(convert, timeout))
+    audio_b64 = response["audio_base_64"]
+    if not audio_b64:
+        return None, None
+    audio_bytes = base64.b64decode(audio_b64)
+    if output_format.startswith("pcm_"):
+        audio_np = PCMStreamDecoder().feed(audio_bytes)
+    else:
+        audio_np, sr = sf.read(io.BytesIO(audio_bytes), dtype="float32")
+        audio_np = sanitize_audio(audio_np)
+    
+    starts, ends = response["starts"], response["ends"]
+    if not starts or not ends or len(starts) != len(text):
+        return audio_np, None
+    return audio_np, (starts, ends)
+
+
+_audio_cue_re = re.compile(r'\[[^\]]*\]|<speaker_[A-Za-z0-9]+>\s*:?')
+
+
+def strip_audio_cues(text):
+    """Remove ElevenLabs audio cues and speaker tags for engines that would read them aloud."""
+    return " ".join(_audio_cue_re.sub(" ", text).replace('"', " ").split())
+
+
+class TTSBackend:
+    """
+    Interface of a text-to-speech engine used by generate_audio().
+    
+    Subclasses implement synthesize(); stream() and synthesize_async() have
+    default implementations on top of it.
+    
+    Attributes:
+        name (str): Short backend name used on the CLI.
+        sample_rate (int): Native sample rate of the returned audio.
+    """
+    
+    name = "base"
+    sample_rate = 44100
+    pack_separator = "\n\n"
+    
+    def synthesize(self, voice_id, text):
+        """
+        Synthesize text with the given voice.
+        
+        Returns:
+            numpy.ndarray or None: Mono float32 samples at self.sample_rate.
+        """
+        raise NotImplementedError
+    
+    def stream(self, voice_id, text):
+        """Yield audio as numpy chunks; default is one chunk with the whole line."""
+        audio = self.synthesize(voice_id, text)
+        if audio is not None:
+            yield audio
+    
+    def synthesize_aligned(self, voice_id, text):
+        """
+        Synthesize text and return per-character timings when the engine has them.
+        
+        Returns:
+            tuple: (samples, alignment) where alignment is None or
+                   (start_times, end_times), one entry per character.
+        """
+        return self.synthesize(voice_id, text), None
+    
+    async def synthesize_async(self, voice_id, text):
+        """Async synthesize; runs the blocking call in a worker thread."""
+        return await asyncio.to_thread(self.synthesize, voice_id, text)
+
+
+class ElevenLabsTTSBackend(TTSBackend):
+    """
+    ElevenLabs API backend (remote, paid, rate limited).
+    
+    Several API keys ("key1,key2") spread the requests: each request goes to
+    the key with the fewest requests in flight, and waits while every key
+    is at max_per_key, so one key's concurrency limit does not cap a run.
+    
+    Args:
+        api_key (str): ElevenLabs API key, or a comma separated list of keys.
+        output_format (str): ElevenLabs output format (default TTS_Output_Format).
+        max_per_key (int): Requests in flight per key (default
+                     ElevenLabs_Key_Concurrency, 0 = no limit).
+    """
+    
+    name = "elevenlabs"
+    
+    def __init__(self, api_key, output_format=None, max_per_key=None):
+        keys = [k.strip() for k in str(api_key or "").split(",") if k.strip()] or [api_key]
+        self.clients = [ElevenLabs(api_key=key) for key in keys]
+        self.client = self.clients[0]
+        self.max_per_key = ElevenLabs_Key_Concurrency if max_per_key is None else max_per_key
+        self.in_flight = [0] * len(self.clients)
+        self.requests = [0] * len(self.clients)
+        self._slots = threading.Condition()
+        self.output_format = output_format or TTS_Output_Format
+        self.sample_rate = output_format_sample_rate(self.output_format)
+    
+    @contextlib.contextmanager
+    def lease_client(self):
+        """Client of the least busy API key, held for one request."""
+        with self._slots:
+            while True:
+                index = min(range(len(self.clients)), key=self.in_flight.__getitem__)
+                if not self.max_per_key or self.in_flight[index] < self.max_per_key:
+                    break
+                self._slots.wait()
+            self.in_flight[index] += 1
+            self.requests[index] += 1
+        try:
+            yield self.clients[index]
+        finally:
+            with self._slots:
+                self.in_flight[index] -= 1
+                self._slots.notify()
+    
+    def synthesize(self, voice_id, text):
+        with self.lease_client() as client:
+            return tts_convert(client, voice_id, text, self.output_format)
+    
+    pack_separator = " [pause] "
+    
+    def stream(self, voice_id, text):
+        with self.lease_client() as client:
+            yield from tts_stream(client, voice_id, text, self.output_format)
+    
+    def synthesize_aligned(self, voice_id, text):
+        try:
+            with self.lease_client() as client:
+                audio_np, alignment = tts_convert_with_timestamps(client, voice_id, text,
+                                                                  self.output_format)
+        except Exception as ex:
+            print(f"Timestamped synthesis unavailable, falling back: {ex}")
+            return self.synthesize(voice_id, text), None
+        return audio_np, alignment
+
+
+class EspeakTTSBackend(TTSBackend):
+    """
+    Local offline backend that runs espeak-ng (or espeak) as a subprocess.
+    
+    Every call is its own process, so generate_audio(..., tts_workers=N)
+    synthesizes N lines in parallel at local CPU speed. The output rate is
+    probed once when the backend is created; a voice that renders at
+    another rate (e.g. mbrola) is resampled to it, so sample_rate never
+    changes under concurrent calls.
+    
+    Args:
+        voices (dict): Optional voice_id -> espeak voice name. Unmapped
+                     voice IDs get a stable pick from Espeak_Voices.
+        speed (int): Words per minute.
+        executable (str): Path of the espeak binary (default: found on PATH).
+    """
+    
+    name = "espeak"
+    sample_rate = 22050
+    
+    def __init__(self, voices=None, speed=165, executable=None):
+        self.executable = executable or shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.executable:
+            raise RuntimeError("espeak-ng not found on PATH")
+        self.voices = dict(voices or {})
+        self.speed = speed
+        self.sample_rate = self._probe_rate()
+    
+    def _probe_rate(self):
+        try:
+            result = subprocess.run([self.executable, "--stdout", "a"], stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, check=True, timeout=10)
+            return sf.info(io.BytesIO(result.stdout)).samplerate
+        except Exception as ex:
+            print(f"Could not probe the espeak sample rate, assuming {type(self).sample_rate} Hz: {ex}")
+            return type(self).sample_rate
+    
+    def _voice(self, voice_id):
+        if voice_id in self.voices:
+            return self.voices[voice_id]
+        digest = int(hashlib.sha1(str(voice_id).encode("utf-8")).hexdigest(), 16)
+        return Espeak_Voices[digest % len(Espeak_Voices)]
+    
+    def synthesize(self, voice_id, text):
+        text = strip_audio_cues(text)
+        if not text:
+            return None
+        result = subprocess.run(
+            [self.executable, "-v", self._voice(voice_id), "-s", str(self.speed), "--stdout", text],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+            timeout=call_timeout(TTS_Timeout_Seconds) or None)
+        audio_np, sr = sf.read(io.BytesIO(result.stdout), dtype="float32")
+        audio_np = sanitize_audio(audio_np)
+        if audio_np is None:
+            return None
+        return resample_audio(audio_np, sr, self.sample_rate)
+
+
+class ToneTTSBackend(TTSBackend):
+    """
+    Pure-Python draft synthesizer with no external dependency.
+    
+    Renders one short voiced tone burst per word (pitch fixed per voice,
+    length from the word length) and a pause at punctuation. It does not
+    produce speech, but timing and audio volume are realistic, which makes
+    it suitable for pipeline drafts, load tests and CI.
+    
+    Args:
+        words_per_second (float): Speaking rate.
+        sample_rate (int): Output sample rate.
+    """
+    
+    name = "tone"
+    
+    def __init__(self, words_per_second=2.6, sample_rate=22050):
+        self.words_per_second = words_per_second
+        self.sample_rate = sample_rate
+    
+    def synthesize(self, voice_id, text):
+        words = strip_audio_cues(text).split()
+        if not words:
+            return None
+        digest = int(hashlib.sha1(str(voice_id).encode("utf-8")).hexdigest(), 16)
+        pitch = 180.0 + digest % 80
+        base = 1.0 / self.words_per_second
+        parts = []
+        for word in words:
+            n = int(self.sample_rate * base * min(2.0, max(0.5, len(word) / 5.0)))
+            t = np.arange(n, dtype=np.float32) / self.sample_rate
+            envelope = np.sin(np.pi * np.arange(n, dtype=np.float32) / max(1, n - 1))
+            tone = 0.2 * envelope * (np.sin(2 * np.pi * pitch * t) + 0.3 * np.sin(4 * np.pi * pitch * t))
+            parts.append(tone.astype(np.float32))
+            if word[-1] in ",.!?":
+                parts.append(np.zeros(int(self.sample_rate * base * 0.6), dtype=np.float32))
+        return np.concatenate(parts)
+
+
+def create_tts_backend(name, Keys=None):
+    """
+    Build a TTS backend by name ("elevenlabs", "espeak" or "tone").
+    
+    Args:
+        name (str): Backend name.
+        Keys (tuple): (api_key, voice_id_A, voice_id_B), needed for ElevenLabs.
+    
+    Returns:
+        TTSBackend: The backend instance.
+    """
+    if name == "elevenlabs":
+        return ElevenLabsTTSBackend(Keys[0])
+    if name == "espeak":
+        return EspeakTTSBackend()
+    if name == "tone":
+        return ToneTTSBackend()
+    raise ValueError(f"Unknown TTS backend: {name}")
+
+
+def plan_tts_requests(jobs, short_chars=None, max_chars=None):
+    """
+    Cut the number of TTS requests for a show, keeping the turn order.
+    
+    Consecutive turns of the same voice are merged into one turn. Short
+    turns (under short_chars) of the same voice are then packed into a
+    shared request of at most max_chars; their audio is cut apart again by
+    split_packed_audio(). Long turns keep a request of their own.
+    
+    Args:
+        jobs (list): (voice, speaker, text) per line, in playback order.
+        short_chars (int): Turns shorter than this may be packed (default Pack_Short_Chars).
+        max_chars (int): Text limit of a packed request (default Pack_Max_Chars).
+    
+    Returns:
+        tuple: (turns, requests). turns is the merged (voice, speaker, text)
+               list; each request is (voice, [turn indices]).
+    """
+    short_chars = Pack_Short_Chars if short_chars is None else short_chars
+    max_chars = Pack_Max_Chars if max_chars is None else max_chars
+    
+    turns = []
+    for voice, speaker, text in jobs:
+        if turns and turns[-1][0] == voice:
+            turns[-1] = (voice, turns[-1][1], turns[-1][2] + " " + text)
+        else:
+            turns.append((voice, speaker, text))
+    
+    requests_ = []
+    open_packs = {}
+    for index, (voice, speaker, text) in enumerate(turns):
+        length = len(speaker) + len(text)
+        if length >= short_chars:
+            requests_.append((voice, [index]))
+            continue
+        pack = open_packs.get(voice)
+        if pack is not None and pack[1] + length <= max_chars:
+            pack[0][1].append(index)
+            pack[1] += length
+        else:
+            request = (voice, [index])
+            requests_.append(request)
+            open_packs[voice] = [request, length]
+    return turns, requests_
+
+
+def split_packed_audio(audio, sample_rate, parts, separator, alignment=None):
+    """
+    Cut the audio of a packed TTS request back into one clip per part.
+    
+    With an alignment each cut is placed halfway between the last character
+    of a part and the first character of the next one. Without it, the cut
+    is placed at the quietest 10 ms frame near the position expected from
+    the character count.
+    
+    Args:
+        audio (numpy.ndarray): Samples of the whole request.
+        sample_rate (int): Sample rate of audio.
+        parts (list): Texts joined with separator in the request.
+        separator (str): Separator used between the parts.
+        alignment (tuple): Optional (start_times, end_times) per character.
+    
+    Returns:
+        list: One numpy clip per part.
+    """
+    if len(parts) == 1:
+        return [audio]
+    
+    total_chars = sum(len(p) for p in parts) + len(separator) * (len(parts) - 1)
+    frame = max(1, int(sample_rate * 0.01))
+    energy = None
+    cuts = []
+    position = 0
+    for part in parts[:-1]:
+        sep_start = position + len(part)
+        sep_end = sep_start + len(separator)
+        position = sep_end
+        if alignment is not None:
+            starts, ends = alignment
+            cut_time = (ends[max(0, sep_start - 1)] + starts[min(len(starts) - 1, sep_end)]) / 2.0
+            cut = int(cut_time * sample_rate)
+        else:
+            if energy is None:
+                n_frames = len(audio) // frame
+                energy = np.sqrt(np.mean(
+                    np.square(audio[:n_frames * frame].reshape(n_frames, frame)), axis=1)) \
+                    if n_frames else np.zeros(0)
+            expected = int(len(audio) * (sep_start + sep_end) / 2.0 / total_chars) // frame
+            window = max(1, int(len(energy) * 0.15))
+            lo = max(0, expected - window)
+            hi = min(len(energy), expected + window + 1)
+            best = lo + int(np.argmin(energy[lo:hi])) if hi > lo else expected
+            cut = best * frame + frame // 2
+        cut = min(max(cut, cuts[-1] if cuts else 0), len(audio))
+        cuts.append(cut)
+    bounds = [0] + cuts + [len(audio)]
+    return [audio[bounds[i]:bounds[i + 1]] for i in range(len(parts))]
+
+
+def phrase_engine(backend):
+    """Cache namespace of a TTS engine: backend name plus output format ("" without a backend)."""
+    if backend is None:
+        return ""
+    output_format = getattr(backend, "output_format", None)
+    return f"{backend.name}-{output_format}" if output_format else backend.name
+
+
+class PhraseAudioLibrary:
+    """
+    Pre-synthesised, cached audio for phrases that recur in every show.
+    
+    Speaker name tags ("Priya", "Kirti"), the show intro/outro and common
+    leading fillers ("matlab", "dekhiye", ...) are synthesised once per voice,
+    kept in memory and on disk (one .npz per engine/voice/phrase), and spliced
+    in by generate_audio(). TTS requests then carry only the novel text of a line.
+    
+    Clips are cached per TTS engine (backend name and output format, see
+    phrase_engine()) together with their sample rate, and are resampled when
+    asked for at another rate, because local engines reuse the ElevenLabs
+    voice IDs and --tts-format changes the rate.
+    
+    Args:
+        cache_dir (str): Directory for the on-disk phrase cache. None keeps
+                     the cache in memory only.
+        fillers (iterable): Leading fillers to cut out of lines and splice
+                     from the cache (default Common_Fillers).
+        intro_text (str): Show intro spoken by the first voice, None to skip.
+        outro_text (str): Show outro spoken by the first voice, None to skip.
+    """
+    
+    def __init__(self, cache_dir=None, fillers=None, intro_text=None, outro_text=None):
+        self.cache_dir = cache_dir
+        self.fillers = tuple(fillers if fillers is not None else Common_Fillers)
+        self.intro_text = intro_text
+        self.outro_text = outro_text
+        self.stats = {"hits": 0, "misses": 0, "chars_saved": 0}
+        self._audio = {}
+        self._lock = threading.Lock()
+        # longest first so "sahi baat hai" wins over a shorter overlapping filler
+        alternatives = "|".join(re.escape(f) for f in sorted(self.fillers, key=len, reverse=True))
+        self._filler_re = re.compile(
+            r'^(?P<prefix>(?:<speaker_[A-Za-z0-9]+>\s*:?\s*)?["\']?\s*(?:\[[^\]]+\]\s*)*)'
+            r'(?P<filler>' + alternatives + r')\s*(?:,|\.\.\.|…)\s*(?P<rest>\S.*)$',
+            re.IGNORECASE | re.DOTALL) if self.fillers else None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+    
+    def _path(self, engine, voice_id, phrase):
+        digest = hashlib.sha1(f"{engine}|{TTS_Model_ID}|{phrase.lower()}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, safe_file_name(engine or "default"), str(voice_id),
+                            digest + ".npz")
+    
+    def get(self, voice_id, phrase, synthesize, count=True, backend=None, sample_rate=None):
+        """
+        Return the audio of a phrase for a voice, synthesising it on first use.
+        
+        Args:
+            voice_id (str): Voice ID.
+            phrase (str): Phrase text.
+            synthesize (callable): fn(voice_id, text) -> numpy array or None.
+            count (bool): Record the lookup in stats (False for warm-up).
+            backend (TTSBackend): Engine behind synthesize; clips of other
+                     engines are never reused.
+            sample_rate (int): Rate the caller needs (default backend.sample_rate).
+        
+        Returns:
+            numpy.ndarray or None: Cached samples.
+        """
+        engine = phrase_engine(backend)
+        target_rate = sample_rate or (backend.sample_rate if backend is not None else None)
+        key = (engine, voice_id, phrase.lower())
+        entry = self._audio.get(key)
+        if entry is None and self.cache_dir:
+            path = self._path(engine, voice_id, phrase)
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    entry = (data["audio"], int(data["sample_rate"]) or None)
+                self._audio[key] = entry
+        if entry is not None:
+            if count:
+                with self._lock:
+                    self.stats["hits"] += 1
+                    self.stats["chars_saved"] += len(phrase)
+                Metrics.inc("radio_cache_hits_total", cache="phrase")
+            return resample_audio(entry[0], entry[1], target_rate)
+        
+        audio = synthesize(voice_id, phrase)
+        with self._lock:
+            self.stats["misses"] += 1
+        if audio is None:
+            return None
+        # read after synthesis: espeak only knows its rate once it has run
+        entry = (np.asarray(audio, dtype=np.float32), backend.sample_rate if backend is not None else None)
+        self._audio[key] = entry
+        if self.cache_dir:
+            path = self._path(engine, voice_id, phrase)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(path, audio=entry[0], sample_rate=entry[1] or 0)
+        return resample_audio(entry[0], entry[1], target_rate)
+    
+    def warm(self, voice_phrases, synthesize, backend=None):
+        """
+        Pre-synthesise fillers, speaker tags and intro/outro per voice.
+        
+        Already cached phrases cost nothing; call once before a run.
+        
+        Args:
+            voice_phrases (dict): voice_id -> extra phrases for that voice,
+                     typically its speaker name tag.
+            synthesize (callable): fn(voice_id, text) -> numpy array or None.
+            backend (TTSBackend): Engine behind synthesize (see get()).
+        """
+        for index, (voice_id, extra) in enumerate(voice_phrases.items()):
+            phrases = list(self.fillers) + [p.strip() for p in extra if p and p.strip()]
+            if index == 0:
+                phrases += [p for p in (self.intro_text, self.outro_text) if p]
+            for phrase in phrases:
+                try:
+                    self.get(voice_id, phrase, synthesize, count=False, backend=backend)
+                except Exception as ex:
+                    print(f"Phrase pre-synthesis failed for '{phrase}': {ex}")
+    
+    def intro(self, voice_id, synthesize, backend=None):
+        """Return the cached show intro, or None when disabled."""
+        if not self.intro_text:
+            return None
+        return self.get(voice_id, self.intro_text, synthesize, backend=backend)
+    
+    def outro(self, voice_id, synthesize, backend=None):
+        """Return the cached show outro, or None when disabled."""
+        if not self.outro_text:
+            return None
+        return self.get(voice_id, self.outro_text, synthesize, backend=backend)
+    
+    def split_leading_filler(self, text):
+        """
+        Cut a leading filler off a dialogue line.
+        
+        Only fillers followed by a comma or ellipsis are cut, so the prosody
+        of the remaining text is not broken mid-phrase.
+        
+        Returns:
+            tuple: (filler or None, remaining text)
+        """
+        if self._filler_re is None:
+            return None, text
+        match = self._filler_re.match(text.strip())
+        if not match:
+            return None, text
+        return match.group("filler"), match.group("prefix") + match.group("rest")
+    
+    def splice_line(self, voice_id, speaker, text, synthesize, sample_rate=44100, backend=None):
+        """
+        Build the audio of one line from cached speaker tag and filler plus
+        freshly synthesised novel text.
+        
+        Args:
+            voice_id (str): Voice ID for the line.
+            speaker (str): Speaker name tag (e.g. 'Priya ').
+            text (str): Dialogue line.
+            synthesize (callable): fn(voice_id, text) -> numpy array or None.
+            sample_rate (int): Sample rate of the line (gap and cached clips).
+            backend (TTSBackend): Engine behind synthesize (see get()).
+        
+        Returns:
+            numpy.ndarray or None: Line audio, None if the novel text failed.
+        """
+        filler, rest = self.split_leading_filler(text)
+        gap = np.zeros(int(sample_rate * Splice_Gap_Seconds), dtype=np.float32)
+        parts = []
+        if speaker and speaker.strip():
+            tag = self.get(voice_id, speaker.strip(), synthesize, backend=backend, sample_rate=sample_rate)
+            if tag is not None:
+                parts.extend([tag, gap])
+        if filler:
+            audio = self.get(voice_id, filler, synthesize, backend=backend, sample_rate=sample_rate)
+            if audio is not None:
+                parts.extend([audio, gap])
+            else:
+                # cached filler unavailable, keep the words in the line
+                rest = text
+        
+        body = synthesize(voice_id, rest)
+        if body is None:
+            return None
+        parts.append(np.asarray(body, dtype=np.float32))
+        return np.concatenate(parts)
+
+
+class AudioSegmentStore:
+    """
+    Append-only on-disk store of per-line PCM, read back through np.memmap.
+    
+    Every segment is written as raw float32 samples to one data file
+    (<path>.pcm); a JSON index (<path>.json) maps segment keys to sample
+    offsets. Final assembly reads the segments through memory maps and
+    streams them to the output file block by block, so an episode never has
+    to fit in RAM. Re-rendering a line appends the new samples and moves the
+    index entry; compact() reclaims the space of replaced segments.
+    
+    Appends only update the index in memory; it is written by assemble(),
+    compact() and clear() (or save_index()), so an episode of thousands of
+    segments does not rewrite the JSON once per line.
+    
+    Each segment records the rate it was produced at, so a store filled by
+    several TTS engines stays correct: segments at another rate are
+    resampled to the store's output rate when assembled.
+    
+    Args:
+        path (str): Base path of the store (without extension).
+        sample_rate (int): Output sample rate (kept from an existing index).
+    """
+    
+    dtype = np.float32
+    
+    def __init__(self, path, sample_rate=44100):
+        self.data_path = path + ".pcm"
+        self.index_path = path + ".json"
+        self.sample_rate = sample_rate
+        self.segments = {}
+        self.order = []
+        self._lock = threading.Lock()
+        folder = os.path.dirname(os.path.abspath(self.data_path))
+        os.makedirs(folder, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as fh:
+                index = json.load(fh)
+            self.sample_rate = index.get("sample_rate", sample_rate)
+            # indexes written before per-segment rates hold (offset, length)
+            self.segments = {k: (v[0], v[1], v[2] if len(v) > 2 else self.sample_rate)
+                             for k, v in index.get("segments", {}).items()}
+            self.order = index.get("order", [])
+        if not os.path.exists(self.data_path):
+            open(self.data_path, "wb").close()
+    
+    def save_index(self):
+        """Write the offset index next to the data file."""
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"sample_rate": self.sample_rate, "segments": self.segments,
+                       "order": self.order}, fh)
+        os.replace(tmp, self.index_path)
+    
+    def append(self, key, samples, sample_rate=None):
+        """
+        Append (or replace) a segment.
+        
+        Args:
+            key (str): Segment key, e.g. "turn_00003".
+            samples (numpy.ndarray): Mono samples.
+            sample_rate (int): Rate of samples (default: the store's rate).
+        
+        Returns:
+            str: The key, for convenience.
+        """
+        data = np.ascontiguousarray(samples, dtype=self.dtype).reshape(-1)
+        with self._lock:
+            with open(self.data_path, "ab") as fh:
+                offset = fh.tell() // self.dtype().itemsize
+                fh.write(data.tobytes())
+            self.segments[key] = (offset, int(data.size), int(sample_rate or self.sample_rate))
+            if key not in self.order:
+                self.order.append(key)
+        return key
+    
+    def append_stream(self, key, chunks, sample_rate=None):
+        """
+        Append a segment chunk by chunk as it is produced (e.g. from
+        TTSBackend.stream()), without collecting the whole line in memory.
+        
+        Args:
+            key (str): Segment key.
+            chunks (iterable): numpy arrays of mono samples.
+            sample_rate (int): Rate of the chunks (default: the store's rate).
+        
+        Returns:
+            int: Samples written; 0 means nothing was produced and the key
+                 was not added.
+        """
+        with self._lock:
+            with open(self.data_path, "ab") as fh:
+                offset = fh.tell() // self.dtype().itemsize
+                length = 0
+                for chunk in chunks:
+                    data = np.ascontiguousarray(chunk, dtype=self.dtype).reshape(-1)
+                    fh.write(data.tobytes())
+                    length += int(data.size)
+            if length:
+                self.segments[key] = (offset, length, int(sample_rate or self.sample_rate))
+                if key not in self.order:
+                    self.order.append(key)
+        return length
+    
+    def view(self, key):
+        """
+        Return a read-only memory-mapped view of a segment.
+        
+        Args:
+            key (str): Segment key.
+        
+        Returns:
+            numpy.memmap: Segment samples (empty array for empty segments).
+        """
+        offset, length = self.segments[key][:2]
+        if length == 0:
+            return np.zeros(0, dtype=self.dtype)
+        return np.memmap(self.data_path, dtype=self.dtype, mode="r",
+                         offset=offset * self.dtype().itemsize, shape=(length,))
+    
+    def output_length(self, key):
+        """Samples of a segment once resampled to the store's output rate."""
+        _, length, rate = self.segments[key]
+        if rate == self.sample_rate or length == 0:
+            return length
+        return max(1, int(round(length * self.sample_rate / float(rate))))
+    
+    def duration(self, key=None):
+        """Seconds of audio in one segment, or in the current order."""
+        keys = [key] if key is not None else self.order
+        return sum(self.segments[k][1] / float(self.segments[k][2]) for k in keys)
+    
+    def assemble(self, output_file, order=None, gap_seconds=0.0, crossfade_seconds=0.0,
+                 block_samples=1 << 18, subtype="PCM_16"):
+        """
+        Stream the segments into one audio file without loading them into RAM.
+        
+        Args:
+            output_file (str): Output audio path (format from extension).
+            order (list): Segment keys to write (default: insertion order).
+            gap_seconds (float): Silence inserted between segments.
+            crossfade_seconds (float): Overlap between consecutive segments,
+                     used only when gap_seconds is 0.
+            block_samples (int): Samples copied per write.
+            subtype (str): soundfile subtype of the output.
+        
+        Returns:
+            int: Number of samples written.
+        """
+        order = list(order if order is not None else self.order)
+        with self._lock:
+            self.save_index()
+        gap = np.zeros(int(self.sample_rate * gap_seconds), dtype=self.dtype)
+        fade = 0 if gap.size else int(self.sample_rate * crossfade_seconds)
+        written = 0
+        
+        with sf.SoundFile(output_file, "w", samplerate=self.sample_rate, channels=1,
+                          subtype=subtype) as out:
+            def write_range(segment, start, stop):
+                nonlocal written
+                for pos in range(start, stop, block_samples):
+                    block = np.asarray(segment[pos:min(stop, pos + block_samples)])
+                    out.write(block)
+                    written += block.size
+            
+            carry = None
+            for index, key in enumerate(order):
+                segment = self.view(key)
+                if self.segments[key][2] != self.sample_rate:
+                    segment = resample_audio(segment, self.segments[key][2], self.sample_rate)
+                start = 0
+                if index and gap.size:
+                    out.write(gap)
+                    written += gap.size
+                if carry is not None and carry.size:
+                    n = min(carry.size, segment.size)
+                    write_range(carry, 0, carry.size - n)
+                    if n:
+                        ramp = np.linspace(0.0, 1.0, n, dtype=self.dtype)
+                        mixed = carry[carry.size - n:] * (1 - ramp) + np.asarray(segment[:n]) * ramp
+                        out.write(mixed)
+                        written += n
+                    start = n
+                    carry = None
+                
+                keep = min(fade, segment.size - start) if fade else 0
+                write_range(segment, start, segment.size - keep)
+                if keep:
+                    carry = np.array(segment[segment.size - keep:])
+            
+            if carry is not None and carry.size:
+                write_range(carry, 0, carry.size)
+        return written
+    
+    def clear(self, sample_rate=None):
+        """
+        Drop every segment and truncate the data file (start of a new render).
+        
+        Args:
+            sample_rate (int): New output rate (default: keep the current one).
+        """
+        with self._lock:
+            open(self.data_path, "wb").close()
+            self.segments = {}
+            self.order = []
+            if sample_rate:
+                self.sample_rate = sample_rate
+            self.save_index()
+    
+    def compact(self):
+        """Rewrite the data file with only the segments still in the index."""
+        with self._lock:
+            tmp = self.data_path + ".tmp"
+            new_segments = {}
+            with open(tmp, "wb") as fh:
+                for key, (offset, length, rate) in self.segments.items():
+                    new_segments[key] = (fh.tell() // self.dtype().itemsize, length, rate)
+                    if length:
+                        fh.write(np.asarray(self.view(key)).tobytes())
+            os.replace(tmp, self.data_path)
+            self.segments = new_segments
+            self.save_index()
+
+
+def timeline_offsets(lengths, gap_samples=0, fade_samples=0):
+    """
+    Sample offsets of each chunk in the assembled audio.
+    
+    Mirrors the layout of AudioSegmentStore.assemble(): gap_samples of
+    silence between chunks, or fade_samples of overlap when there is no gap.
+    Only the chunk lengths are needed, so this costs nothing at assembly time.
+    
+    Args:
+        lengths (list): Samples per chunk, in playback order.
+        gap_samples (int): Silence between chunks.
+        fade_samples (int): Crossfade overlap (ignored when gap_samples > 0).
+    
+    Returns:
+        list: (start, end) sample offsets per chunk.
+    """
+    fade = 0 if gap_samples else fade_samples
+    offsets = []
+    position = 0
+    carry = 0
+    for index, length in enumerate(lengths):
+        if index and gap_samples:
+            position += gap_samples
+        overlap = min(carry, length)
+        position += carry - overlap
+        start = position
+        position += overlap
+        keep = min(fade, length - overlap) if fade else 0
+        position += length - overlap - keep
+        carry = keep
+        offsets.append((start, start + length))
+    return offsets
+
+
+def build_transcript(labels, offsets, sample_rate):
+    """
+    Turn chunk labels and offsets into transcript entries.
+    
+    Args:
+        labels (list): (speaker, text) per chunk, None for unlabelled chunks.
+        offsets (list): (start, end) samples per chunk from timeline_offsets().
+        sample_rate (int): Sample rate of the audio.
     
-    if stlit:
-        with st.spinner("Hinglish Conversion ongoing... please wait ⏳"):
-            for sentence in data:
-                try:
-                    Conversation=llm.invoke([{"role": "system", "content": prompt}, {"role": "user", "content": sentence}])
-                    if Conversation and len(str(Conversation).strip()) > 0:
-                        HinglishData.append(Conversation)
-                    else:
-                        if stlit:
-                            st.warning(f"Empty response for sentence: {sentence[:50]}...")
-                        print(f"Warning: Empty LLM response for sentence: {sentence[:50]}...")
-                except Exception as ex:
-                    if stlit:
-                        st.error(f"Failed to convert sentence: {sentence[:50]}... Error: {str(ex)}")
-                    print(f"Error processing sentence '{sentence[:50]}...': {ex}")
-                    # Continue with next sentence instead of failing completely
-                    continue
-    else:
-        for sentence in data:
+    Returns:
+        list: Dicts with index, speaker, text, start and end (seconds).
+    """
+    entries = []
+    for label, (start, end) in zip(labels, offsets):
+        if not label:
+            continue
+        speaker, text = label
+        text = strip_audio_cues(str(text or ""))
+        if not text:
+            continue
+        entries.append({
+            "index": len(entries) + 1,
+            "speaker": str(speaker).strip(),
+            "text": text,
+            "start": round(start / float(sample_rate), 3),
+            "end": round(end / float(sample_rate), 3),
+        })
+    return entries
+
+
+def _subtitle_time(seconds, separator):
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def format_srt(entries):
+    """Render transcript entries as SubRip (.srt) text."""
+    blocks = []
+    for entry in entries:
+        blocks.append(f"{entry['index']}\n"
+                      f"{_subtitle_time(entry['start'], ',')} --> {_subtitle_time(entry['end'], ',')}\n"
+                      f"{entry['speaker']}: {entry['text']}\n")
+    return "\n".join(blocks)
+
+
+def format_vtt(entries):
+    """Render transcript entries as WebVTT (.vtt) text with voice spans."""
+    blocks = ["WEBVTT\n"]
+    for entry in entries:
+        blocks.append(f"{_subtitle_time(entry['start'], '.')} --> {_subtitle_time(entry['end'], '.')}\n"
+                      f"<v {entry['speaker']}>{entry['text']}\n")
+    return "\n".join(blocks)
+
+
+def write_transcripts(output_file, entries, sample_rate, formats=("srt", "vtt", "json")):
+    """
+    Write transcripts next to an audio file (same name, new extension).
+    
+    Returns:
+        list: Paths written.
+    """
+    base = os.path.splitext(output_file)[0]
+    paths = []
+    for fmt in formats:
+        path = f"{base}.{fmt}"
+        if fmt == "srt":
+            content = format_srt(entries)
+        elif fmt == "vtt":
+            content = format_vtt(entries)
+        elif fmt == "json":
+            content = json.dumps({
+                "audio": os.path.basename(output_file),
+                "sample_rate": sample_rate,
+                "duration": entries[-1]["end"] if entries else 0.0,
+                "turns": entries,
+            }, ensure_ascii=False, indent=2)
+        else:
+            raise ValueError(f"Unknown transcript format: {fmt}")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(content)
+        paths.append(path)
+    return paths
+
+
+def generate_audio(AudioData,Keys,phrase_library=None,dedup=None,output_file=None,
+                   segment_store=None,gap_seconds=0.0,crossfade_seconds=0.0,
+                   backend=None,tts_workers=1,pack_lines=False,transcript=False,cast=None):
+    """
+    Generate audio file from Hinglish text using ElevenLabs TTS API.
+    
+    Converts a list of Hinglish conversation lines into speech using ElevenLabs
+    text-to-speech API. Alternates between two different voices to create a
+    realistic dialogue between two speakers. Combines all audio chunks into
+    a single WAV file.
+    
+    Args:
+        AudioData (list): A list of strings containing Hinglish conversation lines
+                         to convert to speech. Each line will be spoken by
+                         alternating voices.
+        Keys (tuple): A tuple containing (api_key, voice_id_A, voice_id_B, ...)
+                     from Get_Key_Env_varibles(); see show_cast() for
+                     more speakers and voice pools.
+        phrase_library (PhraseAudioLibrary): Optional cache of pre-synthesised
+                     speaker tags, fillers and intro/outro. When given, those
+                     are spliced in and only the novel text goes to the API.
+        dedup (SingleFlight): Optional dedup index; identical (voice, text)
+                     requests are synthesised only once per run.
+        output_file (str): Output path (default GeneratedAudio.wav in the
+                     current working directory).
+        segment_store (AudioSegmentStore): Optional on-disk store. When given,
+                     each line is appended to the store instead of being kept
+                     in RAM, and the file is assembled through memory maps.
+        gap_seconds (float): Silence between lines (segment store only).
+        crossfade_seconds (float): Crossfade between lines (segment store only).
+        backend (TTSBackend): TTS engine (default: ElevenLabs with Keys[0]).
+        tts_workers (int): Lines synthesized in parallel (order is kept).
+        pack_lines (bool): Merge same-speaker turns and pack short turns into
+                     shared TTS requests (see plan_tts_requests()); ignored
+                     with a phrase_library.
+        transcript (bool): Also write .srt, .vtt and .json transcripts next to
+                     output_file, timed from the chunk lengths.
+        cast (list): The show's show_cast(), if the caller already picked it
+                     (default: picked here and released when done).
+    
+    Returns:
+        None: The function saves the audio file but doesn't return a value.
+    
+    Output:
+        Creates "GeneratedAudio.wav" in the current working directory with:
+        - Sample rate: the TTS engine's rate (24000 Hz with the default TTS_Output_Format)
+        - Format: PCM_16 WAV
+        - Mono audio (stereo converted to mono)
+    """
+    casting = contextlib.ExitStack()
+    try:
+        if not AudioData or len(AudioData) == 0:
+            if stlit:
+                st.error("Invalid audio data: must be a non-empty list")
+            print("Error: Invalid AudioData input")
+            return
+        
+        if stlit:
+            st.write("Audio generation started : " + str(datetime.now().strftime("%H:%M:%S")))
+        else:
+            print("Audio generation started : " + str(datetime.now().strftime("%H:%M:%S")))
+
+        if backend is None:
             try:
-                Conversation=llm.invoke([{"role": "system", "content": prompt}, {"role": "user", "content": sentence}])
-                if Conversation and len(str(Conversation).strip()) > 0:
-                    HinglishData.append(Conversation)
-                else:
-                    print(f"Warning: Empty LLM response for sentence: {sentence[:50]}...")
+                backend = ElevenLabsTTSBackend(Keys[0])
             except Exception as ex:
-                print(f"Error processing sentence '{sentence[:50]}...': {ex}")
-                # Continue with next sentence instead of failing completely
-                continue
+                if stlit:
+                    st.error(f"Failed to initialize ElevenLabs client: {str(ex)}")
+                print(f"ElevenLabs initialization error: {ex}")
+                return
+        
+        audio_chunks = []
+        chunk_labels = []
+        sample_rate = backend.sample_rate
+        metered = instrumented_synthesize(backend)
+        if dedup is None:
+            synthesize = metered
+        else:
+            synthesize = lambda voice_id, text: dedup.do(
+                dedup_key("tts", backend.name, TTS_Model_ID, voice_id, text, casefold=False),
+                lambda: metered(voice_id, text))
+        
+        if segment_store is not None:
+            # keys restart at turn_00000: the segments of an earlier run are dead weight
+            segment_store.clear(sample_rate)
+        
+        def add_chunk(audio_np, label=None):
+            chunk_labels.append(label)
+            if segment_store is None:
+                audio_chunks.append(audio_np)
+            else:
+                audio_chunks.append(segment_store.append(f"turn_{len(audio_chunks):05d}", audio_np,
+                                                         sample_rate))
+        
+        speakers = casting.enter_context(cast_of_show(Keys, cast))
+        host_voice, host_name = speakers[0][0], speakers[0][1].strip()
+        if phrase_library is not None:
+            phrase_library.warm({voice: [speaker.strip()] for voice, speaker in speakers}, synthesize,
+                                backend=backend)
+            intro = phrase_library.intro(host_voice, synthesize, backend=backend)
+            if intro is not None:
+                add_chunk(intro, (host_name, phrase_library.intro_text))
+        
+        # speakers take turns: A, B, (C, ...), A, ...
+        jobs = []
+        for index, audioLine in enumerate(AudioData):
+            voice, speaker = speakers[index % len(speakers)]
+            jobs.append((voice, speaker, str(audioLine)))
+        
+        def render_line(job):
+            voice, speaker, audioLine = job
+            try:
+                if phrase_library is None:
+                    return synthesize(voice, speaker + audioLine)
+                return phrase_library.splice_line(voice, speaker, audioLine,
+                                                  synthesize, sample_rate, backend=backend)
+            except Exception as ex:
+                print(f" Error processing voice {audioLine}: {ex}")
+                return None
+        
+        with profile_stage("tts"):
+            if pack_lines and phrase_library is None:
+                turns, tts_requests = plan_tts_requests(jobs)
+                print(f"Line packing: {len(jobs)} lines in {len(tts_requests)} TTS requests")
+                separator = backend.pack_separator
+                turn_audio = [None] * len(turns)
+            
+                def render_request(request):
+                    voice, indices = request
+                    parts = [turns[i][1] + turns[i][2] for i in indices]
+                    text = separator.join(parts)
+                    Metrics.inc("radio_tts_requests_total", backend=backend.name)
+                    Metrics.inc("radio_tts_characters_total", len(text), backend=backend.name)
+                    try:
+                        if dedup is None:
+                            audio_np, alignment = backend.synthesize_aligned(voice, text)
+                        else:
+                            audio_np, alignment = dedup.do(
+                                dedup_key("tts-aligned", backend.name, TTS_Model_ID, voice, text,
+                                          casefold=False),
+                                lambda: backend.synthesize_aligned(voice, text))
+                    except Exception as ex:
+                        print(f" Error processing voice {text}: {ex}")
+                        return
+                    if audio_np is None:
+                        return
+                    for i, clip in zip(indices, split_packed_audio(audio_np, sample_rate, parts,
+                                                                   separator, alignment)):
+                        turn_audio[i] = clip
+            
+                if tts_workers > 1:
+                    with ContextThreadPoolExecutor(max_workers=tts_workers) as pool:
+                        list(pool.map(render_request, tts_requests))
+                else:
+                    for request in tts_requests:
+                        render_request(request)
+                rendered = turn_audio
+                labels = [(speaker, text) for _, speaker, text in turns]
+            elif segment_store is not None and phrase_library is None and dedup is None and tts_workers <= 1:
+                # stream samples straight from the API into the store, line by line
+                for voice, speaker, audioLine in jobs:
+                    if run_cancelled():
+                        break
+                    key = f"turn_{len(audio_chunks):05d}"
+                    Metrics.inc("radio_tts_requests_total", backend=backend.name)
+                    Metrics.inc("radio_tts_characters_total", len(speaker + audioLine), backend=backend.name)
+                    try:
+                        if segment_store.append_stream(key, backend.stream(voice, speaker + audioLine),
+                                                       sample_rate):
+                            audio_chunks.append(key)
+                            chunk_labels.append((speaker, audioLine))
+                            print(f" Valid chunks: {len(audio_chunks)}")
+                        else:
+                            print(" Skipped invalid chunk")
+                    except Exception as ex:
+                        print(f" Error processing voice {audioLine}: {ex}")
+                rendered = []
+                labels = []
+            elif tts_workers > 1:
+                with ContextThreadPoolExecutor(max_workers=tts_workers) as pool:
+                    rendered = pool.map(render_line, jobs)
+            else:
+                rendered = map(render_line, jobs)
+        
+            if not pack_lines or phrase_library is not None:
+                labels = [(speaker, audioLine) for _, speaker, audioLine in jobs]
+            for audio_np, label in zip(rendered, labels):
+                if audio_np is None:
+                    print(" Skipped invalid chunk")
+                    continue
+            
+                add_chunk(audio_np, label)
+                print(f" Valid chunks: {len(audio_chunks)}")
 
-    # Check if we have any valid data after processing
-    if not HinglishData or len(HinglishData) == 0:
-        error_msg = "No valid Hinglish conversion data generated. All sentences may have failed."
+        if run_cancelled():
+            print(f"Run cancelled ({active_deadline().reason}): keeping {len(audio_chunks)} of "
+                  f"{len(jobs)} lines")
+        elif phrase_library is not None and audio_chunks:
+            outro = phrase_library.outro(host_voice, synthesize, backend=backend)
+            if outro is not None:
+                add_chunk(outro, (host_name, phrase_library.outro_text))
+            print(f"Phrase library: {phrase_library.stats}")
+
+        if not audio_chunks:
+            if stlit:
+                st.error("No valid audio chunks generated. Please check your API key and try again.")
+            print("Error: No valid audio chunks to merge")
+            return
+
+        try:
+            if output_file is None:
+                script_dir = os.getcwd()
+                output_file = os.path.join(script_dir, "GeneratedAudio.wav")
+            with profile_stage("write"):
+                if segment_store is None:
+                    final_audio = sanitize_audio_batch(audio_chunks, concatenate=True)
+                    sf.write(output_file, final_audio, sample_rate, subtype="PCM_16")
+                else:
+                    segment_store.assemble(output_file, order=audio_chunks, gap_seconds=gap_seconds,
+                                           crossfade_seconds=crossfade_seconds)
+            if transcript:
+                if segment_store is None:
+                    lengths = [len(chunk) for chunk in audio_chunks]
+                    offsets = timeline_offsets(lengths)
+                else:
+                    sample_rate = segment_store.sample_rate
+                    lengths = [segment_store.output_length(key) for key in audio_chunks]
+                    gap = int(sample_rate * gap_seconds)
+                    offsets = timeline_offsets(lengths, gap, 0 if gap else int(sample_rate * crossfade_seconds))
+                entries = build_transcript(chunk_labels, offsets, sample_rate)
+                for path in write_transcripts(output_file, entries, sample_rate):
+                    print(f"Transcript written {path}")
+            if stlit:
+                st.write(f"Audio file generated {output_file}")
+            else:
+                print(f"Audio file generated {output_file}")
+            
+                
+        except Exception as ex:
+            if stlit:
+                st.error(f"Error merging audio chunks: {str(ex)}")
+            print(f"Error merging audio: {ex}")
+            
+    except Exception as ex:
+        error_msg = f"Error in audio generation: {str(ex)}"
+        
         if stlit:
             st.error(error_msg)
-        print(error_msg)
-        return []
+        print(error_msg)  
+    finally:
+        casting.close()
+
+
+_script_tag_re = re.compile(r'^<speaker_[A-Za-z0-9]+>\s*:?\s*')
+
+
+def script_text(line):
+    """Text of a dialogue line for script.txt: no <speaker_X> tag, no wrapping quotes."""
+    text = _script_tag_re.sub("", " ".join(str(line).split()))
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        text = text[1:-1].strip()
+    return text
+
+
+class EpisodeProject:
+    """
+    Editable episode on disk, re-rendered incrementally after script edits.
     
-    print("Hinglish conversion Done : " + str(datetime.now().strftime("%H:%M:%S")))
-    if stlit:
-        st.write("Hinglish conversion Done : " + str(datetime.now().strftime("%H:%M:%S")))
+    Layout of a project directory:
+        episode.json   topic, article chunks, speaker voices, script turns
+                       with their audio keys, and assembly parameters
+        script.txt     the dialogue, one "Speaker: text" turn per line (edit this)
+        segments.pcm/.json
+                       AudioSegmentStore with the audio of every turn
+        episode.wav    assembled output
+    
+    Turn audio is content addressed (voice, engine and text), so after an
+    edit render() synthesises only turns whose key is not in the store yet
+    and re-splices the output from memory maps; unchanged, moved or
+    reverted turns are reused. The episode keeps the sample rate of its
+    first render; turns voiced later by an engine with another rate are
+    resampled on assembly.
+    
+    Args:
+        project_dir (str): Project directory (created if missing).
+    """
+    
+    def __init__(self, project_dir):
+        self.project_dir = project_dir
+        os.makedirs(project_dir, exist_ok=True)
+        self.meta_path = os.path.join(project_dir, "episode.json")
+        self.script_path = os.path.join(project_dir, "script.txt")
+        self.data = {"version": 1, "topic": None, "article": [], "voices": {}, "turns": [],
+                     "assembly": {"gap_seconds": 0.0, "crossfade_seconds": 0.0,
+                                  "output_file": "episode.wav"}}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding="utf-8") as fh:
+                self.data = json.load(fh)
+        self.store = AudioSegmentStore(os.path.join(project_dir, "segments"))
+    
+    @property
+    def output_file(self):
+        return os.path.join(self.project_dir, self.data["assembly"]["output_file"])
+    
+    def save(self):
+        """Write episode.json (atomically) and script.txt."""
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.data, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.meta_path)
+        with open(self.script_path, "w", encoding="utf-8") as fh:
+            for turn in self.data["turns"]:
+                fh.write(f"{turn['speaker']}: {turn['text']}\n")
+    
+    def set_script(self, topic, article, lines, Keys, gap_seconds=0.0, crossfade_seconds=0.0):
+        """
+        Start a project from a generated show (speakers take turns like generate_audio).
+        
+        Args:
+            topic (str): Wikipedia topic.
+            article (list): Text chunks sent to the LLM.
+            lines (list): Dialogue lines from hinglish_converter().
+            Keys (tuple): (api_key, voice_id_A, voice_id_B, ...).
+            gap_seconds (float): Silence between turns.
+            crossfade_seconds (float): Crossfade between turns.
+        """
+        with cast_of_show(Keys) as cast:
+            speakers = [speaker.strip() for _, speaker in cast]
+        self.data.update(topic=topic, article=list(article),
+                         voices={speaker.strip(): voice for voice, speaker in cast})
+        self.data["assembly"].update(gap_seconds=gap_seconds, crossfade_seconds=crossfade_seconds)
+        self.data["turns"] = [{"speaker": speakers[i % len(speakers)], "text": script_text(line),
+                               "key": None}
+                              for i, line in enumerate(lines)]
+        self.save()
+    
+    def read_script(self, path=None):
+        """
+        Parse an edited script file.
+        
+        Returns:
+            list: Turns as dicts with speaker and text.
+        """
+        turns = []
+        with open(path or self.script_path, encoding="utf-8") as fh:
+            for number, line in enumerate(fh, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                speaker, colon, text = line.partition(":")
+                speaker = speaker.strip()
+                if not colon or speaker not in self.data["voices"]:
+                    raise ValueError(f"script line {number}: expected 'Speaker: text' with one of "
+                                     f"{', '.join(self.data['voices'])}")
+                turns.append({"speaker": speaker, "text": script_text(text), "key": None})
+        return turns
+    
+    def turn_key(self, backend, turn):
+        """Content key of a turn's audio."""
+        voice = self.data["voices"][turn["speaker"]]
+        return "t_" + dedup_key("turn", backend.name, TTS_Model_ID, voice, turn["speaker"], turn["text"],
+                                 casefold=False)[:20]
+    
+    def render(self, backend, turns=None, transcript=False):
+        """
+        Bring the episode audio in line with the script.
+        
+        Args:
+            backend (TTSBackend): TTS engine.
+            turns (list): New script turns (default: the stored script).
+            transcript (bool): Also write .srt/.vtt/.json transcripts.
+        
+        Returns:
+            dict: turns, synthesized, reused, failed and the changed turn indices.
+        """
+        old_keys = [t.get("key") for t in self.data["turns"]]
+        turns = [dict(t) for t in (turns if turns is not None else self.data["turns"])]
+        if not self.store.segments:
+            self.store.sample_rate = backend.sample_rate
+        
+        report = {"turns": len(turns), "synthesized": 0, "reused": 0, "failed": 0, "changed": []}
+        synthesize = instrumented_synthesize(backend)
+        for index, turn in enumerate(turns):
+            key = self.turn_key(backend, turn)
+            turn["key"] = key
+            if key in self.store.segments:
+                report["reused"] += 1
+                Metrics.inc("radio_cache_hits_total", cache="episode")
+                continue
+            report["changed"].append(index)
+            voice = self.data["voices"][turn["speaker"]]
+            try:
+                audio_np = synthesize(voice, f"{turn['speaker']} {turn['text']}")
+            except Exception as ex:
+                print(f" Error processing voice {turn['text']}: {ex}")
+                audio_np = None
+            if audio_np is None:
+                report["failed"] += 1
+                turn["key"] = None
+                continue
+            self.store.append(key, audio_np, backend.sample_rate)
+            report["synthesized"] += 1
+        
+        diff = difflib.SequenceMatcher(a=old_keys, b=[t["key"] for t in turns], autojunk=False)
+        report["edits"] = sum(1 for op in diff.get_opcodes() if op[0] != "equal")
+        
+        self.data["turns"] = turns
+        order = [t["key"] for t in turns if t["key"]]
+        assembly = self.data["assembly"]
+        self.store.order = order
+        self.store.save_index()
+        self.store.assemble(self.output_file, order=order, gap_seconds=assembly["gap_seconds"],
+                            crossfade_seconds=assembly["crossfade_seconds"])
+        if transcript:
+            gap = int(self.store.sample_rate * assembly["gap_seconds"])
+            offsets = timeline_offsets([self.store.output_length(k) for k in order], gap,
+                                       0 if gap else int(self.store.sample_rate * assembly["crossfade_seconds"]))
+            labels = [(t["speaker"], t["text"]) for t in turns if t["key"]]
+            write_transcripts(self.output_file, build_transcript(labels, offsets, self.store.sample_rate),
+                              self.store.sample_rate)
+        self.save()
+        print(f"Episode rendered: {report['synthesized']} turns synthesized, "
+              f"{report['reused']} reused -> {self.output_file}")
+        return report
+    
+    def rerender(self, backend, script_path=None, transcript=False):
+        """Re-render after the script file was edited."""
+        return self.render(backend, self.read_script(script_path), transcript=transcript)
+    
+    def prune(self):
+        """Drop audio of turns no longer in the script and compact the store."""
+        live = {t["key"] for t in self.data["turns"] if t.get("key")}
+        for key in [k for k in self.store.segments if k not in live]:
+            del self.store.segments[key]
+        self.store.order = [k for k in self.store.order if k in live]
+        self.store.compact()
 
-    Sent_token = sentence_splitter(HinglishData)
-    return Sent_token
 
+def safe_file_name(topic):
+    """Turn a topic into a file name safe on Windows and Linux."""
+    name = re.sub(r'[^A-Za-z0-9._-]+', '_', topic.strip()).strip('_')
+    return name or "topic"
 
-def sanitize_audio(audio_np):
+
+def run_variants(topic, variants, Keys, output_dir, show_kwargs=None, phrase_library=None,
+                 backend=None, tts_workers=1, llm_backend=None, validator=None):
     """
-    Sanitize and normalize audio numpy array for processing.
+    Produce several variants of one topic (languages or styles) from one fetch.
     
-    Processes raw audio data to ensure it's in the correct format for
-    concatenation and file writing. Converts stereo to mono, handles edge
-    cases like empty arrays or scalars, and reshapes to 1D array.
+    The article is fetched and split once; every variant then runs its own
+    prompt through the LLM stage and its own TTS stage concurrently. LLM
+    results are deduplicated per variant (the dedup key includes the
+    prompt) and TTS results across variants, so repeated lines, speaker
+    tags and intro/outro are synthesised once.
     
     Args:
-        audio_np (numpy.ndarray or None): Raw audio data as numpy array.
-                                         Can be mono or stereo, or None.
+        topic (str): Wikipedia topic.
+        variants (list): Variant names, see variant_prompt().
+        Keys (tuple): (api_key, voice_id_A, voice_id_B, ...).
+        output_dir (str): Directory for <topic>_<variant>.wav files and
+                          <topic>_variants.json.
+        show_kwargs (dict): Extra arguments for build_show_corpus().
+        phrase_library (PhraseAudioLibrary): Optional phrase cache.
+        backend (TTSBackend): TTS engine shared by all variants (default ElevenLabs).
+        tts_workers (int): Lines synthesized in parallel per variant.
+        llm_backend (LLMBackend): LLM engine shared by all variants (default Ollama).
+        validator (ScriptValidator): Output check for the "hinglish" variant
+                     (the other variants are not Hinglish, so it would reject them).
+    
+    Returns:
+        dict: Run report with per-variant status, or None if the fetch failed.
+    """
+    prompts = {name: variant_prompt(name) for name in variants}
+    os.makedirs(output_dir, exist_ok=True)
+    if llm_backend is None:
+        llm_backend = OllamaBackend()
+    started = time.perf_counter()
+    Corpus_token = build_show_corpus(topic, **(show_kwargs or {}))
+    if not Corpus_token:
+        return None
+    llm_dedup = SingleFlight("llm")
+    tts_dedup = SingleFlight("tts")
+    
+    def run_variant(name):
+        Sent_token = hinglish_converter(Corpus_token, dedup=llm_dedup, backend=llm_backend,
+                                        validator=validator if name == "hinglish" else None,
+                                        prompt=prompts[name])
+        if not Sent_token:
+            return "llm failed"
+        output_file = os.path.join(output_dir, f"{safe_file_name(topic)}_{safe_file_name(name)}.wav")
+        generate_audio(Sent_token, Keys, phrase_library=phrase_library,
+                       dedup=tts_dedup, output_file=output_file,
+                       backend=backend, tts_workers=tts_workers)
+        return "ok" if os.path.exists(output_file) else "audio failed"
+    
+    results = {}
+    with ContextThreadPoolExecutor(max_workers=max(1, len(prompts))) as pool:
+        futures = {name: pool.submit(run_variant, name) for name in prompts}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as ex:
+                results[name] = f"error: {ex}"
+    
+    report = {
+        "topic": topic,
+        "variants": results,
+        "sentences": len(Corpus_token),
+        "seconds": round(time.perf_counter() - started, 2),
+        "llm": llm_dedup.stats(),
+        "tts": tts_dedup.stats(),
+    }
+    with open(os.path.join(output_dir, f"{safe_file_name(topic)}_variants.json"), "w",
+              encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Variants done: {json.dumps(report)}")
+    return report
+
+
+def run_batch(topics, Keys, output_dir, workers=4, show_kwargs=None, phrase_library=None,
+              backend=None, tts_workers=1, llm_backend=None):
+    """
+    Generate one show per topic concurrently, sharing a dedup index.
+    
+    Related Wikipedia summaries share boilerplate sentences and LLM replies
+    repeat lines, so a single SingleFlight index for the LLM stage and one for
+    the TTS stage is shared by all topics: identical in-flight requests are
+    coalesced and completed ones are reused.
+    
+    Args:
+        topics (list): Wikipedia topics.
+        Keys (tuple): (api_key, voice_id_A, voice_id_B).
+        output_dir (str): Directory for <topic>.wav files and run_report.json.
+        workers (int): Topics processed in parallel.
+        show_kwargs (dict): Extra arguments for build_show_corpus().
+        phrase_library (PhraseAudioLibrary): Optional phrase cache.
+        backend (TTSBackend): TTS engine shared by all topics (default ElevenLabs).
+        tts_workers (int): Lines synthesized in parallel per topic.
+        llm_backend (LLMBackend): LLM engine shared by all topics (default Ollama).
+    
+    Returns:
+        dict: Run report with per-topic status and duplicates saved.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    show_kwargs = show_kwargs or {}
+    if llm_backend is None:
+        llm_backend = OllamaBackend()
+    llm_dedup = SingleFlight("llm")
+    tts_dedup = SingleFlight("tts")
+    started = time.perf_counter()
+    
+    def run_topic(topic):
+        Corpus_token = build_show_corpus(titles[topic], resolved=index is not None, **show_kwargs)
+        if not Corpus_token:
+            return "fetch failed"
+        Sent_token = hinglish_converter(Corpus_token, dedup=llm_dedup, backend=llm_backend)
+        if not Sent_token:
+            return "llm failed"
+        output_file = os.path.join(output_dir, safe_file_name(topic) + ".wav")
+        generate_audio(Sent_token, Keys, phrase_library=phrase_library,
+                       dedup=tts_dedup, output_file=output_file,
+                       backend=backend, tts_workers=tts_workers)
+        return "ok" if os.path.exists(output_file) else "audio failed"
+    
+    results = {}
+    titles = {topic: topic for topic in topics}
+    index = get_title_index()
+    if index is not None:
+        # resolve once: bad topics are rejected before they take a worker and
+        # LLM/TTS capacity, good ones are fetched by their canonical title
+        for topic in topics:
+            resolved = index.resolve(topic)
+            if resolved["title"] is None:
+                results[topic] = f"rejected: {resolved['match']}"
+            else:
+                titles[topic] = resolved["title"]
+        topics = [topic for topic in topics if topic not in results]
+    with ContextThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {topic: pool.submit(run_topic, topic) for topic in topics}
+        for topic, future in futures.items():
+            try:
+                results[topic] = future.result()
+            except Exception as ex:
+                results[topic] = f"error: {ex}"
+    
+    llm_stats = llm_dedup.stats()
+    tts_stats = tts_dedup.stats()
+    report = {
+        "topics": results,
+        "seconds": round(time.perf_counter() - started, 2),
+        "llm": llm_stats,
+        "tts": tts_stats,
+        "duplicates_saved": llm_stats["duplicates_saved"] + tts_stats["duplicates_saved"],
+        "llm_tokens_per_sec": round(llm_backend.tokens_per_second(), 2),
+    }
+    with open(os.path.join(output_dir, "run_report.json"), "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Batch done: {json.dumps(report)}")
+    return report
+
+
+class JitterBuffer:
+    """
+    Small real-time audio buffer between the pipeline and live listeners.
+    
+    The producer push()es line audio as soon as TTS returns it; the
+    broadcaster pull()s fixed size blocks at playback rate. When the
+    pipeline falls behind, the gap is covered with silence and, if the
+    starvation lasts longer than filler_after_seconds, with one of the
+    pre-synthesised filler clips.
+    
+    Args:
+        sample_rate (int): Sample rate of all pushed audio.
+        fillers (list): Optional numpy clips played to cover long gaps.
+        filler_after_seconds (float): Starvation before a filler is used.
+    """
+    
+    def __init__(self, sample_rate, fillers=None, filler_after_seconds=1.0):
+        self.sample_rate = sample_rate
+        self.fillers = [np.asarray(f, dtype=np.float32) for f in (fillers or []) if f is not None]
+        self.filler_after_seconds = filler_after_seconds
+        self.underrun_samples = 0
+        self.filler_plays = 0
+        self.pushed_samples = 0
+        self.closed = False
+        self._chunks = deque()
+        self._offset = 0
+        self._buffered = 0
+        self._starved = 0
+        self._filler_index = 0
+        self._lock = threading.Lock()
+    
+    def push(self, samples):
+        """Queue mono float32 samples for playback."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if not samples.size:
+            return
+        with self._lock:
+            self._chunks.append(samples)
+            self._buffered += samples.size
+            self.pushed_samples += samples.size
+    
+    def close(self):
+        """Mark the end of the show; no fillers are played after this."""
+        self.closed = True
+    
+    def buffered_seconds(self):
+        """Seconds of audio waiting to be played."""
+        with self._lock:
+            return self._buffered / float(self.sample_rate)
+    
+    def drained(self):
+        """True once the show is closed and everything was played."""
+        with self._lock:
+            return self.closed and self._buffered == 0
+    
+    def pull(self, n):
+        """
+        Take exactly n samples for playback, padding an underrun with silence.
+        
+        Returns:
+            numpy.ndarray: n float32 samples.
+        """
+        out = np.zeros(n, dtype=np.float32)
+        filled = 0
+        with self._lock:
+            while filled < n and self._chunks:
+                chunk = self._chunks[0]
+                take = min(n - filled, chunk.size - self._offset)
+                out[filled:filled + take] = chunk[self._offset:self._offset + take]
+                filled += take
+                self._offset += take
+                self._buffered -= take
+                if self._offset >= chunk.size:
+                    self._chunks.popleft()
+                    self._offset = 0
+            
+            if filled < n:
+                self.underrun_samples += n - filled
+                self._starved += n - filled
+                if (not self.closed and self.fillers
+                        and self._starved >= self.filler_after_seconds * self.sample_rate):
+                    clip = self.fillers[self._filler_index % len(self.fillers)]
+                    self._filler_index += 1
+                    self._chunks.append(clip)
+                    self._buffered += clip.size
+                    self.filler_plays += 1
+                    self._starved = 0
+            else:
+                self._starved = 0
+        return out
+    
+    def status(self):
+        """Buffer health for the /status endpoint."""
+        return {
+            "buffered_seconds": round(self.buffered_seconds(), 2),
+            "underrun_seconds": round(self.underrun_samples / float(self.sample_rate), 2),
+            "filler_plays": self.filler_plays,
+            "produced_seconds": round(self.pushed_samples / float(self.sample_rate), 2),
+            "closed": self.closed,
+        }
+
+
+def wav_stream_header(sample_rate, channels=1, bits=16):
+    """WAV header with maximal sizes, for an open ended PCM stream."""
+    block_align = channels * bits // 8
+    return (b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+            + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate,
+                                    sample_rate * block_align, block_align, bits)
+            + b"data" + struct.pack("<I", 0xFFFFFFFF - 36))
+
+
+class LiveRadioServer:
+    """
+    Serve the show as a live HTTP chunked WAV stream while it is produced.
+    
+    A broadcaster thread pulls block_seconds of audio from the JitterBuffer
+    at real-time rate and fans it out to every connected listener; slow
+    listeners drop blocks instead of stalling the station. Playback starts
+    once prebuffer_seconds are buffered (or the show is complete).
+    
+    Endpoints:
+        /  or /stream.wav   live audio (audio/wav, chunked transfer)
+        /status             JSON buffer and listener status
+        /metrics            Prometheus metrics (see Metrics)
+    
+    Args:
+        buffer (JitterBuffer): Audio source.
+        host (str): Bind address. Loopback by default; pass "0.0.0.0"
+                    (--live-host) to let other machines tune in.
+        port (int): TCP port (0 picks a free port).
+        block_seconds (float): Audio per broadcast block.
+        prebuffer_seconds (float): Audio buffered before playback starts.
+        name (str): Station name sent as icy-name.
+    """
+    
+    def __init__(self, buffer, host="127.0.0.1", port=8000, block_seconds=0.1,
+                 prebuffer_seconds=1.5, name="Synthetic Radio"):
+        self.buffer = buffer
+        self.block_seconds = block_seconds
+        self.prebuffer_seconds = prebuffer_seconds
+        self.name = name
+        self.started_playback = None
+        self.status_hooks = []
+        self.listeners = []
+        self._listeners_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.finished = threading.Event()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._threads = []
+    
+    def _handler_class(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _chunk(self, data):
+                self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+            
+            def do_GET(self):
+                if self.path.startswith("/metrics"):
+                    body = Metrics.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if self.path.startswith("/status"):
+                    body = json.dumps(server.status()).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if self.path not in ("/", "/stream.wav"):
+                    self.send_error(404)
+                    return
+                
+                listener = queue.Queue(maxsize=50)
+                with server._listeners_lock:
+                    server.listeners.append(listener)
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "audio/wav")
+                    self.send_header("Cache-Control", "no-cache")
+                    self.send_header("icy-name", server.name)
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    self._chunk(wav_stream_header(server.buffer.sample_rate))
+                    while True:
+                        data = listener.get()
+                        if data is None:
+                            break
+                        self._chunk(data)
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with server._listeners_lock:
+                        if listener in server.listeners:
+                            server.listeners.remove(listener)
+        
+        return Handler
+    
+    def start(self):
+        """Start the HTTP server and the broadcaster in background threads."""
+        for target in (self.httpd.serve_forever, self._broadcast):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"Live radio on http://localhost:{self.port}/stream.wav")
+    
+    def stop(self):
+        """Stop broadcasting and close the HTTP server."""
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def status(self):
+        """Station status (buffer health, listeners, playback start)."""
+        status = self.buffer.status()
+        with self._listeners_lock:
+            status["listeners"] = len(self.listeners)
+        status["playing"] = self.started_playback is not None
+        for hook in self.status_hooks:
+            status.update(hook())
+        return status
+    
+    def _send(self, data):
+        with self._listeners_lock:
+            for listener in self.listeners:
+                try:
+                    listener.put_nowait(data)
+                except queue.Full:
+                    pass
+    
+    def _broadcast(self):
+        while (not self._stop.is_set() and not self.buffer.closed
+               and self.buffer.buffered_seconds() < self.prebuffer_seconds):
+            time.sleep(0.02)
+        
+        block = max(1, int(self.buffer.sample_rate * self.block_seconds))
+        self.started_playback = time.monotonic()
+        next_time = self.started_playback
+        while not self._stop.is_set() and not self.buffer.drained():
+            samples = self.buffer.pull(block)
+            pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+            self._send(pcm)
+            next_time += self.block_seconds
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self._send(None)
+        self.finished.set()
+
+
+def prepare_live_fillers(tts_backend, voice_id, phrase_library=None, phrases=None, sample_rate=None):
+    """
+    Synthesise the filler clips used by the jitter buffer to cover gaps.
+    
+    Args:
+        sample_rate (int): Rate of the JitterBuffer (default tts_backend.sample_rate);
+                     clips cached or synthesised at another rate are resampled.
+    
+    Returns:
+        list: numpy clips (phrases that failed are left out).
+    """
+    sample_rate = sample_rate or tts_backend.sample_rate
+    clips = []
+    for phrase in (phrases if phrases is not None else Common_Fillers):
+        try:
+            if phrase_library is not None:
+                clip = phrase_library.get(voice_id, phrase, tts_backend.synthesize, count=False,
+                                          backend=tts_backend, sample_rate=sample_rate)
+            else:
+                clip = tts_backend.synthesize(voice_id, f"[thinking] {phrase}...")
+                if clip is not None:
+                    clip = resample_audio(clip, tts_backend.sample_rate, sample_rate)
+        except Exception as ex:
+            print(f"Filler synthesis failed for '{phrase}': {ex}")
+            continue
+        if clip is not None:
+            clips.append(clip)
+    return clips
+
+
+def run_live_show(topic, buffer, Keys, llm_backend=None, tts_backend=None, show_kwargs=None, cast=None):
+    """
+    Produce a show into a JitterBuffer as fast as the pipeline allows.
+    
+    LLM conversions for all chunks are submitted up front (LLM_Concurrency
+    in flight), while the lines of the first finished chunk are already
+    being synthesised and streamed into the buffer, so listeners hear the
+    first line after roughly one LLM and one TTS latency.
+    
+    Args:
+        topic (str): Wikipedia topic.
+        buffer (JitterBuffer): Destination of the audio.
+        Keys (tuple): (api_key, voice_id_A, voice_id_B).
+        llm_backend (LLMBackend): LLM engine (default Ollama).
+        tts_backend (TTSBackend): TTS engine (default ElevenLabs).
+        show_kwargs (dict): Extra arguments for build_show_corpus().
+        cast (list): The show's show_cast(), e.g. when the fillers were
+                     voiced by its host (default: picked for this show).
     
     Returns:
-        numpy.ndarray or None: Sanitized 1D audio array ready for processing,
-                              or None if input is invalid/empty.
-    
-    Processing:
-        - Converts input to numpy array
-        - Rejects scalar values (0-dimensional arrays)
-        - Converts stereo (2D) to mono by averaging channels
-        - Rejects empty arrays
-        - Reshapes to 1D array
+        int: Number of lines played.
     """
-
+    if llm_backend is None:
+        llm_backend = OllamaBackend()
+    if tts_backend is None:
+        tts_backend = ElevenLabsTTSBackend(Keys[0])
+    
+    lines_played = 0
+    position = 0
     try:
-        if audio_np is None:
-            return None
-        
-        audio_np = np.asarray(audio_np)
-
-        # Reject scalar
-        if audio_np.ndim == 0:
-            return None
-
-        # Stereo → mono
-        if audio_np.ndim == 2:
-            audio_np = audio_np.mean(axis=1)
+        Corpus_token = build_show_corpus(topic, **(show_kwargs or {}))
+        if not Corpus_token:
+            return 0
+        with cast_of_show(Keys, cast) as speakers, \
+                ContextThreadPoolExecutor(max_workers=max(1, LLM_Concurrency)) as pool:
+            futures = [pool.submit(hinglish_converter, [chunk], None, llm_backend)
+                       for chunk in Corpus_token]
+            for future in futures:
+                try:
+                    lines = future.result()
+                except Exception as ex:
+                    print(f"Live LLM stage failed: {ex}")
+                    continue
+                for line in lines:
+                    # the speaker follows the script, not the lines that happened to succeed
+                    voice, speaker = speakers[position % len(speakers)]
+                    position += 1
+                    if push_line_audio(buffer, tts_backend, voice, speaker + str(line)) is not None:
+                        lines_played += 1
+    finally:
+        buffer.close()
+    return lines_played
 
-        # Reject empty
-        if audio_np.size == 0:
-            return None
 
-        return audio_np.reshape(-1)
+def push_line_audio(buffer, tts_backend, voice, text):
+    """
+    Stream one line of TTS audio into a JitterBuffer.
+    
+    Returns:
+        float: Seconds of audio pushed, or None if synthesis failed.
+    """
+    pushed = 0
+    Metrics.inc("radio_tts_requests_total", backend=tts_backend.name)
+    Metrics.inc("radio_tts_characters_total", len(text), backend=tts_backend.name)
+    try:
+        for chunk in tts_backend.stream(voice, text):
+            chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+            buffer.push(chunk)
+            pushed += chunk.size
     except Exception as ex:
-        print(f"Error sanitizing audio: {ex}")
+        Metrics.inc("radio_tts_failures_total", backend=tts_backend.name)
+        print(f"Live TTS stage failed for '{text[:50]}': {ex}")
         return None
+    Metrics.inc("radio_audio_seconds_total", pushed / float(buffer.sample_rate))
+    Metrics.observe("radio_audio_seconds", pushed / float(buffer.sample_rate))
+    return pushed / float(buffer.sample_rate)
 
 
-def Get_Key_Env_varibles():
+class LatencyTracker:
     """
-    Retrieve ElevenLabs API credentials from environment variables.
+    Exponentially weighted moving averages of per-stage latencies.
     
-    Fetches the required API key and voice IDs from environment variables.
-    Exits the program if any required credentials are missing.
+    Args:
+        alpha (float): Weight of the newest observation.
+        defaults (dict): Estimates used before a stage was observed.
+    """
     
-    Returns:
-        tuple: A tuple containing (api_key, voice_id_A, voice_id_B) if all
-               credentials are found.
+    def __init__(self, alpha=0.3, defaults=None):
+        self.alpha = alpha
+        self.values = dict(defaults or {})
+        self.counts = {}
+        self._lock = threading.Lock()
     
-    Environment Variables Required:
-        - ELEVENLABS_API_KEY: ElevenLabs API key for authentication
-        - ELEVENLABS_voice_id_A: First voice ID for speaker A
-        - ELEVENLABS_voice_id_B: Second voice ID for speaker B
+    def observe(self, stage, value):
+        """Fold a new measurement of stage into its average."""
+        with self._lock:
+            if self.counts.get(stage):
+                self.values[stage] = self.alpha * value + (1 - self.alpha) * self.values[stage]
+            else:
+                self.values[stage] = value
+            self.counts[stage] = self.counts.get(stage, 0) + 1
     
-    Exits:
-        sys.exit(0): If any required environment variable is missing.
+    def get(self, stage, default=0.0):
+        """Current average for stage."""
+        with self._lock:
+            return self.values.get(stage, default)
+    
+    def snapshot(self):
+        """Rounded copy of all averages."""
+        with self._lock:
+            return {k: round(v, 3) for k, v in self.values.items()}
+
+
+def topic_feed(source, loop=False):
     """
-    # Get keys from environment
-    api_key = os.getenv("ELEVENLABS_API_KEY")
-    if not api_key:
-        print(" Eleven Labs API key Not available")
-        sys.exit(0)
-            
-    voice_id_A = os.getenv("ELEVENLABS_voice_id_A")
-    if not voice_id_A:
-        print("1st Voice ID Not available")
-        sys.exit(0)
+    Yield topics from a list or a playlist file (one topic per line, '#' comments).
+    
+    A playlist file is re-read on every pass, so edits to a running
+    station's playlist are picked up when it loops.
+    
+    Args:
+        source (list|str): Topics, or path to a playlist file.
+        loop (bool): Start over when the playlist is exhausted.
+    """
+    while True:
+        if isinstance(source, str):
+            with open(source, encoding="utf-8") as fh:
+                topics = [t.strip() for t in fh if t.strip() and not t.strip().startswith("#")]
+        else:
+            topics = list(source)
+        if not topics:
+            return
+        for topic in topics:
+            yield topic
+        if not loop:
+            return
 
-    voice_id_B = os.getenv("ELEVENLABS_voice_id_B")
-    if not voice_id_B:
-        print("2nd Voice ID Not available")  
-        sys.exit(0)
-    return api_key ,voice_id_A , voice_id_B
+
+class ProgrammingScheduler:
+    """
+    Keep a continuous station fed by preparing upcoming segments ahead of playback.
+    
+    Two workers run next to the broadcaster:
+    
+    - the text worker fetches the article and runs the LLM for the next
+      topic whenever the audio runway (buffered audio plus the estimated
+      length of prepared, not yet voiced lines) drops below
+      low_watermark plus the expected lead time of a new segment. The lead
+      time is the EWMA of measured fetch, LLM and first line TTS latency
+      times a safety factor, so lookahead grows when the backends slow down.
+    - the voice worker synthesises prepared lines in order into the
+      JitterBuffer, pausing while more than high_watermark seconds are
+      buffered so the station does not over-generate.
+    
+    Args:
+        feed (iterable): Topics, e.g. topic_feed(playlist, loop=True).
+        buffer (JitterBuffer): Station buffer.
+        Keys (tuple): (api_key, voice_id_A, voice_id_B).
+        llm_backend (LLMBackend): LLM engine.
+        tts_backend (TTSBackend): TTS engine.
+        show_kwargs (dict): Extra arguments for build_show_corpus().
+        cast (list): The station's show_cast() (default: picked when voicing
+                     starts and released when it ends).
+        low_watermark (float): Seconds of runway to keep ahead of playback.
+        high_watermark (float): Buffered seconds above which voicing pauses.
+        safety (float): Multiplier on the measured lead time.
+    """
+    
+    def __init__(self, feed, buffer, Keys, llm_backend=None, tts_backend=None, show_kwargs=None,
+                 low_watermark=None, high_watermark=None, safety=1.5, poll_seconds=0.2, cast=None):
+        self.feed = iter(feed)
+        self.buffer = buffer
+        self.Keys = Keys
+        self.cast = cast
+        self.llm_backend = llm_backend if llm_backend is not None else OllamaBackend()
+        self.tts_backend = tts_backend if tts_backend is not None else ElevenLabsTTSBackend(Keys[0])
+        self.show_kwargs = show_kwargs or {}
+        self.low_watermark = Schedule_Low_Watermark if low_watermark is None else low_watermark
+        self.high_watermark = Schedule_High_Watermark if high_watermark is None else high_watermark
+        self.safety = safety
+        self.poll_seconds = poll_seconds
+        self.latency = LatencyTracker(defaults={"line_seconds": float(Seconds_Per_Dialogue)})
+        self.segments = deque()
+        self.head_lines_done = 0        # lines of segments[0] already voiced (or failed)
+        self.segments_prepared = 0
+        self.lines_played = 0
+        self.current_topic = None
+        self.feed_done = False
+        self._ready = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+    
+    def lead_seconds(self):
+        """Expected wall time from starting a segment to its first audio."""
+        return self.safety * (self.latency.get("fetch") + self.latency.get("llm")
+                              + self.latency.get("tts_first_line"))
+    
+    def runway_seconds(self):
+        """Buffered audio plus the estimated length of prepared, unvoiced lines."""
+        with self._ready:
+            # lines of the segment being voiced that are already buffered count only once
+            pending = sum(len(lines) for _, lines in self.segments) - self.head_lines_done
+        return self.buffer.buffered_seconds() + pending * self.latency.get("line_seconds")
+    
+    def needs_segment(self):
+        """True when the next segment must be started to avoid dead air."""
+        return self.runway_seconds() < self.low_watermark + self.lead_seconds()
+    
+    def prepare_segment(self, topic):
+        """
+        Fetch and convert one topic to dialogue lines, recording stage latencies.
+        
+        Returns:
+            list: Dialogue lines (empty if the topic failed).
+        """
+        start = time.monotonic()
+        corpus = build_show_corpus(topic, **self.show_kwargs)
+        self.latency.observe("fetch", time.monotonic() - start)
+        if not corpus:
+            return []
+        start = time.monotonic()
+        lines = hinglish_converter(corpus, backend=self.llm_backend)
+        self.latency.observe("llm", time.monotonic() - start)
+        return lines
+    
+    def _text_worker(self):
+        while not self._stop.is_set():
+            if not self.needs_segment():
+                self._stop.wait(self.poll_seconds)
+                continue
+            topic = next(self.feed, None)
+            if topic is None:
+                break
+            try:
+                lines = self.prepare_segment(topic)
+            except Exception as ex:
+                print(f"Scheduler could not prepare '{topic}': {ex}")
+                continue
+            if lines:
+                with self._ready:
+                    self.segments.append((topic, lines))
+                    self.segments_prepared += 1
+                    self._ready.notify_all()
+        with self._ready:
+            self.feed_done = True
+            self._ready.notify_all()
+    
+    def _voice_worker(self):
+        with cast_of_show(self.Keys, self.cast) as speakers:
+            self._voice_segments(speakers)
+        self.buffer.close()
+    
+    def _voice_segments(self, speakers):
+        while not self._stop.is_set():
+            with self._ready:
+                while not self.segments and not self.feed_done and not self._stop.is_set():
+                    self._ready.wait(self.poll_seconds)
+                if not self.segments:
+                    if self.feed_done or self._stop.is_set():
+                        break
+                    continue
+                topic, lines = self.segments[0]
+            self.current_topic = topic
+            for index, line in enumerate(lines):
+                while (self.buffer.buffered_seconds() > self.high_watermark
+                       and not self._stop.is_set()):
+                    self._stop.wait(self.poll_seconds)
+                if self._stop.is_set():
+                    break
+                voice, speaker = speakers[index % len(speakers)]
+                start = time.monotonic()
+                seconds = push_line_audio(self.buffer, self.tts_backend, voice, speaker + str(line))
+                with self._ready:
+                    self.head_lines_done = index + 1
+                if seconds is None:
+                    continue
+                if index == 0:
+                    self.latency.observe("tts_first_line", time.monotonic() - start)
+                self.latency.observe("line_seconds", seconds)
+                self.lines_played += 1
+            with self._ready:
+                self.segments.popleft()
+                self.head_lines_done = 0
+    
+    def start(self):
+        """Run the text and voice workers in background threads."""
+        for target in (self._text_worker, self._voice_worker):
+            thread = context_thread(target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+    
+    def join(self, timeout=None):
+        """Wait until the feed is exhausted and every segment was voiced."""
+        for thread in self._threads:
+            thread.join(timeout)
+    
+    def stop(self):
+        """Stop both workers; the buffer is closed so the stream ends."""
+        self._stop.set()
+        with self._ready:
+            self._ready.notify_all()
     
+    def status(self):
+        """Scheduler state for the /status endpoint."""
+        with self._ready:
+            queued = [topic for topic, _ in self.segments]
+        return {
+            "current_topic": self.current_topic,
+            "queued_topics": queued,
+            "segments_prepared": self.segments_prepared,
+            "lines_played": self.lines_played,
+            "runway_seconds": round(self.runway_seconds(), 1),
+            "lead_seconds": round(self.lead_seconds(), 2),
+            "latency": self.latency.snapshot(),
+        }
 
-def generate_audio(AudioData,Keys):
+
+class PipelineConfig:
     """
-    Generate audio file from Hinglish text using ElevenLabs TTS API.
+    Settings of a RadioPipeline.
     
-    Converts a list of Hinglish conversation lines into speech using ElevenLabs
-    text-to-speech API. Alternates between two different voices to create a
-    realistic dialogue between two speakers. Combines all audio chunks into
-    a single WAV file.
+    Either tts_backend or Keys with an ElevenLabs API key must be given;
+    a ValueError is raised otherwise instead of building a client that
+    fails on the first request.
     
     Args:
-        AudioData (list): A list of strings containing Hinglish conversation lines
-                         to convert to speech. Each line will be spoken by
-                         alternating voices.
-        Keys (tuple): A tuple containing (api_key, voice_id_A, voice_id_B) from
-                     Get_Key_Env_varibles().
+        Keys (tuple): (api_key, voice_id_A, voice_id_B, ...); local TTS
+                     backends only use the voice IDs. Optional with a
+                     tts_backend (placeholder voice IDs are used).
+        llm_backend (LLMBackend): LLM engine (default OllamaBackend()).
+        tts_backend (TTSBackend): TTS engine (default ElevenLabs with Keys[0]).
+        show_kwargs (dict): Extra arguments for build_show_corpus().
+        llm_concurrency (int): LLM requests in flight (default LLM_Concurrency).
+        tts_concurrency (int): TTS requests in flight.
+        validator (ScriptValidator): Optional LLM output validation.
+        output_file (str): Where run() writes the WAV (None: don't write).
+    """
     
-    Returns:
-        None: The function saves the audio file but doesn't return a value.
+    def __init__(self, Keys=None, llm_backend=None, tts_backend=None, show_kwargs=None,
+                 llm_concurrency=None, tts_concurrency=2, validator=None, output_file=None):
+        if tts_backend is None and not (Keys and Keys[0]):
+            raise ValueError("PipelineConfig needs a tts_backend or Keys with an ElevenLabs API key")
+        if Keys is None:
+            Keys = ("",) + tuple(chr(ord("A") + i) for i in range(len(Speaker_Names)))
+        if len(Keys) - 1 < len(Speaker_Names):
+            raise ValueError(f"{len(Speaker_Names)} speakers need {len(Speaker_Names)} voice IDs in Keys, "
+                             f"got {len(Keys) - 1}")
+        self.Keys = tuple(Keys)
+        self.llm_backend = llm_backend
+        self.tts_backend = tts_backend
+        self.show_kwargs = dict(show_kwargs or {})
+        self.llm_concurrency = max(1, llm_concurrency or LLM_Concurrency)
+        self.tts_concurrency = max(1, tts_concurrency)
+        self.validator = validator
+        self.output_file = output_file
+
+
+class RadioPipeline:
+    """
+    Async library API of the fetch -> LLM -> TTS pipeline.
     
-    Output:
-        Creates "GeneratedAudio.wav" in the current working directory with:
-        - Sample rate: 44100 Hz
-        - Format: PCM_16 WAV
-        - Mono audio (stereo converted to mono)
+    events(topic) is an async iterator of event dicts in show order; run(topic)
+    consumes it and returns the assembled show. Blocking backend calls run in
+    worker threads, so many pipelines can share one event loop. The pipeline
+    has no UI side effects of its own: progress reporting is done by
+    subscribers such as log_event_subscriber or streamlit_event_subscriber.
+    
+    Event types (every event has "type" and "topic"):
+        started, progress (stage, message, error), corpus (chunks),
+        turn_text (index, speaker, text),
+        turn_audio (index, speaker, text, samples, sample_rate),
+        error (stage, message), finished (turns, duration), saved (output_file)
+    
+    Example:
+        pipeline = RadioPipeline(PipelineConfig(tts_backend=ToneTTSBackend()))
+        pipeline.subscribe(log_event_subscriber)
+        show = await pipeline.run("India")
+    
+    Args:
+        config (PipelineConfig): Pipeline settings.
     """
-    try:
-        if not AudioData or len(AudioData) == 0:
-            if stlit:
-                st.error("Invalid audio data: must be a non-empty list")
-            print("Error: Invalid AudioData input")
-            return
+    
+    def __init__(self, config):
+        self.config = config
+        self.subscribers = []
+        self._llm_backend = self.config.llm_backend
+        self._tts_backend = self.config.tts_backend
+    
+    def subscribe(self, subscriber):
+        """Register fn(event) (plain or async) to receive every event."""
+        self.subscribers.append(subscriber)
+        return subscriber
+    
+    async def _publish(self, event):
+        for subscriber in self.subscribers:
+            try:
+                result = subscriber(event)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as ex:
+                print(f"Pipeline subscriber failed on {event['type']}: {ex}")
+        return event
+    
+    def _convert(self, chunk):
+        backend = self._llm_backend
+        messages = [{"role": "system", "content": Conversation_Prompt()},
+                    {"role": "user", "content": chunk}]
+        reply = backend.invoke(messages)
+        validator = self.config.validator
+        if validator is not None:
+            reply = validator.validate(reply, lambda bad, issues: backend.invoke(messages + [
+                {"role": "assistant", "content": str(bad)},
+                {"role": "user", "content": validator.repair_message(issues)}]))
+        return [line for line in str(reply or "").split("\n\n") if line.strip()]
+    
+    async def events(self, topic):
+        """
+        Run the pipeline for one topic, yielding events as they happen.
         
-        if stlit:
-            st.write("Audio generation started : " + str(datetime.now().strftime("%H:%M:%S")))
-        else:
-            print("Audio generation started : " + str(datetime.now().strftime("%H:%M:%S")))
-
-        try:
-            client = ElevenLabs(api_key=Keys[0])
-        except Exception as ex:
-            if stlit:
-                st.error(f"Failed to initialize ElevenLabs client: {str(ex)}")
-            print(f"ElevenLabs initialization error: {ex}")
+        LLM chunks run with llm_concurrency in flight; TTS for a line starts
+        as soon as its chunk is converted, and turn_audio events are yielded
+        in show order as soon as every earlier turn is done.
+        """
+        config = self.config
+        if self._llm_backend is None:
+            self._llm_backend = OllamaBackend()
+        if self._tts_backend is None:
+            self._tts_backend = ElevenLabsTTSBackend(config.Keys[0])
+        tts_backend = self._tts_backend
+        
+        def event(kind, **data):
+            return self._publish(dict(type=kind, topic=topic, **data))
+        
+        # fetch/tokenize messages arrive from the worker thread and are
+        # published as progress events once the call returns
+        notes = deque()
+        
+        def fetch_progress(message, error=False):
+            notes.append(dict(stage="fetch", message=message, error=error))
+        
+        yield await event("started")
+        corpus = await asyncio.to_thread(build_show_corpus, topic, progress=fetch_progress,
+                                         **config.show_kwargs)
+        while notes:
+            yield await event("progress", **notes.popleft())
+        if not corpus:
+            yield await event("error", stage="fetch", message="Empty Output from Wiki")
             return
+        yield await event("corpus", chunks=list(corpus))
         
-        audio_chunks = []
-        sample_rate = 44100
-        VoiceID_Toggle=True
-        for audioLine in AudioData:
-            if VoiceID_Toggle :
-                voice=Keys[1]
-                speaker='Priya '
-            else:
-                voice=Keys[2]
-                speaker='Kirti '
+        llm_slots = asyncio.Semaphore(config.llm_concurrency)
+        tts_slots = asyncio.Semaphore(config.tts_concurrency)
+        
+        async def convert(chunk):
+            async with llm_slots:
+                return await asyncio.to_thread(self._convert, chunk)
+        
+        async def speak(voice, text):
+            async with tts_slots:
+                return await tts_backend.synthesize_async(voice, text)
+        
+        speakers = show_cast(config.Keys)
+        llm_tasks = [asyncio.create_task(convert(chunk)) for chunk in corpus]
+        pending = deque()
+        turns = 0
+        samples_out = 0
+        
+        async def finish(entry):
+            nonlocal samples_out
+            index, speaker, text, task = entry
             try:
-                audio_generator = client.text_to_speech.convert(
-                    voice_id=voice,
-                    text= speaker + str(audioLine),
-                    voice_settings={
-                        "stability": 0.5,
-                        "similarity_boost": 0.6,
-                        "style": 0.4,
-                        "use_speaker_boost": True
-                    },
-                    model_id='eleven_v3')
-             
-                # toggleing voice ID's for using alternate voices
-                if VoiceID_Toggle :
-                    VoiceID_Toggle=False
-                else:
-                    VoiceID_Toggle=True
-                
-                audio_bytes = b"".join(chunk for chunk in audio_generator)
-                
-                if not audio_bytes:
-                    print(f" Skipped empty audio chunk for voice {audioLine}")
+                audio_np = await task
+            except Exception as ex:
+                return await event("error", stage="tts", message=str(ex), index=index)
+            if audio_np is None:
+                return await event("error", stage="tts", message="empty audio", index=index)
+            samples_out += len(audio_np)
+            return await event("turn_audio", index=index, speaker=speaker.strip(), text=text,
+                               samples=audio_np, sample_rate=tts_backend.sample_rate)
+        
+        try:
+            for chunk_index, llm_task in enumerate(llm_tasks, 1):
+                try:
+                    lines = await llm_task
+                except Exception as ex:
+                    yield await event("error", stage="llm", message=str(ex))
                     continue
-                
-                audio_np, sr = sf.read(io.BytesIO(audio_bytes), dtype="float32")
-                audio_np = sanitize_audio(audio_np)
+                yield await event("progress", stage="llm", error=False,
+                                  message=f"Chunk {chunk_index}/{len(llm_tasks)} converted, {len(lines)} lines")
+                for line in lines:
+                    voice, speaker = speakers[turns % len(speakers)]
+                    yield await event("turn_text", index=turns, speaker=speaker.strip(), text=line)
+                    pending.append((turns, speaker, line,
+                                    asyncio.create_task(speak(voice, speaker + line))))
+                    turns += 1
+                while pending and pending[0][3].done():
+                    yield await finish(pending.popleft())
+            while pending:
+                yield await finish(pending.popleft())
+            yield await event("finished", turns=turns,
+                              duration=round(samples_out / float(tts_backend.sample_rate), 2))
+        finally:
+            for task in llm_tasks + [entry[3] for entry in pending]:
+                task.cancel()
+            release_cast(config.Keys, speakers)
+    
+    async def run(self, topic):
+        """
+        Produce a whole show.
+        
+        Returns:
+            dict: topic, lines, audio (numpy array or None), sample_rate,
+                  output_file and errors.
+        """
+        lines, chunks, errors = [], [], []
+        sample_rate = None
+        async for event in self.events(topic):
+            if event["type"] == "turn_text":
+                lines.append(event["text"])
+            elif event["type"] == "turn_audio":
+                chunks.append(event["samples"])
+                sample_rate = event["sample_rate"]
+            elif event["type"] == "error":
+                errors.append(event)
+        audio = np.concatenate(chunks) if chunks else None
+        output_file = self.config.output_file
+        if audio is not None and output_file:
+            await asyncio.to_thread(sf.write, output_file, audio, sample_rate, subtype="PCM_16")
+            await self._publish(dict(type="saved", topic=topic, output_file=output_file))
+        return {"topic": topic, "lines": lines, "audio": audio, "sample_rate": sample_rate,
+                "output_file": output_file if audio is not None else None, "errors": errors}
 
-                if audio_np is None:
-                    print(" Skipped invalid chunk")
-                    continue
-                
-                audio_chunks.append(audio_np)
-                print(f" Valid chunks: {len(audio_chunks)}")
-                
-            except Exception as ex:
-                print(f" Error processing voice {audioLine}: {ex}")
-                continue
 
-        if not audio_chunks:
-            if stlit:
-                st.error("No valid audio chunks generated. Please check your API key and try again.")
-            print("Error: No valid audio chunks to merge")
-            return
+def log_event_subscriber(event):
+    """Pipeline subscriber that prints progress like the CLI does."""
+    kind = event["type"]
+    stamp = datetime.now().strftime("%H:%M:%S")
+    if kind == "started":
+        print(f"[{event['topic']}] started : {stamp}")
+    elif kind == "progress":
+        print(f"[{event['topic']}] {event['stage']}: {event['message']}")
+    elif kind == "corpus":
+        print(f"[{event['topic']}] {len(event['chunks'])} chunks fetched : {stamp}")
+    elif kind == "turn_audio":
+        print(f"[{event['topic']}] turn {event['index'] + 1} voiced ({event['speaker']})")
+    elif kind == "error":
+        print(f"[{event['topic']}] {event['stage']} error: {event['message']}")
+    elif kind == "finished":
+        print(f"[{event['topic']}] done, {event['turns']} turns, {event['duration']}s : {stamp}")
+    elif kind == "saved":
+        print(f"[{event['topic']}] Audio file generated {event['output_file']}")
+
+
+@st.cache_resource(show_spinner=False)
+def _streamlit_ollama_readiness(model):
+    return OllamaReadiness(model=model).start_rewarm()
+
+
+def streamlit_event_subscriber(event):
+    """Pipeline subscriber that reports progress in the Streamlit page."""
+    kind = event["type"]
+    if kind == "progress":
+        if event["error"]:
+            st.error(event["message"])
+        else:
+            st.write(event["message"])
+    elif kind == "turn_text":
+        st.write(f"**{event['speaker']}**: {event['text']}")
+    elif kind == "error":
+        st.error(f"{event['stage']} error: {event['message']}")
+    elif kind == "finished":
+        st.write(f"Show ready: {event['turns']} turns, {event['duration']} seconds")
+    elif kind == "saved":
+        st.write(f"Audio file generated {event['output_file']}")
 
-        try:
-            final_audio = np.concatenate(audio_chunks, axis=0)
-            script_dir = os.getcwd()
-            output_file = os.path.join(script_dir, "GeneratedAudio.wav")
-            sf.write(output_file, final_audio, sample_rate, subtype="PCM_16")
-            if stlit:
-                st.write(f"Audio file generated {output_file}")
-            else:
-                print(f"Audio file generated {output_file}")
-            
-                
-        except Exception as ex:
-            if stlit:
-                st.error(f"Error merging audio chunks: {str(ex)}")
-            print(f"Error merging audio: {ex}")
-            
-    except Exception as ex:
-        error_msg = f"Error in audio generation: {str(ex)}"
-        
-        if stlit:
-            st.error(error_msg)
-        print(error_msg)  
 
 # **************ENTRY POINT of Script **********************        
 if stlit:
-    if not Ollama_Status():
+    # checked and warmed once per process; the re-warm thread keeps the state current
+    readiness = _streamlit_ollama_readiness(LLM_Model)
+    if not readiness.status()["ollama"]["ready"] and not readiness.ensure_ready():
         sys.exit(0)
+    start_streamlit_metrics()
         
     st.title("Synthetic Radio Host tool")
     Name = st.text_input("Enter Article topic",max_chars=70)
+    if Name and get_title_index() is not None:
+        Suggestions = get_title_index().prefix(Name, 8)
+        if Suggestions:
+            st.caption("Wikipedia titles: " + " · ".join(Suggestions))
+    Full_Article = st.checkbox("Full article (long-form show)", value=False)
+    Max_Sentences = st.number_input("Max sentences (0 = no limit)", min_value=0,
+                                    value=0 if Full_Article else Show_Max_Sentences)
+    Target_Minutes = st.number_input("Target duration in minutes (0 = no limit)",
+                                     min_value=0.0, value=0.0, step=0.5)
     
     if st.button("Search"):
-        try:
-            if Name is not None and len(Name.strip()) > 2 and len(Name.strip()) < 71:
-                corpus = fetch_article_from_wiki(Name)
-               
-                if corpus:
-                    Corpus_token_full = sentence_token(corpus)
-                    Corpus_token=[]
-                    if len(Corpus_token_full)>5:
-                        for i in range(5):
-                            Corpus_token.append(Corpus_token_full[i])
-                    else:
-                        Corpus_token=Corpus_token_full
-                    Sent_token = hinglish_converter(Corpus_token)
-                    
+        # a rerun (or the deadline) cancels the LLM/TTS work still queued
+        with RunDeadline(Run_Deadline_Seconds):
+            try:
+                if Name is not None and len(Name.strip()) > 2 and len(Name.strip()) < 71:
                     # Get Environment keys
                     Keys = Get_Key_Env_varibles()
-                    if Keys :
-                        # generate Audio
-                        generate_audio(Sent_token,Keys)
-                        
+                    if Keys:
+                        # progress is shown by the subscriber, the stages themselves write nothing
+                        pipeline = RadioPipeline(PipelineConfig(
+                            Keys, show_kwargs=dict(max_sentences=int(Max_Sentences) or None,
+                                                   target_seconds=Target_Minutes * 60 or None,
+                                                   full_article=Full_Article),
+                            output_file=os.path.join(os.getcwd(), "GeneratedAudio.wav")))
+                        pipeline.subscribe(streamlit_event_subscriber)
+                        Show = asyncio.run(pipeline.run(Name))
+                        if not Show["lines"]:
+                            st.error("Failed to fetch article. Please try a different topic.")
                 else:
-                    st.error("Failed to fetch article. Please try a different topic.")
-            else:
-                st.warning("Please enter a valid article topic min 3 and max 70 Character")
+                    st.warning("Please enter a valid article topic min 3 and max 70 Character")
         
-        except Exception as ex:
-            st.error(f"An unexpected error occurred: {str(ex)}")
-            print(f"Unexpected error in main execution: {ex}")
+            except Exception as ex:
+                st.error(f"An unexpected error occurred: {str(ex)}")
+                print(f"Unexpected error in main execution: {ex}")
 
 else:           
     def main():
         """
         Main entry point for CLI mode execution.
         """
+        global Sentence_Splitter, LLM_Concurrency, TTS_Output_Format, Prompt_Version, Speaker_Names
+        global ElevenLabs_Key_Concurrency, LLM_Timeout_Seconds, TTS_Timeout_Seconds, Title_Index_Path
+        global LLM_OpenAI_Extra_Body
         parser = argparse.ArgumentParser()
-        parser.add_argument("--text", required=True)
+        parser.add_argument("--text")
+        parser.add_argument("--sentences", type=int, default=None,
+                            help=f"Max article sentences to use, 0 = no limit "
+                                 f"(default {Show_Max_Sentences}, or no limit with --full-article)")
+        parser.add_argument("--max-chars", type=int, default=None,
+                            help="Max article characters to use")
+        parser.add_argument("--duration", type=float, default=None,
+                            help="Approximate show duration in seconds")
+        parser.add_argument("--full-article", action="store_true",
+                            help="Use the whole Wikipedia page, section by section")
+        parser.add_argument("--chunk-chars", type=int, default=None,
+                            help=f"Group sentences into chunks of this size for the LLM "
+                                 f"(default {Show_Chunk_Chars} with --full-article)")
+        parser.add_argument("--splitter", choices=["auto", "punkt", "fast"], default=None,
+                            help=f"Sentence splitter (default {Sentence_Splitter})")
+        parser.add_argument("--benchmark-tokenizer", metavar="FILE",
+                            help="Compare punkt and fast splitters on a file of summaries and exit")
+        parser.add_argument("--phrase-cache", metavar="DIR",
+                            help="Pre-synthesise and cache speaker tags, fillers and intro/outro in DIR")
+        parser.add_argument("--no-intro", action="store_true",
+                            help="Skip the show intro/outro when --phrase-cache is used")
+        parser.add_argument("--topics-file", metavar="FILE",
+                            help="Batch mode: one topic per line, shows are generated concurrently")
+        parser.add_argument("--workers", type=int, default=4,
+                            help="Topics processed in parallel in batch mode")
+        parser.add_argument("--output-dir", default="GeneratedShows",
+                            help="Output directory for batch mode")
+        parser.add_argument("--segment-store", metavar="PATH",
+                            help="Keep line audio in a memory-mapped store at PATH(.pcm/.json) instead of RAM")
+        parser.add_argument("--gap", type=float, default=0.0,
+                            help="Silence between lines in seconds (with --segment-store)")
+        parser.add_argument("--crossfade", type=float, default=0.0,
+                            help="Crossfade between lines in seconds (with --segment-store)")
+        parser.add_argument("--tts-backend", choices=["elevenlabs", "espeak", "tone"],
+                            default="elevenlabs",
+                            help="TTS engine; espeak and tone run offline on the local CPU")
+        parser.add_argument("--tts-format", default=None,
+                            help=f"ElevenLabs output format (default {TTS_Output_Format}; pcm_* streams without "
+                                 "decoding; pcm_44100 needs a Pro plan)")
+        parser.add_argument("--tts-workers", type=int, default=1,
+                            help="Lines synthesized in parallel")
+        parser.add_argument("--llm-backend", choices=["ollama", "openai", "fake"], default="ollama",
+                            help="LLM engine: Ollama, OpenAI compatible local server or offline fake")
+        parser.add_argument("--llm-model", default=None, help=f"Model name (default {LLM_Model})")
+        parser.add_argument("--llm-url", default=None,
+                            help=f"OpenAI compatible server URL (default {LLM_OpenAI_URL})")
+        parser.add_argument("--llm-extra-body", type=json.loads, default=None, metavar="JSON",
+                            help='Extra request fields for --llm-backend openai, e.g. \'{"top_k": 40}\'')
+        parser.add_argument("--llm-concurrency", type=int, default=None,
+                            help=f"Sentences in flight at once (default {LLM_Concurrency})")
+        parser.add_argument("--llm-benchmark", metavar="BACKENDS",
+                            help="Comma separated backends to benchmark on the article of --text, then exit")
+        parser.add_argument("--warm-up", action="store_true",
+                            help="Check the Ollama model is installed, pre-load and warm it before the first request")
+        parser.add_argument("--validate", action="store_true",
+                            help="Check LLM replies (format, word budget, meta text, English) and repair failures before TTS")
+        parser.add_argument("--pack-lines", action="store_true",
+                            help="Merge same-speaker turns and pack short turns into fewer TTS requests")
+        parser.add_argument("--transcript", action="store_true",
+                            help="Write .srt, .vtt and .json transcripts next to the audio")
+        parser.add_argument("--speakers", type=str, metavar="NAMES",
+                            help="Comma separated speaker names, one per voice role A, B, C... "
+                                 f"(default {','.join(Speaker_Names)})")
+        parser.add_argument("--key-concurrency", type=int, default=None,
+                            help="ElevenLabs requests in flight per API key (0 = no limit)")
+        parser.add_argument("--variants", type=str, metavar="NAMES",
+                            help="With --text: comma separated show variants made from one fetch, "
+                                 f"e.g. hinglish,{','.join(Show_Variants)} (files in --output-dir)")
+        parser.add_argument("--prompt-version", default=None,
+                            help=f"System prompt variant: v1, {', '.join(Prompt_Versions)} (default {Prompt_Version})")
+        parser.add_argument("--token-report", action="store_true",
+                            help="Print per-call prompt/completion token accounting after the LLM stage")
+        parser.add_argument("--prompt-ab", type=str, metavar="VERSIONS",
+                            help="Compare prompt versions (comma separated) on the --text corpus or --ab-sentences and exit")
+        parser.add_argument("--ab-sentences", type=str, metavar="FILE",
+                            help="Fixed sentence set for --prompt-ab, one per line")
+        parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                            help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+        parser.add_argument("--metrics-host", type=str, default="127.0.0.1", metavar="ADDR",
+                            help="Bind address of --metrics-port; use 0.0.0.0 to expose it to the network")
+        parser.add_argument("--metrics-file", type=str, metavar="PATH",
+                            help="Dump Prometheus metrics to PATH periodically (textfile collector)")
+        parser.add_argument("--metrics-interval", type=float, default=15.0,
+                            help="Seconds between --metrics-file dumps")
+        parser.add_argument("--benchmark-audio", action="store_true",
+                            help="Benchmark per-chunk vs batched audio sanitising and exit")
+        parser.add_argument("--profile", type=str, metavar="DIR",
+                            help="Profile the run (cProfile, tracemalloc per stage) and write reports to DIR")
+        parser.add_argument("--profile-sampler", choices=["builtin", "none"], default="builtin",
+                            help="Stack sampler for the collapsed-stack flamegraph file")
+        parser.add_argument("--project", type=str, metavar="DIR",
+                            help="Save the show as an editable episode project in DIR")
+        parser.add_argument("--rerender", type=str, metavar="DIR",
+                            help="Re-render an episode project after editing DIR/script.txt (only changed turns)")
+        parser.add_argument("--deadline", type=float, default=None, metavar="SECONDS",
+                            help="Overall time budget of the run; unfinished work is cancelled and "
+                                 "the partial show is written")
+        parser.add_argument("--llm-timeout", type=float, default=None, metavar="SECONDS",
+                            help=f"Timeout of one LLM request (default {LLM_Timeout_Seconds})")
+        parser.add_argument("--tts-timeout", type=float, default=None, metavar="SECONDS",
+                            help=f"Timeout of one TTS request (default {TTS_Timeout_Seconds})")
+        parser.add_argument("--title-index", type=str, metavar="FILE",
+                            help="Local Wikipedia title index; topics are resolved before fetching "
+                                 "(default $WIKI_TITLE_INDEX)")
+        parser.add_argument("--build-title-index", type=str, metavar="TITLES",
+                            help="Build --title-index from a titles dump (e.g. enwiki-latest-all-titles-in-ns0.gz)")
+        parser.add_argument("--redirects", type=str, metavar="FILE",
+                            help="With --build-title-index: source<TAB>target redirect list")
+        parser.add_argument("--disambiguations", type=str, metavar="FILE",
+                            help="With --build-title-index: disambiguation page titles, one per line")
+        parser.add_argument("--lookup", type=str, metavar="TEXT",
+                            help="Print title index matches (resolve, prefix, fuzzy) for TEXT")
+        parser.add_argument("--record", type=str, metavar="FILE",
+                            help="Record Wikipedia, LLM and TTS calls with their timings to a replay archive")
+        parser.add_argument("--replay", type=str, metavar="FILE",
+                            help="Answer Wikipedia, LLM and TTS calls from a --record archive (offline)")
+        parser.add_argument("--replay-speed", type=float, default=1.0,
+                            help="With --replay: 1 keeps the recorded latencies, 0 replays as fast as possible")
+        parser.add_argument("--live", type=int, metavar="PORT",
+                            help="Stream the show live over HTTP on PORT while it is generated")
+        parser.add_argument("--live-host", type=str, default="127.0.0.1", metavar="ADDR",
+                            help="Bind address of --live; use 0.0.0.0 to expose it to the network")
+        parser.add_argument("--playlist", type=str, metavar="FILE",
+                            help="With --live: run a continuous station over the topics in FILE (one per line)")
+        parser.add_argument("--loop", action="store_true",
+                            help="With --playlist: start over when the playlist ends (24/7 station)")
         args = parser.parse_args()
-        if str(args.text) is not None and len(str(args.text).strip()) > 2 and len(str(args.text).strip())< 71:
+        
+        if args.profile and active_profiler() is None:
+            sampler = StackSampler() if args.profile_sampler == "builtin" else None
+            with RunProfiler(args.profile, sampler=sampler):
+                return main()
+        
+        if (args.record or args.replay) and active_tape() is None:
+            if args.record and args.replay:
+                parser.error("--record and --replay cannot be combined")
+            tape = NetworkTape(args.record or args.replay, "record" if args.record else "replay",
+                               speed=args.replay_speed)
+            with tape:
+                return main()
+        
+        if active_deadline() is None:
+            run = RunDeadline(args.deadline if args.deadline is not None else Run_Deadline_Seconds)
+            previous_handler = signal.signal(signal.SIGINT, run.handle_sigint)
+            try:
+                with run:
+                    return main()
+            finally:
+                signal.signal(signal.SIGINT, previous_handler)
+        
+        if args.llm_timeout is not None:
+            LLM_Timeout_Seconds = args.llm_timeout
+        if args.tts_timeout is not None:
+            TTS_Timeout_Seconds = args.tts_timeout
+        if args.metrics_port:
+            MetricsServer(args.metrics_port, host=args.metrics_host).start()
+        if args.metrics_file:
+            atexit.register(Metrics.start_file_dump(args.metrics_file, args.metrics_interval))
+        
+        if args.tts_format:
+            TTS_Output_Format = args.tts_format
+        if args.speakers:
+            Speaker_Names = tuple(name.strip() for name in args.speakers.split(",") if name.strip())
+        if args.key_concurrency is not None:
+            ElevenLabs_Key_Concurrency = args.key_concurrency
+        if args.prompt_version:
+            Conversation_Prompt(args.prompt_version)
+            Prompt_Version = args.prompt_version
+        if args.llm_concurrency:
+            LLM_Concurrency = args.llm_concurrency
+        
+        if args.splitter:
+            Sentence_Splitter = args.splitter
+        
+        if args.benchmark_tokenizer:
+            result = benchmark_sentence_splitters(load_benchmark_texts(args.benchmark_tokenizer))
+            print(json.dumps(result, indent=2))
+            return
+        
+        if args.build_title_index:
+            path = args.title_index or Title_Index_Path or "wiki_titles.idx"
+            index = TitleIndex.build(args.build_title_index, args.redirects, args.disambiguations)
+            index.save(path)
+            print(f"Title index written to {path}: {len(index)} titles, {len(index.redirects)} redirects, "
+                  f"{len(index.ambiguous)} ambiguous")
+            return
+        if args.title_index:
+            Title_Index_Path = args.title_index
+        if args.llm_extra_body is not None:
+            LLM_OpenAI_Extra_Body = args.llm_extra_body
+        if args.lookup:
+            index = get_title_index()
+            if index is None:
+                parser.error("--lookup needs --title-index or WIKI_TITLE_INDEX")
+            print(json.dumps({"resolve": index.resolve(args.lookup), "prefix": index.prefix(args.lookup),
+                              "fuzzy": index.fuzzy(args.lookup)}, indent=2, ensure_ascii=False))
+            return
+        
+        def get_keys():
+            if args.tts_backend == "elevenlabs":
+                return Get_Key_Env_varibles()
+            # local engines need no credentials; voice IDs only pick the local voice
+            return ("", *(chr(ord("A") + i) for i in range(len(Speaker_Names))))
+        
+        phrase_library = None
+        if args.phrase_cache:
+            phrase_library = PhraseAudioLibrary(
+                args.phrase_cache,
+                intro_text=None if args.no_intro else Show_Intro_Text,
+                outro_text=None if args.no_intro else Show_Outro_Text)
+        
+        max_sentences = args.sentences
+        if max_sentences is None and not args.full_article:
+            max_sentences = Show_Max_Sentences
+        show_kwargs = dict(max_sentences=max_sentences or None,
+                           max_chars=args.max_chars,
+                           target_seconds=args.duration,
+                           full_article=args.full_article,
+                           chunk_chars=args.chunk_chars)
+        
+        readiness = None
+        if args.warm_up and args.llm_backend == "ollama":
+            readiness = OllamaReadiness(model=args.llm_model)
+        
+        def ollama_ready():
+            if args.llm_backend != "ollama" or (active_tape() is not None and active_tape().mode == "replay"):
+                return True
             if not Ollama_Status():
+                return False
+            return readiness is None or readiness.ensure_ready()
+        
+        if args.topics_file:
+            with open(args.topics_file, encoding="utf-8") as fh:
+                topics = [t.strip() for t in fh if 2 < len(t.strip()) < 71]
+            if not ollama_ready():
                 sys.exit(0)
-                
+            Keys = get_keys()
+            run_batch(topics, Keys, args.output_dir, workers=args.workers,
+                      llm_backend=create_llm_backend(args.llm_backend, args.llm_model, args.llm_url),
+                      show_kwargs=show_kwargs, phrase_library=phrase_library,
+                      backend=create_tts_backend(args.tts_backend, Keys),
+                      tts_workers=args.tts_workers)
+            return
+        if args.prompt_ab:
+            if args.ab_sentences:
+                sentences = load_benchmark_texts(args.ab_sentences)
+            elif args.text:
+                sentences = build_show_corpus(str(args.text), **show_kwargs)
+            else:
+                parser.error("--prompt-ab needs --ab-sentences or --text")
+            backend = create_llm_backend(args.llm_backend, args.llm_model, args.llm_url)
+            versions = [v.strip() for v in args.prompt_ab.split(",") if v.strip()]
+            print(json.dumps(prompt_ab_test(backend, sentences, versions), indent=2))
+            return
+        if args.benchmark_audio:
+            print(json.dumps(benchmark_audio_sanitize(), indent=2))
+            return
+        if args.rerender:
+            project = EpisodeProject(args.rerender)
+            Keys = get_keys()
+            report = project.rerender(create_tts_backend(args.tts_backend, Keys),
+                                      transcript=args.transcript)
+            print(json.dumps(report))
+            return
+        if args.live and args.playlist:
+            if not ollama_ready():
+                sys.exit(0)
+            Keys = get_keys()
+            tts_backend = create_tts_backend(args.tts_backend, Keys)
+            sample_rate = tts_backend.sample_rate
+            # one cast for the station: the fillers are voiced by its host
+            with cast_of_show(Keys) as cast:
+                buffer = JitterBuffer(sample_rate, fillers=prepare_live_fillers(
+                    tts_backend, cast[0][0], phrase_library, sample_rate=sample_rate))
+                scheduler = ProgrammingScheduler(topic_feed(args.playlist, loop=args.loop), buffer, Keys,
+                                                 llm_backend=create_llm_backend(args.llm_backend, args.llm_model, args.llm_url),
+                                                 tts_backend=tts_backend, show_kwargs=show_kwargs, cast=cast)
+                server = LiveRadioServer(buffer, host=args.live_host, port=args.live)
+                server.status_hooks.append(scheduler.status)
+                active_deadline().on_cancel.append(scheduler.stop)
+                if readiness is not None:
+                    server.status_hooks.append(readiness.status)
+                    readiness.start_rewarm()
+                server.start()
+                scheduler.start()
+                try:
+                    server.finished.wait()
+                except KeyboardInterrupt:
+                    scheduler.stop()
+                server.stop()
+            return
+        if args.text is None:
+            parser.error("--text, --topics-file or --live with --playlist is required")
+        
+        if args.llm_benchmark:
+            sentences = build_show_corpus(str(args.text), **show_kwargs)
+            backends = [create_llm_backend(name.strip(), args.llm_model, args.llm_url)
+                        for name in args.llm_benchmark.split(",") if name.strip()]
+            result = benchmark_llm_backends(backends, sentences, concurrency=LLM_Concurrency)
+            print(json.dumps(result, indent=2))
+            return
+        
+        if str(args.text) is not None and len(str(args.text).strip()) > 2 and len(str(args.text).strip())< 71:
+            if not ollama_ready():
+                sys.exit(0)
+            
+            if args.live:
+                Keys = get_keys()
+                tts_backend = create_tts_backend(args.tts_backend, Keys)
+                sample_rate = tts_backend.sample_rate
+                with cast_of_show(Keys) as cast:
+                    buffer = JitterBuffer(sample_rate, fillers=prepare_live_fillers(
+                        tts_backend, cast[0][0], phrase_library, sample_rate=sample_rate))
+                    server = LiveRadioServer(buffer, host=args.live_host, port=args.live)
+                    server.start()
+                    run_live_show(str(args.text), buffer, Keys,
+                                  llm_backend=create_llm_backend(args.llm_backend, args.llm_model, args.llm_url),
+                                  tts_backend=tts_backend, show_kwargs=show_kwargs, cast=cast)
+                    server.finished.wait()
+                    server.stop()
+                return
+            
+            if args.variants:
+                Keys = get_keys()
+                run_variants(str(args.text), [v.strip() for v in args.variants.split(",") if v.strip()],
+                             Keys, args.output_dir, show_kwargs=show_kwargs,
+                             phrase_library=phrase_library,
+                             backend=create_tts_backend(args.tts_backend, Keys),
+                             tts_workers=args.tts_workers,
+                             llm_backend=create_llm_backend(args.llm_backend, args.llm_model, args.llm_url),
+                             validator=ScriptValidator() if args.validate else None)
+                return
+            
+            if not (args.project or args.segment_store or phrase_library is not None or args.pack_lines
+                    or args.transcript or args.token_report):
+                # plain show: the async pipeline, progress printed by the console subscriber
+                Keys = get_keys()
+                if Keys:
+                    pipeline = RadioPipeline(PipelineConfig(
+                        Keys, llm_backend=create_llm_backend(args.llm_backend, args.llm_model, args.llm_url),
+                        tts_backend=create_tts_backend(args.tts_backend, Keys), show_kwargs=show_kwargs,
+                        tts_concurrency=args.tts_workers,
+                        validator=ScriptValidator() if args.validate else None,
+                        output_file=os.path.join(os.getcwd(), "GeneratedAudio.wav")))
+                    pipeline.subscribe(log_event_subscriber)
+                    asyncio.run(pipeline.run(str(args.text)))
+                return
+            
             # fetching article from Wiki    
-            corpus = fetch_article_from_wiki(str(args.text))
-            if corpus:
-                Corpus_token_full = sentence_token(corpus)
-                Corpus_token=[]
-                if len(Corpus_token_full)>5:
-                    for i in range(5):
-                        Corpus_token.append(Corpus_token_full[i])
-                else:
-                    Corpus_token=Corpus_token_full
-                Sent_token = hinglish_converter(Corpus_token)
+            Corpus_token = build_show_corpus(str(args.text), **show_kwargs)
+            if Corpus_token:
+                llm_backend = create_llm_backend(args.llm_backend, args.llm_model, args.llm_url)
+                budget = None
+                if args.token_report:
+                    budget = TokenBudget()
+                    budget.attach(llm_backend)
+                Sent_token = hinglish_converter(
+                    Corpus_token, backend=llm_backend,
+                    validator=ScriptValidator() if args.validate else None)
+                if budget is not None:
+                    print(f"Token budget ({Prompt_Version}): {json.dumps(budget.summary())}")
                 
                 # Get Environment keys
-                Keys = Get_Key_Env_varibles()
-                if Keys :
+                Keys = get_keys()
+                if Keys and args.project:
+                    project = EpisodeProject(args.project)
+                    project.set_script(str(args.text), Corpus_token, Sent_token, Keys,
+                                       gap_seconds=args.gap, crossfade_seconds=args.crossfade)
+                    project.render(create_tts_backend(args.tts_backend, Keys), transcript=args.transcript)
+                elif Keys :
                     # generate Audio
-                    generate_audio(Sent_token,Keys)
+                    segment_store = None
+                    if args.segment_store:
+                        segment_store = AudioSegmentStore(args.segment_store)
+                    generate_audio(Sent_token,Keys,phrase_library=phrase_library,
+                                   segment_store=segment_store,gap_seconds=args.gap,
+                                   crossfade_seconds=args.crossfade,
+                                   backend=create_tts_backend(args.tts_backend, Keys),
+                                   tts_workers=args.tts_workers,pack_lines=args.pack_lines,
+                                   transcript=args.transcript)
 
             else:
                 print("Empty Output from Wiki")
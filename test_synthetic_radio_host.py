@@ -9,6 +9,7 @@ import sys
 import os
 import numpy as np
 import io
+import time
 import pytest
 
 # Import the module to test
@@ -55,6 +56,96 @@ class TestOllamaStatus(unittest.TestCase):
         self.assertTrue(result)
 
 
+class TestOllamaReadiness(unittest.TestCase):
+    """Test cases for Ollama model checks and warm-up"""
+    
+    def tags(self, *names):
+        return Mock(status_code=200, raise_for_status=Mock(),
+                    json=Mock(return_value={"models": [{"name": n} for n in names]}))
+    
+    @patch('SyntheticRadioHost.requests.get')
+    def test_check_model_present(self, mock_get):
+        """Test an installed model is found, with or without the :latest tag"""
+        mock_get.return_value = self.tags("llama3:8b", "mistral:latest")
+        self.assertTrue(srh.OllamaReadiness(model="llama3:8b").check_model())
+        self.assertTrue(srh.OllamaReadiness(model="mistral").check_model())
+    
+    @patch('SyntheticRadioHost.requests.get')
+    def test_check_model_missing(self, mock_get):
+        """Test a missing model is reported with a pull hint"""
+        mock_get.return_value = self.tags("mistral:latest")
+        readiness = srh.OllamaReadiness(model="llama3:8b")
+        self.assertFalse(readiness.check_model())
+        self.assertIn("ollama pull llama3:8b", readiness.state["error"])
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.requests.post')
+    @patch('SyntheticRadioHost.requests.get')
+    def test_ensure_ready_preloads_and_warms(self, mock_get, mock_post):
+        """Test ensure_ready pre-loads with keep_alive and records warm-up latency"""
+        mock_get.side_effect = lambda url, **kw: self.tags() if url.endswith("/api/ps") else self.tags("llama3:8b")
+        mock_post.return_value = Mock(raise_for_status=Mock(), json=Mock(
+            return_value={"eval_count": 8, "eval_duration": 200000000}))
+        readiness = srh.OllamaReadiness(model="llama3:8b", keep_alive="10m")
+        
+        self.assertTrue(readiness.ensure_ready())
+        
+        preload, warm = [c[1]["json"] for c in mock_post.call_args_list]
+        self.assertEqual(preload, {"model": "llama3:8b", "prompt": "", "keep_alive": "10m"})
+        self.assertEqual(warm["keep_alive"], "10m")
+        status = readiness.status()["ollama"]
+        self.assertTrue(status["ready"])
+        self.assertEqual(status["tokens_per_sec"], 40.0)
+        self.assertIsNotNone(status["warmup_seconds"])
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.requests.post')
+    @patch('SyntheticRadioHost.requests.get')
+    def test_ensure_ready_skips_preload_of_loaded_model(self, mock_get, mock_post):
+        """Test a model already in memory is only warmed up"""
+        mock_get.return_value = self.tags("llama3:8b")
+        mock_post.return_value = Mock(raise_for_status=Mock(), json=Mock(return_value={}))
+        readiness = srh.OllamaReadiness(model="llama3:8b")
+        self.assertTrue(readiness.ensure_ready())
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(mock_post.call_args[1]["json"]["prompt"], "Namaste")
+        self.assertTrue(readiness.status()["ollama"]["loaded"])
+    
+    @patch('SyntheticRadioHost.requests.get')
+    def test_ensure_ready_reports_through_progress(self, mock_get):
+        """Test a missing model is reported to the progress callback, not printed"""
+        mock_get.return_value = self.tags("mistral:latest")
+        messages = []
+        with patch('builtins.print') as mock_print:
+            ready = srh.OllamaReadiness(model="llama3:8b").ensure_ready(
+                progress=lambda message, error: messages.append((message, error)))
+        self.assertFalse(ready)
+        mock_print.assert_not_called()
+        self.assertEqual(len(messages), 1)
+        self.assertIn("ollama pull llama3:8b", messages[0][0])
+        self.assertTrue(messages[0][1])
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.requests.post')
+    @patch('SyntheticRadioHost.requests.get')
+    def test_ensure_ready_warmup_failure(self, mock_get, mock_post):
+        """Test a failing warm-up leaves the model not ready"""
+        mock_get.return_value = self.tags("llama3:8b")
+        mock_post.side_effect = Exception("timeout")
+        readiness = srh.OllamaReadiness(model="llama3:8b")
+        self.assertFalse(readiness.ensure_ready())
+        self.assertFalse(readiness.state["ready"])
+    
+    @patch('SyntheticRadioHost.requests.post')
+    def test_rewarm_runs_periodically(self, mock_post):
+        """Test the background re-warm repeats the warm-up"""
+        mock_post.return_value = Mock(raise_for_status=Mock(), json=Mock(return_value={}))
+        readiness = srh.OllamaReadiness(model="llama3:8b").start_rewarm(interval=0.01)
+        time.sleep(0.1)
+        readiness.stop()
+        self.assertGreaterEqual(mock_post.call_count, 2)
+
+
 class TestConversationPrompt(unittest.TestCase):
     """Test cases for Conversation_Prompt() function"""
     
@@ -79,6 +170,54 @@ class TestConversationPrompt(unittest.TestCase):
         self.assertEqual(prompt1, prompt2)
 
 
+class TestPromptVersions(unittest.TestCase):
+    """Test cases for prompt variants, token accounting and the A/B harness"""
+    
+    def test_default_is_original_prompt(self):
+        """Test v1 stays the default and compact variants are shorter"""
+        self.assertEqual(srh.Conversation_Prompt(), srh.Conversation_Prompt("v1"))
+        v1 = srh.estimate_tokens(srh.Conversation_Prompt("v1"))
+        for version in srh.Prompt_Versions:
+            prompt = srh.Conversation_Prompt(version)
+            self.assertIn("<speaker_A>", prompt)
+            self.assertLess(srh.estimate_tokens(prompt), v1)
+    
+    def test_unknown_version(self):
+        """Test an unknown version is reported"""
+        with self.assertRaises(ValueError):
+            srh.Conversation_Prompt("v9")
+    
+    @patch('SyntheticRadioHost.Prompt_Version', 'compact')
+    def test_global_version_selects_prompt(self):
+        """Test Prompt_Version switches the prompt used by default"""
+        self.assertEqual(srh.Conversation_Prompt(), srh.Prompt_Versions["compact"])
+    
+    def test_token_budget_records_calls(self):
+        """Test every invoke is recorded with its token counts"""
+        backend = srh.FakeLLMBackend()
+        budget = srh.TokenBudget(max_prompt_tokens=5)
+        budget.attach(backend)
+        backend.invoke([{"role": "user", "content": "x" * 40}])
+        backend.invoke([{"role": "user", "content": "y"}])
+        summary = budget.summary()
+        self.assertEqual(summary["calls"], 2)
+        self.assertEqual(summary["prompt_tokens"], 11)
+        self.assertEqual(summary["over_budget"], 1)
+        self.assertGreater(summary["prompt_share"], 0)
+    
+    def test_prompt_ab_test(self):
+        """Test the A/B harness reports tokens and compliance per version"""
+        backend = srh.FakeLLMBackend()
+        results = srh.prompt_ab_test(backend, ["One sentence.", "Another one."],
+                                     versions=("v1", "compact"))
+        self.assertEqual(set(results), {"v1", "compact"})
+        self.assertEqual(results["v1"]["calls"], 2)
+        self.assertLess(results["compact"]["prompt_tokens_per_call"],
+                        results["v1"]["prompt_tokens_per_call"])
+        self.assertEqual(results["v1"]["compliance"], 1.0)
+        self.assertEqual(backend.usage_hooks, [])
+
+
 class TestFetchArticleFromWiki(unittest.TestCase):
     """Test cases for fetch_article_from_wiki() function"""
     
@@ -231,6 +370,172 @@ class TestSentenceToken(unittest.TestCase):
         self.assertEqual(result, [])
 
 
+class TestSentenceSplitters(unittest.TestCase):
+    """Test cases for the cached punkt loader and the fast splitter"""
+    
+    def setUp(self):
+        srh._punkt_tokenizers.clear()
+        srh._punkt_fallback_warned.clear()
+    
+    def tearDown(self):
+        srh._punkt_tokenizers.clear()
+    
+    def test_fast_sent_tokenize_basic(self):
+        """Test splitting on terminal punctuation"""
+        text = "This is one. This is two! Is this three? Yes."
+        result = srh.fast_sent_tokenize(text)
+        self.assertEqual(result, ["This is one.", "This is two!", "Is this three?", "Yes."])
+    
+    def test_fast_sent_tokenize_abbreviations_and_initials(self):
+        """Test abbreviations and initials do not end a sentence"""
+        text = "J. R. R. Tolkien met Dr. Smith in the U.S. in 1950. He wrote books."
+        result = srh.fast_sent_tokenize(text)
+        self.assertEqual(len(result), 2)
+        self.assertTrue(result[0].endswith("1950."))
+    
+    def test_fast_sent_tokenize_lowercase_continuation(self):
+        """Test no split before a lower case word"""
+        result = srh.fast_sent_tokenize("Version 3. is out. Next one.")
+        self.assertEqual(result, ["Version 3. is out.", "Next one."])
+    
+    def test_fast_sent_tokenize_empty(self):
+        """Test empty text"""
+        self.assertEqual(srh.fast_sent_tokenize(""), [])
+    
+    @patch('nltk.tokenize.PunktTokenizer')
+    def test_load_punkt_tokenizer_cached(self, mock_punkt):
+        """Test the punkt model is loaded only once"""
+        first = srh.load_punkt_tokenizer()
+        second = srh.load_punkt_tokenizer()
+        self.assertIs(first, second)
+        mock_punkt.assert_called_once_with('english')
+    
+    @patch('SyntheticRadioHost.Sentence_Splitter', 'auto')
+    @patch('SyntheticRadioHost.load_punkt_tokenizer')
+    def test_sent_tokenize_auto_falls_back(self, mock_load):
+        """Test auto mode uses the fast splitter when punkt data is missing"""
+        mock_load.side_effect = LookupError("punkt not found")
+        result = srh.sent_tokenize("One here. Two here.")
+        self.assertEqual(result, ["One here.", "Two here."])
+    
+    @patch('SyntheticRadioHost.Sentence_Splitter', 'punkt')
+    @patch('SyntheticRadioHost.load_punkt_tokenizer')
+    def test_sent_tokenize_punkt_mode_raises(self, mock_load):
+        """Test strict punkt mode still reports missing data"""
+        mock_load.side_effect = LookupError("punkt not found")
+        with self.assertRaises(LookupError):
+            srh.sent_tokenize("One here. Two here.")
+    
+    @patch('SyntheticRadioHost.Sentence_Splitter', 'fast')
+    @patch('SyntheticRadioHost.load_punkt_tokenizer')
+    def test_sent_tokenize_fast_mode_skips_nltk(self, mock_load):
+        """Test fast mode never loads punkt"""
+        srh.sent_tokenize("One here. Two here.")
+        mock_load.assert_not_called()
+    
+    @patch('SyntheticRadioHost.load_punkt_tokenizer')
+    def test_benchmark_sentence_splitters(self, mock_load):
+        """Test benchmark reports throughput and agreement"""
+        mock_load.return_value = Mock(tokenize=lambda t: [t])
+        texts = ["One sentence only", "First one. Second one."]
+        result = srh.benchmark_sentence_splitters(texts, repeat=1)
+        self.assertIn("chars_per_sec", result["punkt"])
+        self.assertIn("chars_per_sec", result["fast"])
+        self.assertEqual(result["agreement"]["texts"], 2)
+        self.assertEqual(result["agreement"]["exact_match"], 0.5)
+        self.assertEqual(result["agreement"]["recall"], 1.0)
+
+
+class TestShowLength(unittest.TestCase):
+    """Test cases for show length budgeting and full-article chunking"""
+    
+    def test_stream_article_sections_splits_headings(self):
+        """Test lead section and headed sections are yielded in order"""
+        article = "Lead text.\n\n== History ==\nOld times.\n\n=== Early ===\nVery old.\n\n== References ==\nRef 1."
+        result = list(srh.stream_article_sections(article))
+        self.assertEqual(result, [("Summary", "Lead text."), ("History", "Old times."),
+                                  ("Early", "Very old.")])
+    
+    def test_stream_article_sections_empty(self):
+        """Test empty article yields nothing"""
+        self.assertEqual(list(srh.stream_article_sections("")), [])
+        self.assertEqual(list(srh.stream_article_sections(None)), [])
+    
+    def test_chunk_sentences_groups_by_chars(self):
+        """Test sentences are grouped up to the chunk size"""
+        sentences = ["A" * 10, "B" * 10, "C" * 10]
+        result = srh.chunk_sentences(sentences, chunk_chars=21)
+        self.assertEqual(result, ["A" * 10 + " " + "B" * 10, "C" * 10])
+    
+    def test_chunk_sentences_long_sentence_kept_whole(self):
+        """Test a sentence longer than the chunk size is not cut"""
+        result = srh.chunk_sentences(["A" * 50, "B"], chunk_chars=10)
+        self.assertEqual(result, ["A" * 50, "B"])
+    
+    def test_select_show_sentences_default_unlimited(self):
+        """Test no budget returns every sentence"""
+        sentences = ["S1.", "S2.", "S3."]
+        self.assertEqual(srh.select_show_sentences(sentences), sentences)
+    
+    def test_select_show_sentences_max_sentences(self):
+        """Test sentence budget replaces the fixed 5 sentence cap"""
+        sentences = [f"S{i}." for i in range(10)]
+        self.assertEqual(len(srh.select_show_sentences(sentences, max_sentences=5)), 5)
+        self.assertEqual(len(srh.select_show_sentences(sentences, max_sentences=7)), 7)
+    
+    def test_select_show_sentences_max_chars(self):
+        """Test character budget"""
+        sentences = ["A" * 10, "B" * 10, "C" * 10]
+        self.assertEqual(srh.select_show_sentences(sentences, max_chars=25), ["A" * 10, "B" * 10])
+    
+    @patch('SyntheticRadioHost.Seconds_Per_Dialogue', 20)
+    def test_select_show_sentences_target_seconds(self):
+        """Test duration budget counts LLM units"""
+        sentences = [f"S{i}." for i in range(10)]
+        self.assertEqual(len(srh.select_show_sentences(sentences, target_seconds=60)), 3)
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.sentence_token')
+    @patch('SyntheticRadioHost.fetch_article_from_wiki')
+    def test_build_show_corpus_summary_mode(self, mock_fetch, mock_token):
+        """Test summary mode applies the sentence budget"""
+        mock_fetch.return_value = "text"
+        mock_token.return_value = [f"S{i}." for i in range(8)]
+        result = srh.build_show_corpus("Topic", max_sentences=5)
+        self.assertEqual(result, [f"S{i}." for i in range(5)])
+        mock_fetch.assert_called_once_with("Topic", full_article=False, progress=None, resolved=False)
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.sentence_token')
+    @patch('SyntheticRadioHost.fetch_article_from_wiki')
+    def test_build_show_corpus_full_article_chunks(self, mock_fetch, mock_token):
+        """Test full-article mode chunks per section and stops at the budget"""
+        mock_fetch.return_value = "Lead.\n== One ==\nSec one.\n== Two ==\nSec two."
+        mock_token.side_effect = lambda text, progress=None: [text, text]
+        result = srh.build_show_corpus("Topic", max_sentences=4, full_article=True,
+                                       chunk_chars=1000)
+        self.assertEqual(result, ["Lead. Lead.", "Sec one. Sec one."])
+        self.assertEqual(mock_token.call_count, 2)
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.fetch_article_from_wiki')
+    def test_build_show_corpus_fetch_failure(self, mock_fetch):
+        """Test empty list when the article cannot be fetched"""
+        mock_fetch.return_value = None
+        self.assertEqual(srh.build_show_corpus("Topic"), [])
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.wiki')
+    def test_fetch_article_full_content(self, mock_wiki):
+        """Test full_article returns the page content"""
+        mock_page = Mock()
+        mock_page.summary = "Summary"
+        mock_page.content = "Summary\n== History ==\nMore"
+        mock_wiki.page.return_value = mock_page
+        result = srh.fetch_article_from_wiki("Python", full_article=True)
+        self.assertEqual(result, mock_page.content)
+
+
 class TestHinglishConverter(unittest.TestCase):
     """Test cases for hinglish_converter() function"""
     
@@ -293,6 +598,206 @@ class TestHinglishConverter(unittest.TestCase):
         self.assertEqual(call_args['repeat_penalty'], 1.18)
 
 
+class TestScriptValidator(unittest.TestCase):
+    """Test cases for LLM output validation and repair"""
+    
+    GOOD = ('<speaker_A>: "[happy] Dekhiye, aaj hum India ki baat karte hain."\n'
+            '<speaker_B>: "Sahi baat hai, yeh bahut bada desh hai."')
+    
+    def test_valid_reply_passes_and_is_normalised(self):
+        """Test a good reply passes without repair, one line per turn"""
+        validator = srh.ScriptValidator()
+        result = validator.validate(self.GOOD)
+        self.assertEqual(result.split("\n\n")[1], '<speaker_B>: "Sahi baat hai, yeh bahut bada desh hai."')
+        self.assertEqual(validator.stats["passed"], 1)
+        self.assertEqual(validator.stats["repair_calls"], 0)
+    
+    def test_meta_text_dropped_for_free(self):
+        """Test intro and notes are cut locally and counted as saved TTS spend"""
+        validator = srh.ScriptValidator()
+        reply = "Here is the script:\n" + self.GOOD + "\nNote: I kept it under 60 words."
+        regenerate = Mock()
+        result = validator.validate(reply, regenerate)
+        regenerate.assert_not_called()
+        self.assertNotIn("Here is", result)
+        self.assertNotIn("Note", result)
+        self.assertEqual(validator.stats["lines_dropped"], 2)
+        self.assertEqual(validator.stats["tts_requests_saved"], 2)
+        self.assertGreater(validator.stats["tts_chars_saved"], 0)
+    
+    def test_disallowed_cue_removed_and_tags_normalised(self):
+        """Test unknown audio cues are removed and speaker tags are normalised"""
+        validator = srh.ScriptValidator()
+        result = validator.validate('**Speaker A**: [whispering] [happy] Waise yeh sahi hai.')
+        self.assertEqual(result, '<speaker_A>: "[happy] Waise yeh sahi hai."')
+    
+    def test_english_line_detected(self):
+        """Test a plain English sentence is flagged, Hinglish is not"""
+        validator = srh.ScriptValidator()
+        self.assertTrue(validator.is_english("This is the history of the country and its people."))
+        self.assertFalse(validator.is_english("Yeh country ki history bahut purani hai."))
+    
+    def test_over_budget_reply_is_repaired(self):
+        """Test a reply over the word budget triggers one targeted regeneration"""
+        validator = srh.ScriptValidator(max_words=20)
+        long_reply = '<speaker_A>: "' + "matlab " * 30 + '"'
+        regenerate = Mock(return_value=self.GOOD)
+        result = validator.validate(long_reply, regenerate)
+        regenerate.assert_called_once()
+        self.assertIn("30 words", regenerate.call_args[0][1][0])
+        self.assertEqual(result.count("<speaker_"), 2)
+        self.assertEqual(validator.stats["repaired"], 1)
+    
+    def test_unrepairable_reply_rejected(self):
+        """Test a reply that stays broken is rejected and its TTS cost counted"""
+        validator = srh.ScriptValidator(max_repairs=1)
+        bad = "I cannot help with that."
+        result = validator.validate(bad, Mock(return_value=bad))
+        self.assertEqual(result, "")
+        self.assertEqual(validator.stats["rejected"], 1)
+        self.assertEqual(validator.stats["tts_chars_saved"], len(bad))
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    def test_hinglish_converter_repairs_only_failing_sentence(self):
+        """Test only the failing sentence is sent back to the LLM"""
+        backend = srh.FakeLLMBackend()
+        replies = {"good": self.GOOD, "bad": "Here is the script:\nSome English text without tags here."}
+        calls = []
+        
+        def fake_generate(messages):
+            calls.append(messages)
+            if len(messages) > 2:
+                return self.GOOD, 10, 10
+            return replies[messages[-1]["content"]], 10, 10
+        backend._generate = fake_generate
+        
+        validator = srh.ScriptValidator()
+        result = srh.hinglish_converter(["good", "bad"], backend=backend, validator=validator)
+        
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(len(result), 4)
+        self.assertEqual(validator.stats["repaired"], 1)
+
+
+class TestLLMBackends(unittest.TestCase):
+    """Test cases for the pluggable LLM backends"""
+    
+    MESSAGES = [{"role": "system", "content": "prompt"}, {"role": "user", "content": "Delhi is big."}]
+    
+    def test_fake_backend_deterministic_format(self):
+        """Test the fake backend returns a two speaker dialogue"""
+        backend = srh.FakeLLMBackend()
+        first = backend.invoke(self.MESSAGES)
+        self.assertEqual(first, backend.invoke(self.MESSAGES))
+        self.assertTrue(first.startswith("<speaker_A>:"))
+        self.assertIn("\n\n<speaker_B>:", first)
+    
+    def test_backend_token_accounting(self):
+        """Test calls, tokens and tokens/sec are recorded"""
+        backend = srh.FakeLLMBackend()
+        backend.invoke(self.MESSAGES)
+        self.assertEqual(backend.stats["calls"], 1)
+        self.assertGreater(backend.stats["prompt_tokens"], 0)
+        self.assertGreater(backend.stats["completion_tokens"], 0)
+        self.assertGreaterEqual(backend.tokens_per_second(), 0.0)
+    
+    def test_backend_failure_counted(self):
+        """Test failed calls are counted and re-raised"""
+        backend = srh.FakeLLMBackend()
+        backend._generate = Mock(side_effect=RuntimeError("down"))
+        with self.assertRaises(RuntimeError):
+            backend.invoke(self.MESSAGES)
+        self.assertEqual(backend.stats["failures"], 1)
+    
+    def test_batch_keeps_order_and_reports_errors(self):
+        """Test batch submit returns results in order with exceptions in place"""
+        backend = srh.FakeLLMBackend()
+        good = [{"role": "user", "content": f"Sentence {i}."} for i in range(5)]
+        results = backend.batch([[m] for m in good] + [[]], max_concurrency=3)
+        for i in range(5):
+            self.assertIn(f"{i}.", results[i])
+        self.assertIsInstance(results[5], Exception)
+    
+    @patch('SyntheticRadioHost.requests.Session')
+    def test_openai_backend_uses_reported_usage(self, mock_session_class):
+        """Test the OpenAI compatible backend posts chat completions"""
+        session = Mock(headers={})
+        session.post.return_value.json.return_value = {
+            "choices": [{"message": {"content": "Dialogue"}}],
+            "usage": {"prompt_tokens": 11, "completion_tokens": 7}}
+        mock_session_class.return_value = session
+        backend = srh.OpenAICompatBackend("http://host:8080/v1/", model="m", api_key="t")
+        self.assertEqual(backend.invoke(self.MESSAGES), "Dialogue")
+        self.assertEqual(session.post.call_args[0][0], "http://host:8080/v1/chat/completions")
+        self.assertEqual(session.post.call_args[1]["json"]["model"], "m")
+        self.assertEqual(backend.stats["prompt_tokens"], 11)
+        self.assertEqual(backend.stats["completion_tokens"], 7)
+        self.assertEqual(session.headers["Authorization"], "Bearer t")
+        # only standard OpenAI sampling fields unless the server's extras are configured
+        self.assertNotIn("top_k", session.post.call_args[1]["json"])
+        self.assertNotIn("repeat_penalty", session.post.call_args[1]["json"])
+        tuned = srh.OpenAICompatBackend("http://host:8080/v1", model="m",
+                                        extra_body={"top_k": 40, "repeat_penalty": 1.18})
+        tuned.invoke(self.MESSAGES)
+        self.assertEqual(session.post.call_args[1]["json"]["top_k"], 40)
+        self.assertEqual(session.post.call_args[1]["json"]["temperature"], 0.35)
+    
+    @patch('SyntheticRadioHost.OllamaLLM')
+    def test_ollama_backend_reads_token_counts(self, mock_llm_class):
+        """Test Ollama's prompt_eval_count/eval_count are used instead of estimates"""
+        from langchain_core.outputs import Generation, LLMResult
+        
+        def invoke(messages, config=None):
+            info = {"done": True, "prompt_eval_count": 42, "eval_count": 9}
+            for handler in config["callbacks"]:
+                handler.on_llm_end(LLMResult(generations=[[Generation(text="Dialogue",
+                                                                      generation_info=info)]]))
+            return "Dialogue"
+        mock_llm_class.return_value.invoke.side_effect = invoke
+        backend = srh.OllamaBackend("m")
+        self.assertEqual(backend.invoke(self.MESSAGES), "Dialogue")
+        self.assertEqual(backend.stats["prompt_tokens"], 42)
+        self.assertEqual(backend.stats["completion_tokens"], 9)
+    
+    @patch('SyntheticRadioHost.LLM_Timeout_Seconds', 120)
+    @patch('SyntheticRadioHost.call_with_timeout')
+    @patch('SyntheticRadioHost.OllamaLLM')
+    def test_ollama_backend_timeout_follows_deadline(self, mock_llm_class, mock_call):
+        """Test each Ollama call is bounded by min(LLM timeout, time left in the run)"""
+        mock_llm_class.return_value.invoke.return_value = "Dialogue"
+        mock_call.side_effect = lambda fn, seconds: fn()
+        backend = srh.OllamaBackend("m")
+        backend.invoke(self.MESSAGES)
+        self.assertEqual(mock_call.call_args[0][1], 120)
+        with srh.RunDeadline(5):
+            backend.invoke(self.MESSAGES)
+        self.assertLessEqual(mock_call.call_args[0][1], 5)
+        self.assertEqual(srh.OllamaBackend("m", timeout=3).timeout, 3)
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.LLM_Concurrency', 4)
+    def test_hinglish_converter_with_backend_concurrent(self):
+        """Test hinglish_converter uses the given backend and keeps order"""
+        backend = srh.FakeLLMBackend()
+        result = srh.hinglish_converter([f"Sentence {i} here." for i in range(6)], backend=backend)
+        self.assertEqual(backend.stats["calls"], 6)
+        self.assertEqual(len(result), 12)
+        self.assertIn("Sentence", result[0])
+        self.assertIn("5 here.", result[11])
+    
+    def test_benchmark_llm_backends(self):
+        """Test benchmark reports tokens/sec per backend"""
+        result = srh.benchmark_llm_backends([srh.FakeLLMBackend()], ["A b c.", "D e f."])
+        entry = result["fake:fake"]
+        self.assertEqual(entry["calls"], 2)
+        self.assertIn("tokens_per_sec", entry)
+    
+    def test_create_llm_backend_unknown(self):
+        """Test factory rejects unknown names"""
+        with self.assertRaises(ValueError):
+            srh.create_llm_backend("unknown")
+
+
 class TestSanitizeAudio(unittest.TestCase):
     """Test cases for sanitize_audio() function"""
     
@@ -356,6 +861,72 @@ class TestSanitizeAudio(unittest.TestCase):
         self.assertIsNone(result)
 
 
+class TestSanitizeAudioBatch(unittest.TestCase):
+    """Test cases for batched audio normalisation"""
+    
+    def test_matches_sanitize_audio(self):
+        """Test mono downmix matches the per-chunk path"""
+        chunks = [np.array([[0.1, 0.3], [0.5, 0.7]]), np.array([0.2, 0.4, 0.6])]
+        views = srh.sanitize_audio_batch(chunks)
+        for view, chunk in zip(views, chunks):
+            self.assertEqual(view.dtype, np.float32)
+            np.testing.assert_allclose(view, srh.sanitize_audio(chunk), rtol=1e-6)
+    
+    def test_rejects_invalid_chunks_in_place(self):
+        """Test None, scalar and empty chunks give None at their position"""
+        views = srh.sanitize_audio_batch([None, np.array(0.5), np.array([]), [0.1, 0.2]])
+        self.assertEqual(views[:3], [None, None, None])
+        self.assertEqual(len(views[3]), 2)
+        self.assertIsNone(srh.sanitize_audio_batch([None], concatenate=True))
+    
+    def test_concatenate_shares_one_buffer(self):
+        """Test the concatenated result holds every chunk in order"""
+        result = srh.sanitize_audio_batch([np.ones(3), np.zeros(2)], concatenate=True)
+        np.testing.assert_array_equal(result, [1, 1, 1, 0, 0])
+    
+    def test_int16_scaled_without_float64(self):
+        """Test integer PCM is scaled straight into float32"""
+        pcm = np.array([16384, -32768], dtype=np.int16)
+        result = srh.sanitize_audio_batch([pcm], concatenate=True)
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, [0.5, -1.0])
+    
+    def test_keep_stereo_and_weighted_downmix(self):
+        """Test stereo can be kept, or mixed with custom weights"""
+        stereo = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+        kept = srh.sanitize_audio_batch([stereo], channels=2, concatenate=True)
+        self.assertEqual(kept.shape, (2, 2))
+        mixed = srh.sanitize_audio_batch([stereo], matrix=[[0.75], [0.25]], concatenate=True)
+        np.testing.assert_allclose(mixed, [0.75, 0.25])
+        with self.assertRaises(ValueError):
+            srh.downmix_matrix(2, 1, [[1.0, 0.0]])
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    def test_mismatched_matrix_falls_back_per_chunk(self):
+        """Test a mono chunk among stereo ones keeps the batch instead of raising"""
+        stereo = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+        mono = np.array([0.5, 0.5], dtype=np.float32)
+        pcm = np.array([[16384, 0]], dtype=np.int32) << 16
+        result = srh.sanitize_audio_batch([stereo, mono, pcm], matrix=[[0.75], [0.25]], concatenate=True)
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, [0.75, 0.25, 0.5, 0.5, 0.375])
+    
+    def test_nan_guard_and_dc_removal(self):
+        """Test NaN/Inf are replaced and the DC offset is removed"""
+        audio = np.array([np.nan, np.inf, -np.inf, 0.5], dtype=np.float32)
+        guarded = srh.sanitize_audio_batch([audio], concatenate=True)
+        np.testing.assert_array_equal(guarded, [0.0, 1.0, -1.0, 0.5])
+        centred = srh.sanitize_audio_batch([np.full(8, 0.3)], remove_dc=True, concatenate=True)
+        np.testing.assert_allclose(centred, np.zeros(8), atol=1e-7)
+    
+    def test_benchmark_reports_both_paths(self):
+        """Test the microbenchmark returns timings for each chunk size"""
+        results = srh.benchmark_audio_sanitize(chunk_seconds=(0.01,), n_chunks=3, repeat=1)
+        self.assertEqual(len(results), 1)
+        self.assertIn("loop_ms", results[0])
+        self.assertIn("batch_ms", results[0])
+
+
 class TestGetKeyEnvVariables(unittest.TestCase):
     """Test cases for Get_Key_Env_varibles() function"""
     
@@ -581,6 +1152,1575 @@ class TestGenerateAudio(unittest.TestCase):
         srh.generate_audio(audio_data, keys)
 
 
+class TestPhraseAudioLibrary(unittest.TestCase):
+    """Test cases for the pre-synthesised phrase library"""
+    
+    def setUp(self):
+        self.synth = Mock(side_effect=lambda voice, text: np.full(len(text), 0.1, dtype=np.float32))
+    
+    def test_get_synthesises_once(self):
+        """Test a phrase is synthesised once per voice and then served from cache"""
+        library = srh.PhraseAudioLibrary()
+        first = library.get("voice_a", "Priya", self.synth)
+        second = library.get("voice_a", "Priya", self.synth)
+        np.testing.assert_array_equal(first, second)
+        self.synth.assert_called_once_with("voice_a", "Priya")
+        self.assertEqual(library.stats["hits"], 1)
+        self.assertEqual(library.stats["chars_saved"], 5)
+    
+    def test_get_per_voice(self):
+        """Test the same phrase is cached separately for each voice"""
+        library = srh.PhraseAudioLibrary()
+        library.get("voice_a", "matlab", self.synth)
+        library.get("voice_b", "matlab", self.synth)
+        self.assertEqual(self.synth.call_count, 2)
+    
+    def test_disk_cache_survives_new_instance(self):
+        """Test phrases are reloaded from disk without synthesis"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as cache_dir:
+            srh.PhraseAudioLibrary(cache_dir).get("voice_a", "dekhiye", self.synth)
+            library = srh.PhraseAudioLibrary(cache_dir)
+            library.get("voice_a", "dekhiye", self.synth)
+        self.synth.assert_called_once()
+        self.assertEqual(library.stats["hits"], 1)
+    
+    def test_cache_is_per_engine_and_rate(self):
+        """Test clips of one engine are not reused by another and follow the rate asked for"""
+        import tempfile
+        tone = srh.ToneTTSBackend(sample_rate=8000)
+        other = srh.ToneTTSBackend(sample_rate=16000)
+        other.name = "elevenlabs"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            clip = srh.PhraseAudioLibrary(cache_dir).get("voice_a", "Priya", tone.synthesize, backend=tone)
+            library = srh.PhraseAudioLibrary(cache_dir)
+            cached = library.get("voice_a", "Priya", self.synth, backend=tone)
+            upsampled = library.get("voice_a", "Priya", self.synth, backend=tone, sample_rate=16000)
+            library.get("voice_a", "Priya", self.synth, backend=other)
+        np.testing.assert_array_equal(cached, clip)
+        self.assertEqual(len(upsampled), 2 * len(clip))
+        self.synth.assert_called_once_with("voice_a", "Priya")
+    
+    def test_split_leading_filler(self):
+        """Test leading fillers are cut off with speaker tag and cues kept"""
+        library = srh.PhraseAudioLibrary()
+        filler, rest = library.split_leading_filler('<speaker_A>: "[happy] Matlab, yeh kamaal hai"')
+        self.assertEqual(filler.lower(), "matlab")
+        self.assertEqual(rest, '<speaker_A>: "[happy] yeh kamaal hai"')
+    
+    def test_split_leading_filler_multiword_and_no_match(self):
+        """Test multi word fillers and lines without a filler"""
+        library = srh.PhraseAudioLibrary()
+        self.assertEqual(library.split_leading_filler("Sahi baat hai, bilkul")[0], "Sahi baat hai")
+        self.assertEqual(library.split_leading_filler("matlab yeh"), (None, "matlab yeh"))
+    
+    def test_splice_line_sends_only_novel_text(self):
+        """Test the TTS call carries only the novel text of a line"""
+        library = srh.PhraseAudioLibrary()
+        library.warm({"voice_a": ["Priya"]}, self.synth)
+        self.synth.reset_mock()
+        audio = library.splice_line("voice_a", "Priya ", "dekhiye, aaj garmi hai", self.synth)
+        self.synth.assert_called_once_with("voice_a", "aaj garmi hai")
+        self.assertGreater(len(audio), len("aaj garmi hai"))
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.sf.write')
+    @patch('SyntheticRadioHost.sf.read')
+    @patch('SyntheticRadioHost.ElevenLabs')
+    def test_generate_audio_with_phrase_library(self, mock_elevenlabs, mock_sf_read, mock_sf_write):
+        """Test generate_audio reuses cached tags across lines"""
+        mock_client = Mock()
+        mock_elevenlabs.return_value = mock_client
+        mock_client.text_to_speech.convert.side_effect = lambda **kw: [b'audio']
+        mock_sf_read.return_value = (np.array([0.1, 0.2], dtype=np.float32), 44100)
+        
+        library = srh.PhraseAudioLibrary(fillers=())
+        srh.generate_audio(["Line 1", "Line 2", "Line 3", "Line 4"],
+                           ("api_key", "voice_a", "voice_b"), phrase_library=library)
+        
+        texts = [c[1]['text'] for c in mock_client.text_to_speech.convert.call_args_list]
+        self.assertEqual(texts.count("Priya"), 1)
+        self.assertEqual(texts.count("Kirti"), 1)
+        self.assertIn("Line 1", texts)
+        self.assertEqual(library.stats["hits"], 4)
+        mock_sf_write.assert_called_once()
+
+
+class TestDeduplication(unittest.TestCase):
+    """Test cases for the in-run dedup index (singleflight)"""
+    
+    def test_dedup_key_normalises_text(self):
+        """Test case and whitespace differences map to the same key"""
+        self.assertEqual(srh.dedup_key("tts", "Voice", "Hello   World"),
+                         srh.dedup_key("tts", "voice", " hello world "))
+        self.assertNotEqual(srh.dedup_key("tts", "a", "x"), srh.dedup_key("llm", "a", "x"))
+        # case changes the spoken audio, so TTS keys only ignore whitespace
+        self.assertEqual(srh.dedup_key("tts", "Voice", "Polish  food", casefold=False),
+                         srh.dedup_key("tts", "Voice", " Polish food ", casefold=False))
+        self.assertNotEqual(srh.dedup_key("tts", "Voice", "Polish", casefold=False),
+                            srh.dedup_key("tts", "Voice", "polish", casefold=False))
+    
+    def test_singleflight_remembers_results(self):
+        """Test completed results are reused"""
+        flight = srh.SingleFlight()
+        fn = Mock(return_value="result")
+        self.assertEqual(flight.do("k", fn), "result")
+        self.assertEqual(flight.do("k", fn), "result")
+        fn.assert_called_once()
+        self.assertEqual(flight.stats(), {"calls": 1, "duplicates_saved": 1})
+    
+    def test_singleflight_coalesces_in_flight(self):
+        """Test concurrent identical requests share one call"""
+        import threading, time
+        flight = srh.SingleFlight(remember=False)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(2)
+            return "shared"
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("k", work)))
+                   for _ in range(5)]
+        threads[0].start()
+        started.wait(2)
+        for t in threads[1:]:
+            t.start()
+        deadline = time.time() + 2
+        while flight.stats()["duplicates_saved"] < 4 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, ["shared"] * 5)
+        self.assertEqual(len(calls), 1)
+    
+    def test_singleflight_failure_not_remembered(self):
+        """Test a failed call can be retried"""
+        flight = srh.SingleFlight()
+        with self.assertRaises(ValueError):
+            flight.do("k", Mock(side_effect=ValueError("boom")))
+        self.assertEqual(flight.do("k", Mock(return_value=1)), 1)
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.OllamaLLM')
+    def test_hinglish_converter_dedup(self, mock_llm_class):
+        """Test duplicate sentences reach the LLM once"""
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = "Dialogue"
+        mock_llm_class.return_value = mock_llm
+        flight = srh.SingleFlight()
+        result = srh.hinglish_converter(["Same sentence.", "same  sentence.", "Other."], dedup=flight)
+        self.assertEqual(mock_llm.invoke.call_count, 2)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(flight.stats()["duplicates_saved"], 1)
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.generate_audio')
+    @patch('SyntheticRadioHost.hinglish_converter')
+    @patch('SyntheticRadioHost.build_show_corpus')
+    def test_run_batch_report(self, mock_corpus, mock_hinglish, mock_generate):
+        """Test batch run shares the dedup index and writes a report"""
+        import tempfile, json
+        mock_corpus.side_effect = lambda topic, **kw: [f"{topic} sentence."] if topic != "Bad" else []
+        mock_hinglish.side_effect = lambda data, dedup, **kw: dedup.do("same", lambda: ["Line"])
+        mock_generate.side_effect = lambda lines, keys, **kw: open(kw["output_file"], "wb").close()
+        with tempfile.TemporaryDirectory() as out:
+            report = srh.run_batch(["Topic A", "Topic B", "Bad"], ("k", "a", "b"), out, workers=2,
+                                   llm_backend=srh.FakeLLMBackend())
+            with open(os.path.join(out, "run_report.json")) as fh:
+                saved = json.load(fh)
+        self.assertEqual(report["topics"]["Topic A"], "ok")
+        self.assertEqual(report["topics"]["Bad"], "fetch failed")
+        self.assertEqual(report["llm"]["duplicates_saved"], 1)
+        self.assertEqual(saved["duplicates_saved"], 1)
+
+
+class TestAudioSegmentStore(unittest.TestCase):
+    """Test cases for the memory-mapped audio segment store"""
+    
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "episode")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_append_and_view_memmap(self):
+        """Test segments are returned as memmap views"""
+        store = srh.AudioSegmentStore(self.path, sample_rate=10)
+        store.append("a", np.array([0.1, 0.2, 0.3]))
+        store.append("b", np.array([0.4]))
+        view = store.view("a")
+        self.assertIsInstance(view, np.memmap)
+        np.testing.assert_array_almost_equal(view, [0.1, 0.2, 0.3])
+        np.testing.assert_array_almost_equal(store.view("b"), [0.4])
+        self.assertAlmostEqual(store.duration(), 0.4)
+    
+    def test_replace_segment_is_append_only(self):
+        """Test re-rendering a line appends and moves the index entry"""
+        store = srh.AudioSegmentStore(self.path)
+        store.append("a", np.ones(4))
+        size_before = os.path.getsize(store.data_path)
+        store.append("a", np.zeros(2))
+        self.assertGreater(os.path.getsize(store.data_path), size_before)
+        np.testing.assert_array_equal(store.view("a"), np.zeros(2))
+        self.assertEqual(store.order, ["a"])
+    
+    def test_index_persists(self):
+        """Test a reopened store sees previous segments once the index is saved"""
+        store = srh.AudioSegmentStore(self.path)
+        with patch.object(store, 'save_index', wraps=store.save_index) as mock_save:
+            for i in range(50):
+                store.append(f"t{i}", np.ones(3))
+            mock_save.assert_not_called()
+        store.save_index()
+        store = srh.AudioSegmentStore(self.path)
+        np.testing.assert_array_equal(store.view("t0"), np.ones(3))
+    
+    def test_compact(self):
+        """Test compact drops replaced data"""
+        store = srh.AudioSegmentStore(self.path)
+        store.append("a", np.ones(100))
+        store.append("a", np.ones(10))
+        store.compact()
+        self.assertEqual(os.path.getsize(store.data_path), 10 * 4)
+        np.testing.assert_array_equal(store.view("a"), np.ones(10))
+    
+    def test_assemble_order_and_gap(self):
+        """Test assembly honours order and inserts gaps"""
+        import soundfile
+        store = srh.AudioSegmentStore(self.path, sample_rate=100)
+        store.append("a", np.full(50, 0.5))
+        store.append("b", np.full(30, -0.5))
+        out = os.path.join(self.tmp.name, "out.wav")
+        written = store.assemble(out, order=["b", "a"], gap_seconds=0.1, block_samples=7)
+        data, sr = soundfile.read(out)
+        self.assertEqual(written, 90)
+        self.assertEqual(len(data), 90)
+        self.assertLess(data[0], 0)
+        self.assertEqual(data[35], 0)
+        self.assertGreater(data[-1], 0)
+    
+    def test_assemble_crossfade(self):
+        """Test crossfade overlaps consecutive segments"""
+        import soundfile
+        store = srh.AudioSegmentStore(self.path, sample_rate=100)
+        store.append("a", np.full(50, 0.5))
+        store.append("b", np.full(50, 0.5))
+        store.append("c", np.full(50, 0.5))
+        out = os.path.join(self.tmp.name, "out.wav")
+        written = store.assemble(out, crossfade_seconds=0.1)
+        data, sr = soundfile.read(out)
+        self.assertEqual(written, 150 - 2 * 10)
+        np.testing.assert_array_almost_equal(data, np.full(130, 0.5), decimal=3)
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.sf.read')
+    @patch('SyntheticRadioHost.ElevenLabs')
+    def test_generate_audio_with_segment_store(self, mock_elevenlabs, mock_sf_read):
+        """Test generate_audio keeps lines in the store and assembles from it"""
+        mock_client = Mock()
+        mock_elevenlabs.return_value = mock_client
+        mock_client.text_to_speech.convert.return_value = [b'audio']
+        mock_sf_read.return_value = (np.array([0.1, 0.2], dtype=np.float32), 44100)
+        store = srh.AudioSegmentStore(self.path)
+        out = os.path.join(self.tmp.name, "show.wav")
+        srh.generate_audio(["Line 1", "Line 2"], ("k", "a", "b"),
+                           output_file=out, segment_store=store)
+        self.assertEqual(store.order, ["turn_00000", "turn_00001"])
+        self.assertTrue(os.path.exists(out))
+        size = os.path.getsize(store.data_path)
+        srh.generate_audio(["Line 1", "Line 2"], ("k", "a", "b"),
+                           output_file=out, segment_store=srh.AudioSegmentStore(self.path))
+        self.assertEqual(os.path.getsize(store.data_path), size)
+
+
+class TestStreamingDecode(unittest.TestCase):
+    """Test cases for decode-free streaming of ElevenLabs audio"""
+    
+    def test_pcm_decoder_carries_odd_bytes(self):
+        """Test samples split across chunks are decoded once complete"""
+        pcm = np.array([0, 16384, -16384, 32767], dtype="<i2").tobytes()
+        decoder = srh.PCMStreamDecoder()
+        parts = [decoder.feed(pcm[:3]), decoder.feed(pcm[3:5]), decoder.feed(pcm[5:])]
+        self.assertEqual([len(p) for p in parts], [1, 1, 2])
+        result = np.concatenate(parts)
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_array_almost_equal(result, [0.0, 0.5, -0.5, 32767 / 32768.0])
+    
+    def test_output_format_sample_rate(self):
+        """Test sample rate parsing from output formats"""
+        self.assertEqual(srh.output_format_sample_rate("pcm_24000"), 24000)
+        self.assertEqual(srh.output_format_sample_rate("mp3_44100_128"), 44100)
+        self.assertEqual(srh.output_format_sample_rate(None), 44100)
+    
+    def test_tts_stream_pcm_is_incremental(self):
+        """Test chunks are yielded before the response is fully read"""
+        received = []
+        
+        def network():
+            for i in range(3):
+                received.append(i)
+                yield np.full(100, 1000 * (i + 1), dtype="<i2").tobytes()
+        
+        client = Mock()
+        client.text_to_speech.convert.return_value = network()
+        stream = srh.tts_stream(client, "voice", "text", output_format="pcm_22050")
+        first = next(stream)
+        self.assertEqual(received, [0])
+        self.assertEqual(len(first), 100)
+        self.assertEqual(len(list(stream)), 2)
+        self.assertEqual(client.text_to_speech.convert.call_args[1]["output_format"], "pcm_22050")
+    
+    @patch('SyntheticRadioHost.sf.read')
+    def test_tts_stream_mp3_falls_back_to_buffered_decode(self, mock_sf_read):
+        """Test MP3 output is buffered and decoded with soundfile"""
+        mock_sf_read.return_value = (np.array([[0.2, 0.4]], dtype=np.float32), 44100)
+        client = Mock()
+        client.text_to_speech.convert.return_value = [b'mp3', b'data']
+        chunks = list(srh.tts_stream(client, "voice", "text", output_format="mp3_44100_128"))
+        self.assertEqual(len(chunks), 1)
+        np.testing.assert_array_almost_equal(chunks[0], [0.3])
+        self.assertEqual(mock_sf_read.call_args[0][0].getvalue(), b'mp3data')
+    
+    def test_tts_convert_empty_response(self):
+        """Test an empty response gives None"""
+        client = Mock()
+        client.text_to_speech.convert.return_value = []
+        self.assertIsNone(srh.tts_convert(client, "voice", "text", "pcm_44100"))
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.ElevenLabs')
+    def test_generate_audio_streams_into_segment_store(self, mock_elevenlabs):
+        """Test line audio flows chunk by chunk into the segment store"""
+        import tempfile
+        mock_client = Mock()
+        mock_elevenlabs.return_value = mock_client
+        mock_client.text_to_speech.convert.side_effect = lambda **kw: iter(
+            [np.full(10, 100, dtype="<i2").tobytes(), np.full(5, 100, dtype="<i2").tobytes()])
+        with tempfile.TemporaryDirectory() as tmp:
+            store = srh.AudioSegmentStore(os.path.join(tmp, "ep"))
+            with patch.object(store, 'append', wraps=store.append) as mock_append:
+                srh.generate_audio(["Line 1", "Line 2"], ("k", "a", "b"),
+                                   output_file=os.path.join(tmp, "out.wav"), segment_store=store)
+                mock_append.assert_not_called()
+            self.assertEqual(store.segments["turn_00000"][1], 15)
+            self.assertEqual(store.segments["turn_00001"], (15, 15, 24000))
+            self.assertTrue(os.path.exists(os.path.join(tmp, "out.wav")))
+
+
+class TestTTSBackends(unittest.TestCase):
+    """Test cases for the pluggable TTS backends"""
+    
+    def test_strip_audio_cues(self):
+        """Test cues and speaker tags are removed for local engines"""
+        self.assertEqual(srh.strip_audio_cues('<speaker_A>: "[happy] Namaste [pause] dosto"'),
+                         "Namaste dosto")
+    
+    def test_tone_backend_deterministic(self):
+        """Test the pure-Python backend is deterministic per voice"""
+        backend = srh.ToneTTSBackend()
+        first = backend.synthesize("A", "Aaj ka topic bahut accha hai.")
+        second = backend.synthesize("A", "Aaj ka topic bahut accha hai.")
+        other = backend.synthesize("B", "Aaj ka topic bahut accha hai.")
+        np.testing.assert_array_equal(first, second)
+        self.assertFalse(np.array_equal(first, other))
+        self.assertEqual(first.dtype, np.float32)
+        self.assertLessEqual(np.abs(first).max(), 1.0)
+    
+    def test_tone_backend_length_scales_with_text(self):
+        """Test longer text gives longer audio and cue-only text gives None"""
+        backend = srh.ToneTTSBackend()
+        short = backend.synthesize("A", "Haan")
+        long = backend.synthesize("A", "Haan bilkul, yeh baat sahi hai dosto")
+        self.assertGreater(len(long), len(short))
+        self.assertIsNone(backend.synthesize("A", "[laugh]"))
+    
+    def test_tone_backend_stream_and_async(self):
+        """Test default stream() and synthesize_async() implementations"""
+        import asyncio
+        backend = srh.ToneTTSBackend()
+        chunks = list(backend.stream("A", "Namaste dosto"))
+        self.assertEqual(len(chunks), 1)
+        audio = asyncio.run(backend.synthesize_async("A", "Namaste dosto"))
+        np.testing.assert_array_equal(audio, chunks[0])
+    
+    @patch('SyntheticRadioHost.subprocess.run')
+    @patch('SyntheticRadioHost.shutil.which')
+    def test_espeak_backend(self, mock_which, mock_run):
+        """Test espeak-ng is run as a subprocess and its WAV decoded"""
+        import soundfile
+        buffer = io.BytesIO()
+        soundfile.write(buffer, np.zeros(2205, dtype=np.float32), 22050, format="WAV")
+        mock_which.return_value = "/usr/bin/espeak-ng"
+        mock_run.return_value = Mock(stdout=buffer.getvalue())
+        backend = srh.EspeakTTSBackend(voices={"A": "hi"})
+        audio = backend.synthesize("A", '[happy] Namaste')
+        self.assertEqual(len(audio), 2205)
+        cmd = mock_run.call_args[0][0]
+        self.assertEqual(cmd[0], "/usr/bin/espeak-ng")
+        self.assertIn("hi", cmd)
+        self.assertEqual(cmd[-1], "Namaste")
+    
+    @patch('SyntheticRadioHost.subprocess.run')
+    @patch('SyntheticRadioHost.shutil.which')
+    def test_espeak_rate_is_probed_once(self, mock_which, mock_run):
+        """Test a voice rendering at another rate is resampled instead of changing sample_rate"""
+        import soundfile
+        
+        def wav(rate, frames):
+            buffer = io.BytesIO()
+            soundfile.write(buffer, np.zeros(frames, dtype=np.float32), rate, format="WAV")
+            return Mock(stdout=buffer.getvalue())
+        mock_which.return_value = "/usr/bin/espeak-ng"
+        mock_run.return_value = wav(22050, 100)
+        backend = srh.EspeakTTSBackend()
+        self.assertEqual(backend.sample_rate, 22050)
+        mock_run.return_value = wav(16000, 1600)
+        audio = backend.synthesize("A", "Namaste")
+        self.assertEqual(backend.sample_rate, 22050)
+        self.assertEqual(len(audio), 2205)
+    
+    @patch('SyntheticRadioHost.shutil.which')
+    def test_espeak_backend_missing(self, mock_which):
+        """Test a clear error when espeak-ng is not installed"""
+        mock_which.return_value = None
+        with self.assertRaises(RuntimeError):
+            srh.EspeakTTSBackend()
+    
+    def test_create_tts_backend(self):
+        """Test backend factory"""
+        self.assertIsInstance(srh.create_tts_backend("tone"), srh.ToneTTSBackend)
+        with self.assertRaises(ValueError):
+            srh.create_tts_backend("unknown")
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.sf.write')
+    @patch('SyntheticRadioHost.ElevenLabs')
+    def test_generate_audio_local_backend_parallel(self, mock_elevenlabs, mock_sf_write):
+        """Test a local backend with parallel workers keeps line order"""
+        backend = srh.ToneTTSBackend()
+        lines = ["Ek", "Do teen", "Char paanch chhe", "Saat"]
+        srh.generate_audio(lines, ("", "A", "B"), backend=backend, tts_workers=3)
+        mock_elevenlabs.assert_not_called()
+        written, rate = mock_sf_write.call_args[0][1], mock_sf_write.call_args[0][2]
+        expected = np.concatenate([backend.synthesize(v, sp + l) for v, sp, l in
+                                   zip("ABAB", ["Priya ", "Kirti "] * 2, lines)])
+        np.testing.assert_array_equal(written, expected)
+        self.assertEqual(rate, backend.sample_rate)
+
+
+class TestLinePacking(unittest.TestCase):
+    """Test cases for TTS request packing"""
+    
+    def test_plan_merges_consecutive_same_voice(self):
+        """Test back-to-back turns of one voice become one turn"""
+        jobs = [("A", "Priya ", "one"), ("A", "Priya ", "two"), ("B", "Kirti ", "three")]
+        turns, requests = srh.plan_tts_requests(jobs, short_chars=0)
+        self.assertEqual(turns, [("A", "Priya ", "one two"), ("B", "Kirti ", "three")])
+        self.assertEqual(requests, [("A", [0]), ("B", [1])])
+    
+    def test_plan_packs_short_turns_per_voice(self):
+        """Test short turns share a request per voice while long ones stay alone"""
+        jobs = [("A", "Priya ", "short a1"), ("B", "Kirti ", "short b1"),
+                ("A", "Priya ", "x" * 300), ("B", "Kirti ", "short b2"),
+                ("A", "Priya ", "short a2")]
+        turns, requests = srh.plan_tts_requests(jobs, short_chars=100, max_chars=500)
+        self.assertEqual(len(turns), 5)
+        self.assertEqual(requests, [("A", [0, 4]), ("B", [1, 3]), ("A", [2])])
+    
+    def test_plan_respects_max_chars(self):
+        """Test a pack is closed once it would exceed max_chars"""
+        jobs = [("A", "", "a" * 40), ("B", "", "b"), ("A", "", "a" * 40), ("B", "", "b"),
+                ("A", "", "a" * 40)]
+        turns, requests = srh.plan_tts_requests(jobs, short_chars=50, max_chars=90)
+        self.assertEqual([r for r in requests if r[0] == "A"], [("A", [0, 2]), ("A", [4])])
+    
+    def test_split_with_alignment(self):
+        """Test cuts fall between the parts using character timings"""
+        parts, sep = ["ab", "cd"], "||"
+        starts = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5]
+        ends = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6]
+        audio = np.arange(60, dtype=np.float32)
+        clips = srh.split_packed_audio(audio, 100, parts, sep, (starts, ends))
+        self.assertEqual([len(c) for c in clips], [30, 30])
+    
+    def test_split_without_alignment_uses_silence(self):
+        """Test the fallback cut lands in the quiet gap between parts"""
+        sr = 1000
+        audio = np.concatenate([np.ones(400), np.zeros(100), np.ones(500)]).astype(np.float32)
+        clips = srh.split_packed_audio(audio, sr, ["aaaa", "bbbbb"], "  ")
+        self.assertEqual(len(clips), 2)
+        self.assertTrue(400 <= len(clips[0]) <= 500)
+        self.assertEqual(sum(len(c) for c in clips), len(audio))
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.sf.write')
+    def test_generate_audio_pack_lines_keeps_order(self, mock_write):
+        """Test packing reduces requests and writes every turn in order"""
+        backend = srh.ToneTTSBackend(sample_rate=8000)
+        calls = []
+        original = backend.synthesize
+        backend.synthesize = lambda voice, text: calls.append(text) or original(voice, text)
+        lines = ["Hi.", "Hello.", "Okay.", "Sure."]
+        
+        srh.generate_audio(lines, ("", "A", "B"), backend=backend, pack_lines=True)
+        
+        self.assertEqual(len(calls), 2)
+        written = mock_write.call_args[0][1]
+        self.assertEqual(len(written), sum(len(original(v, t)) for v, t in
+                                           [("A", "Priya Hi.\n\nPriya Okay."),
+                                            ("B", "Kirti Hello.\n\nKirti Sure.")]))
+
+
+class TestEpisodeProject(unittest.TestCase):
+    """Test cases for editable episode projects and incremental re-render"""
+    
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "episode")
+        self.backend = srh.ToneTTSBackend(sample_rate=8000)
+        self.calls = []
+        original = self.backend.synthesize
+        self.backend.synthesize = lambda voice, text: self.calls.append(text) or original(voice, text)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def make_project(self):
+        project = srh.EpisodeProject(self.dir)
+        project.set_script("India", ["India is a country."],
+                           ["Pehli line.", "Doosri\nline.", "Teesri line."], ("", "A", "B"))
+        project.render(self.backend)
+        return project
+    
+    def test_create_writes_project_files(self):
+        """Test a new project stores metadata, script, segments and audio"""
+        project = self.make_project()
+        for name in ("episode.json", "script.txt", "segments.pcm", "segments.json", "episode.wav"):
+            self.assertTrue(os.path.exists(os.path.join(self.dir, name)), name)
+        with open(project.script_path, encoding="utf-8") as fh:
+            self.assertEqual(fh.read().splitlines(),
+                             ["Priya: Pehli line.", "Kirti: Doosri line.", "Priya: Teesri line."])
+        self.assertEqual(len(self.calls), 3)
+    
+    def test_rerender_only_changed_turn(self):
+        """Test editing one line re-synthesises only that turn"""
+        self.make_project()
+        script = os.path.join(self.dir, "script.txt")
+        with open(script, "w", encoding="utf-8") as fh:
+            fh.write("Priya: Pehli line.\nKirti: Badli hui doosri line hai.\nPriya: Teesri line.\n")
+        self.calls.clear()
+        
+        report = srh.EpisodeProject(self.dir).rerender(self.backend)
+        
+        self.assertEqual(self.calls, ["Kirti Badli hui doosri line hai."])
+        self.assertEqual(report["synthesized"], 1)
+        self.assertEqual(report["reused"], 2)
+        self.assertEqual(report["changed"], [1])
+        expected = sum(len(self.backend.synthesize(v, t)) for v, t in [
+            ("A", "Priya Pehli line."), ("B", "Kirti Badli hui doosri line hai."), ("A", "Priya Teesri line.")])
+        self.assertEqual(srh.sf.info(os.path.join(self.dir, "episode.wav")).frames, expected)
+    
+    def test_rerender_reorder_and_delete_reuse_audio(self):
+        """Test moved and deleted turns need no synthesis"""
+        self.make_project()
+        with open(os.path.join(self.dir, "script.txt"), "w", encoding="utf-8") as fh:
+            fh.write("Priya: Teesri line.\n# dropped the rest\nPriya: Pehli line.\n")
+        self.calls.clear()
+        report = srh.EpisodeProject(self.dir).rerender(self.backend)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(report["turns"], 2)
+    
+    @patch('SyntheticRadioHost.Speaker_Names', ("Priya Sharma", "Kirti"))
+    def test_script_strips_llm_tags_and_reads_any_name(self):
+        """Test LLM lines are written without <speaker_X> tags and quotes and read back"""
+        project = srh.EpisodeProject(self.dir)
+        project.set_script("India", ["India is a country."],
+                           ['<speaker_A>: "[excited] Pehli line: shuru!"', '<speaker_B>: "Doosri line."'],
+                           ("", "A", "B"))
+        with open(project.script_path, encoding="utf-8") as fh:
+            self.assertEqual(fh.read().splitlines(),
+                             ["Priya Sharma: [excited] Pehli line: shuru!", "Kirti: Doosri line."])
+        self.assertEqual([(t["speaker"], t["text"]) for t in project.read_script()],
+                         [("Priya Sharma", "[excited] Pehli line: shuru!"), ("Kirti", "Doosri line.")])
+    
+    def test_read_script_rejects_unknown_speaker(self):
+        """Test a script line with an unknown speaker is reported"""
+        project = self.make_project()
+        with open(project.script_path, "w", encoding="utf-8") as fh:
+            fh.write("Rahul: Namaste.\n")
+        with self.assertRaises(ValueError):
+            project.read_script()
+    
+    def test_prune_compacts_store(self):
+        """Test prune keeps only audio referenced by the script"""
+        project = self.make_project()
+        project.render(self.backend, [{"speaker": "Priya", "text": "Sirf ek line."}])
+        project.prune()
+        self.assertEqual(len(project.store.segments), 1)
+    
+    def test_render_resamples_turns_from_other_rate(self):
+        """Test turns voiced at another rate are resampled, not spliced raw"""
+        self.make_project()
+        fast = srh.ToneTTSBackend(sample_rate=16000)
+        project = srh.EpisodeProject(self.dir)
+        project.render(fast, [{"speaker": "Priya", "text": "Pehli line."},
+                              {"speaker": "Kirti", "text": "Nayi line."}])
+        
+        key = project.turn_key(fast, {"speaker": "Kirti", "text": "Nayi line."})
+        self.assertEqual(project.store.sample_rate, 8000)
+        self.assertEqual(project.store.segments[key][2], 16000)
+        new_len = len(fast.synthesize("B", "Kirti Nayi line."))
+        expected = len(self.backend.synthesize("A", "Priya Pehli line.")) + round(new_len / 2)
+        info = srh.sf.info(project.output_file)
+        self.assertEqual((info.samplerate, info.frames), (8000, expected))
+
+
+class TestTranscriptExport(unittest.TestCase):
+    """Test cases for per-turn timing and subtitle export"""
+    
+    def test_timeline_offsets_plain(self):
+        """Test offsets are the running sum of chunk lengths"""
+        self.assertEqual(srh.timeline_offsets([10, 20, 5]), [(0, 10), (10, 30), (30, 35)])
+    
+    def test_timeline_offsets_gap_and_crossfade(self):
+        """Test gaps shift and crossfades overlap the following chunks"""
+        self.assertEqual(srh.timeline_offsets([10, 10], gap_samples=5), [(0, 10), (15, 25)])
+        self.assertEqual(srh.timeline_offsets([10, 10, 10], fade_samples=4),
+                         [(0, 10), (6, 16), (12, 22)])
+    
+    def test_timeline_matches_assembled_length(self):
+        """Test the last offset equals the assembled file length"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            store = srh.AudioSegmentStore(os.path.join(tmp, "show"), sample_rate=100)
+            for i, n in enumerate([50, 30, 70]):
+                store.append(f"k{i}", np.ones(n, dtype=np.float32))
+            written = store.assemble(os.path.join(tmp, "out.wav"), crossfade_seconds=0.1)
+        offsets = srh.timeline_offsets([50, 30, 70], fade_samples=10)
+        self.assertEqual(offsets[-1][1], written)
+    
+    def test_format_srt_and_vtt(self):
+        """Test subtitle formats use the right timestamps and speaker labels"""
+        entries = srh.build_transcript([('Priya ', '<speaker_A>: "[happy] Namaste!"'), None],
+                                       [(0, 66150), (66150, 70000)], 44100)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["text"], "Namaste!")
+        srt = srh.format_srt(entries)
+        self.assertIn("00:00:00,000 --> 00:00:01,500", srt)
+        self.assertIn("Priya: Namaste!", srt)
+        vtt = srh.format_vtt(entries)
+        self.assertTrue(vtt.startswith("WEBVTT"))
+        self.assertIn("00:00:00.000 --> 00:00:01.500", vtt)
+        self.assertIn("<v Priya>Namaste!", vtt)
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    def test_generate_audio_writes_transcripts(self):
+        """Test generate_audio writes timed transcripts next to the audio"""
+        import json
+        import tempfile
+        backend = srh.ToneTTSBackend(sample_rate=8000)
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "show.wav")
+            srh.generate_audio(["First line.", "Second line."], ("", "A", "B"),
+                               backend=backend, output_file=output, transcript=True)
+            for ext in ("srt", "vtt", "json"):
+                self.assertTrue(os.path.exists(os.path.join(tmp, "show." + ext)))
+            with open(os.path.join(tmp, "show.json"), encoding="utf-8") as fh:
+                data = json.load(fh)
+            info = srh.sf.info(output)
+        turns = data["turns"]
+        self.assertEqual([t["speaker"] for t in turns], ["Priya", "Kirti"])
+        self.assertEqual(turns[0]["end"], turns[1]["start"])
+        self.assertAlmostEqual(turns[-1]["end"], info.duration, places=2)
+
+
+class TestLiveRadio(unittest.TestCase):
+    """Test cases for the live streaming output mode"""
+    
+    def test_jitter_buffer_pull_exact_and_underrun(self):
+        """Test pull returns n samples and pads underruns with silence"""
+        buffer = srh.JitterBuffer(100)
+        buffer.push(np.ones(30))
+        buffer.push(np.ones(30) * 0.5)
+        out = buffer.pull(40)
+        self.assertEqual(len(out), 40)
+        self.assertTrue(np.all(out[:30] == 1.0))
+        self.assertTrue(np.all(out[30:] == 0.5))
+        out = buffer.pull(40)
+        self.assertTrue(np.all(out[:20] == 0.5))
+        self.assertTrue(np.all(out[20:] == 0.0))
+        self.assertEqual(buffer.underrun_samples, 20)
+    
+    def test_jitter_buffer_covers_long_gap_with_filler(self):
+        """Test a filler clip is queued once starvation exceeds the threshold"""
+        buffer = srh.JitterBuffer(100, fillers=[np.full(10, 0.25)], filler_after_seconds=0.5)
+        buffer.pull(60)
+        self.assertEqual(buffer.filler_plays, 1)
+        out = buffer.pull(10)
+        self.assertTrue(np.all(out == 0.25))
+    
+    def test_live_fillers_match_buffer_rate(self):
+        """Test filler clips cached at another rate are resampled to the buffer rate"""
+        library = srh.PhraseAudioLibrary()
+        slow = srh.ToneTTSBackend(sample_rate=8000)
+        cached = srh.prepare_live_fillers(slow, "A", library, phrases=["matlab"])
+        fast = srh.ToneTTSBackend(sample_rate=16000)
+        fast.name = slow.name
+        fast.synthesize = Mock(side_effect=AssertionError("cached filler re-synthesised"))
+        fillers = srh.prepare_live_fillers(fast, "A", library, phrases=["matlab"])
+        self.assertEqual(len(fillers[0]), 2 * len(cached[0]))
+    
+    def test_jitter_buffer_no_filler_after_close(self):
+        """Test no fillers are played once the show is complete"""
+        buffer = srh.JitterBuffer(100, fillers=[np.ones(10)], filler_after_seconds=0.1)
+        buffer.close()
+        buffer.pull(50)
+        self.assertEqual(buffer.filler_plays, 0)
+        self.assertTrue(buffer.drained())
+    
+    def test_wav_stream_header(self):
+        """Test the streaming WAV header describes 16 bit mono PCM"""
+        header = srh.wav_stream_header(22050)
+        self.assertEqual(len(header), 44)
+        self.assertEqual(header[:4], b"RIFF")
+        self.assertEqual(header[8:12], b"WAVE")
+        self.assertEqual(int.from_bytes(header[24:28], "little"), 22050)
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.build_show_corpus')
+    def test_run_live_show_pushes_audio_and_closes(self, mock_corpus):
+        """Test the live producer streams every line into the buffer"""
+        mock_corpus.return_value = ["First sentence.", "Second sentence."]
+        tts = srh.ToneTTSBackend(sample_rate=8000)
+        buffer = srh.JitterBuffer(tts.sample_rate)
+        
+        played = srh.run_live_show("Topic", buffer, ("", "A", "B"),
+                                   llm_backend=srh.FakeLLMBackend(), tts_backend=tts)
+        
+        self.assertEqual(played, 4)
+        self.assertTrue(buffer.closed)
+        self.assertGreater(buffer.buffered_seconds(), 0)
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.build_show_corpus')
+    def test_failed_line_keeps_speaker_turns(self, mock_corpus):
+        """Test a failed line does not shift the following lines to the wrong speaker"""
+        mock_corpus.return_value = ["First sentence.", "Second sentence."]
+        tts = srh.ToneTTSBackend(sample_rate=8000)
+        voices = []
+        stream = tts.stream
+        
+        def flaky(voice, text):
+            voices.append(voice)
+            if len(voices) == 1:
+                raise RuntimeError("tts down")
+            return stream(voice, text)
+        tts.stream = flaky
+        buffer = srh.JitterBuffer(tts.sample_rate)
+        played = srh.run_live_show("Topic", buffer, ("", "A", "B"),
+                                   llm_backend=srh.FakeLLMBackend(), tts_backend=tts)
+        self.assertEqual(played, 3)
+        self.assertEqual(voices, ["A", "B", "A", "B"])
+    
+    def test_live_server_binds_loopback_by_default(self):
+        """Test the live stream is not exposed to the network unless asked"""
+        server = srh.LiveRadioServer(srh.JitterBuffer(8000), port=0)
+        try:
+            self.assertEqual(server.httpd.server_address[0], "127.0.0.1")
+        finally:
+            server.httpd.server_close()
+    
+    def test_server_streams_chunked_wav(self):
+        """Test a listener receives the WAV header and the show audio"""
+        import urllib.request
+        buffer = srh.JitterBuffer(8000)
+        server = srh.LiveRadioServer(buffer, host="127.0.0.1", port=0,
+                                     block_seconds=0.01, prebuffer_seconds=0.0)
+        server.start()
+        try:
+            response = urllib.request.urlopen(f"http://127.0.0.1:{server.port}/stream.wav", timeout=5)
+            buffer.push(np.full(800, 0.5))
+            buffer.close()
+            data = response.read()
+            self.assertEqual(data[:4], b"RIFF")
+            self.assertGreater(len(data), 44)
+            self.assertTrue(server.finished.wait(5))
+        finally:
+            server.stop()
+
+
+class TestProgrammingScheduler(unittest.TestCase):
+    """Test cases for the continuous station scheduler"""
+    
+    def test_latency_tracker_ewma(self):
+        """Test the first observation seeds the average and later ones are smoothed"""
+        tracker = srh.LatencyTracker(alpha=0.5)
+        tracker.observe("llm", 2.0)
+        tracker.observe("llm", 4.0)
+        self.assertAlmostEqual(tracker.get("llm"), 3.0)
+        self.assertEqual(tracker.get("tts", 1.5), 1.5)
+    
+    def test_topic_feed_list_and_loop(self):
+        """Test topics are yielded in order and repeated when looping"""
+        self.assertEqual(list(srh.topic_feed(["A", "B"])), ["A", "B"])
+        feed = srh.topic_feed(["A", "B"], loop=True)
+        self.assertEqual([next(feed) for _ in range(5)], ["A", "B", "A", "B", "A"])
+    
+    def test_topic_feed_file_skips_comments(self):
+        """Test a playlist file is read one topic per line"""
+        import tempfile
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as fh:
+            fh.write("# morning\nIndia\n\nPython\n")
+        try:
+            self.assertEqual(list(srh.topic_feed(fh.name)), ["India", "Python"])
+        finally:
+            os.remove(fh.name)
+    
+    def test_needs_segment_adapts_to_latency(self):
+        """Test slower measured stages start the next segment earlier"""
+        buffer = srh.JitterBuffer(100)
+        buffer.push(np.zeros(100 * 60))
+        scheduler = srh.ProgrammingScheduler([], buffer, ("", "A", "B"),
+                                             llm_backend=srh.FakeLLMBackend(),
+                                             tts_backend=srh.ToneTTSBackend(),
+                                             low_watermark=30, safety=1.0)
+        self.assertFalse(scheduler.needs_segment())
+        scheduler.latency.observe("llm", 40.0)
+        self.assertTrue(scheduler.needs_segment())
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.build_show_corpus')
+    def test_scheduler_plays_feed_in_order(self, mock_corpus):
+        """Test every topic is voiced in order and the buffer closes at the end"""
+        mock_corpus.side_effect = lambda topic, **kw: [f"About {topic}."]
+        tts = srh.ToneTTSBackend(sample_rate=8000)
+        buffer = srh.JitterBuffer(tts.sample_rate)
+        scheduler = srh.ProgrammingScheduler(["A", "B"], buffer, ("", "A", "B"),
+                                             llm_backend=srh.FakeLLMBackend(), tts_backend=tts,
+                                             low_watermark=1000, poll_seconds=0.01)
+        scheduler.start().join(10)
+        
+        self.assertTrue(buffer.closed)
+        self.assertEqual(scheduler.segments_prepared, 2)
+        self.assertEqual(scheduler.lines_played, 4)
+        self.assertEqual([c[0][0] for c in mock_corpus.call_args_list], ["A", "B"])
+        self.assertIn("line_seconds", scheduler.status()["latency"])
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.build_show_corpus')
+    def test_scheduler_does_not_overgenerate(self, mock_corpus):
+        """Test no segment is prepared while the runway is above the watermark"""
+        mock_corpus.return_value = ["Sentence."]
+        buffer = srh.JitterBuffer(100)
+        buffer.push(np.zeros(100 * 600))
+        scheduler = srh.ProgrammingScheduler(["A"], buffer, ("", "A", "B"),
+                                             llm_backend=srh.FakeLLMBackend(),
+                                             tts_backend=srh.ToneTTSBackend(),
+                                             low_watermark=30, poll_seconds=0.01)
+        scheduler.start()
+        time.sleep(0.1)
+        scheduler.stop()
+        scheduler.join(5)
+        mock_corpus.assert_not_called()
+    
+    def test_runway_skips_voiced_lines_of_current_segment(self):
+        """Test lines already pushed from the segment being voiced are not counted twice"""
+        buffer = srh.JitterBuffer(100)
+        scheduler = srh.ProgrammingScheduler([], buffer, ("", "A", "B"),
+                                             llm_backend=srh.FakeLLMBackend(),
+                                             tts_backend=srh.ToneTTSBackend())
+        scheduler.latency.observe("line_seconds", 2.0)
+        scheduler.segments.append(("A", ["one", "two", "three"]))
+        self.assertAlmostEqual(scheduler.runway_seconds(), 6.0)
+        buffer.push(np.zeros(100 * 2))
+        scheduler.head_lines_done = 1
+        self.assertAlmostEqual(scheduler.runway_seconds(), 6.0)
+
+
+class TestRadioPipeline(unittest.TestCase):
+    """Test cases for the async RadioPipeline API"""
+    
+    def make_pipeline(self, **kwargs):
+        return srh.RadioPipeline(srh.PipelineConfig(
+            llm_backend=srh.FakeLLMBackend(), tts_backend=srh.ToneTTSBackend(sample_rate=8000),
+            **kwargs))
+    
+    @patch('SyntheticRadioHost.build_show_corpus')
+    def test_events_in_show_order(self, mock_corpus):
+        """Test events arrive in order and audio follows each line's text"""
+        import asyncio
+        mock_corpus.return_value = ["One.", "Two."]
+        pipeline = self.make_pipeline(llm_concurrency=2, tts_concurrency=3)
+        
+        async def collect():
+            return [e async for e in pipeline.events("Topic")]
+        events = asyncio.run(collect())
+        
+        kinds = [e["type"] for e in events]
+        self.assertEqual(kinds[0], "started")
+        self.assertEqual(kinds[-1], "finished")
+        audio = [e for e in events if e["type"] == "turn_audio"]
+        self.assertEqual([e["index"] for e in audio], [0, 1, 2, 3])
+        self.assertEqual([e["speaker"] for e in audio], ["Priya", "Kirti", "Priya", "Kirti"])
+    
+    @patch('SyntheticRadioHost.build_show_corpus')
+    def test_run_returns_show_and_notifies_subscribers(self, mock_corpus):
+        """Test run() assembles the audio and every event reaches subscribers"""
+        import asyncio
+        import tempfile
+        mock_corpus.return_value = ["One."]
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "show.wav")
+            pipeline = self.make_pipeline(output_file=output)
+            seen = []
+            pipeline.subscribe(lambda event: seen.append(event["type"]))
+            
+            async def async_subscriber(event):
+                seen.append("async")
+            pipeline.subscribe(async_subscriber)
+            
+            show = asyncio.run(pipeline.run("Topic"))
+            self.assertTrue(os.path.exists(output))
+        self.assertEqual(len(show["lines"]), 2)
+        self.assertEqual(show["sample_rate"], 8000)
+        self.assertGreater(len(show["audio"]), 0)
+        self.assertIn("saved", seen)
+        self.assertEqual(seen.count("async"), len(seen) - seen.count("async"))
+    
+    @patch('SyntheticRadioHost.build_show_corpus')
+    def test_empty_corpus_reports_error(self, mock_corpus):
+        """Test a failed fetch ends the run with an error event"""
+        import asyncio
+        mock_corpus.return_value = []
+        show = asyncio.run(self.make_pipeline().run("Topic"))
+        self.assertIsNone(show["audio"])
+        self.assertEqual(show["errors"][0]["stage"], "fetch")
+    
+    @patch('SyntheticRadioHost.build_show_corpus')
+    def test_many_pipelines_share_one_loop(self, mock_corpus):
+        """Test several pipelines run concurrently on one event loop"""
+        import asyncio
+        mock_corpus.side_effect = lambda topic, **kw: [f"About {topic}."]
+        
+        async def run_all():
+            return await asyncio.gather(*(self.make_pipeline().run(t) for t in ["A", "B", "C"]))
+        shows = asyncio.run(run_all())
+        self.assertEqual([s["topic"] for s in shows], ["A", "B", "C"])
+        self.assertTrue(all(s["audio"] is not None for s in shows))
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('builtins.print')
+    @patch('SyntheticRadioHost.fetch_article_from_wiki')
+    def test_fetch_progress_becomes_events(self, mock_fetch, mock_print):
+        """Test fetch/tokenize messages are events, not console output"""
+        import asyncio
+        
+        def fetch(topic, full_article=False, progress=None, resolved=False):
+            progress(f"Article on {topic} Fetched", False)
+            return "One. Two."
+        mock_fetch.side_effect = fetch
+        
+        async def collect():
+            return [e async for e in self.make_pipeline().events("Topic")]
+        events = asyncio.run(collect())
+        
+        progress = [(e["stage"], e["message"]) for e in events if e["type"] == "progress"]
+        self.assertIn(("fetch", "Article on Topic Fetched"), progress)
+        self.assertIn(("fetch", "Tokenization completed"), progress)
+        self.assertTrue(any(stage == "llm" for stage, _ in progress))
+        printed = " ".join(str(c[0][0]) for c in mock_print.call_args_list if c[0])
+        self.assertNotIn("Fetched", printed)
+        self.assertNotIn("Tokenization completed", printed)
+    
+    @patch('SyntheticRadioHost.build_show_corpus')
+    @patch('SyntheticRadioHost.generate_audio')
+    def test_cli_plain_show_runs_through_pipeline(self, mock_generate, mock_corpus):
+        """Test the single-topic CLI path uses RadioPipeline with the console subscriber"""
+        import tempfile
+        mock_corpus.return_value = ["One."]
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                with patch.object(sys, 'argv', ["srh", "--text", "India", "--llm-backend", "fake",
+                                                "--tts-backend", "tone"]), \
+                        patch.object(srh.RadioPipeline, 'subscribe', autospec=True,
+                                     side_effect=srh.RadioPipeline.subscribe) as mock_subscribe:
+                    srh.main()
+                self.assertTrue(os.path.exists(os.path.join(tmp, "GeneratedAudio.wav")))
+            finally:
+                os.chdir(cwd)
+        mock_generate.assert_not_called()
+        self.assertIs(mock_subscribe.call_args[0][1], srh.log_event_subscriber)
+    
+    def test_config_requires_tts_backend_or_key(self):
+        """Test a config without a TTS backend or API key fails up front"""
+        with self.assertRaises(ValueError):
+            srh.PipelineConfig(Keys=("", "A", "B"))
+        with self.assertRaises(ValueError):
+            srh.PipelineConfig()
+        with self.assertRaises(ValueError):
+            srh.PipelineConfig(Keys=("key", "A"))
+        self.assertEqual(srh.PipelineConfig(tts_backend=srh.ToneTTSBackend()).Keys, ("", "A", "B"))
+
+
+class TestProfiling(unittest.TestCase):
+    """Test cases for the run profiler"""
+    
+    def test_profile_stage_is_noop_without_profiler(self):
+        """Test stages cost nothing when no profiler is active"""
+        with srh.profile_stage("fetch"):
+            pass
+        self.assertIsNone(srh.active_profiler())
+    
+    def test_run_profiler_writes_reports(self):
+        """Test stage stats, function stats and collapsed stacks are written"""
+        import json
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            with srh.RunProfiler(tmp, sampler=srh.StackSampler(interval=0.001)):
+                with srh.profile_stage("llm"):
+                    [list(range(1000)) for _ in range(50)]
+                    time.sleep(0.02)
+                with srh.profile_stage("llm"):
+                    pass
+            self.assertIsNone(srh.active_profiler())
+            for name in ("profile.pstats", "functions.txt", "stages.json", "stacks.collapsed"):
+                self.assertTrue(os.path.exists(os.path.join(tmp, name)), name)
+            with open(os.path.join(tmp, "stages.json")) as fh:
+                stages = json.load(fh)
+            with open(os.path.join(tmp, "stacks.collapsed")) as fh:
+                stacks = fh.read().splitlines()
+        self.assertEqual(stages["llm"]["calls"], 2)
+        self.assertGreater(stages["llm"]["peak_kb"], 100)
+        self.assertGreaterEqual(stages["llm"]["seconds"], 0.02)
+        self.assertIn("total", stages)
+        self.assertTrue(stacks and stacks[0].rsplit(" ", 1)[1].isdigit())
+    
+    def test_profile_includes_worker_threads(self):
+        """Test functions run in pool threads appear in the merged profile"""
+        import pstats
+        import tempfile
+        
+        def pool_task_marker():
+            return sum(range(1000))
+        with tempfile.TemporaryDirectory() as tmp:
+            with srh.RunProfiler(tmp, trace_memory=False):
+                self.assertEqual(srh.map_concurrent(lambda _: pool_task_marker(), range(4), 2),
+                                 [499500] * 4)
+            stats = pstats.Stats(os.path.join(tmp, "profile.pstats"))
+        calls = sum(v[1] for k, v in stats.stats.items() if k[2] == "pool_task_marker")
+        self.assertEqual(calls, 4)
+    
+    def test_stages_of_other_runs_are_not_recorded(self):
+        """Test only stages of the profiled run (and its pool threads) are recorded"""
+        import tempfile
+        import threading
+        
+        def stage(name):
+            with srh.profile_stage(name):
+                pass
+        other = threading.Thread(target=stage, args=("other",))
+        with tempfile.TemporaryDirectory() as tmp, srh.RunProfiler(tmp, trace_memory=False) as profiler:
+            srh.map_concurrent(stage, ["tts", "tts"], 2)
+            other.start()
+            other.join(5)
+        self.assertEqual(profiler.stages["tts"]["calls"], 2)
+        self.assertNotIn("other", profiler.stages)
+    
+    def test_nested_stage_peak_propagates(self):
+        """Test an outer stage's peak includes allocations of inner stages"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp, srh.RunProfiler(tmp) as profiler, \
+                srh.profile_stage("outer"), srh.profile_stage("inner"):
+            block = bytearray(2 * 1024 * 1024)
+            del block
+        self.assertGreaterEqual(profiler.stages["outer"]["peak_kb"], profiler.stages["inner"]["peak_kb"])
+        self.assertGreater(profiler.stages["inner"]["peak_kb"], 2000)
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the Prometheus metrics registry"""
+    
+    def setUp(self):
+        srh.Metrics.reset()
+    
+    def test_counter_and_histogram_render(self):
+        """Test counters and histograms render in Prometheus text format"""
+        registry = srh.MetricsRegistry()
+        registry.describe("jobs_total", "counter", "Jobs")
+        registry.describe("job_seconds", "histogram", "Job time", (1, 5))
+        registry.inc("jobs_total", kind="a")
+        registry.inc("jobs_total", 2, kind="a")
+        registry.observe("job_seconds", 3.0)
+        text = registry.render()
+        self.assertIn("# TYPE jobs_total counter", text)
+        self.assertIn('jobs_total{kind="a"} 3', text)
+        self.assertIn('job_seconds_bucket{le="1"} 0', text)
+        self.assertIn('job_seconds_bucket{le="5"} 1', text)
+        self.assertIn('job_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn("job_seconds_sum 3.0", text)
+    
+    def test_llm_calls_are_counted(self):
+        """Test LLM requests and tokens are recorded per backend"""
+        backend = srh.FakeLLMBackend()
+        backend.invoke([{"role": "user", "content": "x" * 40}])
+        self.assertEqual(srh.Metrics.value("radio_llm_requests_total", backend="fake"), 1)
+        self.assertEqual(srh.Metrics.value("radio_llm_tokens_total", backend="fake", kind="prompt"), 10)
+        self.assertEqual(srh.Metrics.value("radio_request_seconds", kind="llm"), 1)
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.sf.write')
+    def test_generate_audio_records_tts_and_stages(self, mock_write):
+        """Test TTS requests, characters, audio seconds and stage times are recorded"""
+        backend = srh.ToneTTSBackend(sample_rate=8000)
+        srh.generate_audio(["Ek line.", "Doosri line."], ("", "A", "B"), backend=backend)
+        self.assertEqual(srh.Metrics.value("radio_tts_requests_total", backend="tone"), 2)
+        self.assertEqual(srh.Metrics.value("radio_tts_characters_total", backend="tone"),
+                         len("Priya Ek line.") + len("Kirti Doosri line."))
+        self.assertGreater(srh.Metrics.value("radio_audio_seconds_total"), 0)
+        self.assertEqual(srh.Metrics.value("radio_stage_seconds", stage="tts"), 1)
+        self.assertEqual(srh.Metrics.value("radio_stage_seconds", stage="write"), 1)
+    
+    def test_dedup_hits_are_counted(self):
+        """Test coalesced duplicates count as cache hits"""
+        flight = srh.SingleFlight("tts")
+        flight.do("k", lambda: 1)
+        flight.do("k", lambda: 1)
+        self.assertEqual(srh.Metrics.value("radio_cache_hits_total", cache="dedup_tts"), 1)
+    
+    def test_metrics_server_and_file_dump(self):
+        """Test metrics are served on /metrics and dumped to a file"""
+        import tempfile
+        import urllib.request
+        srh.Metrics.inc("radio_retries_total", stage="llm_repair")
+        server = srh.MetricsServer(port=0).start()
+        self.assertEqual(server.httpd.server_address[0], "127.0.0.1")
+        try:
+            body = urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5).read()
+        finally:
+            server.stop()
+        self.assertIn(b'radio_retries_total{stage="llm_repair"} 1', body)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "radio.prom")
+            stop = srh.Metrics.start_file_dump(path, interval=0.01)
+            time.sleep(0.05)
+            stop()
+            with open(path, encoding="utf-8") as fh:
+                self.assertIn("radio_retries_total", fh.read())
+
+    
+    def test_streamlit_metrics_server_starts_once(self):
+        """Test Streamlit reruns reuse one metrics server instead of binding the port again"""
+        import socket
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        srh._streamlit_metrics_server.clear()
+        with patch('SyntheticRadioHost.Metrics_Port', port):
+            server = srh.start_streamlit_metrics()
+            try:
+                self.assertEqual(server.port, port)
+                self.assertIs(srh.start_streamlit_metrics(), server)
+            finally:
+                server.stop()
+                srh._streamlit_metrics_server.clear()
+        with patch('SyntheticRadioHost.Metrics_Port', 0):
+            self.assertIsNone(srh.start_streamlit_metrics())
+
+class TestNetworkTape(unittest.TestCase):
+    """Test cases for recording and replaying network calls"""
+    
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.tape")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_llm_calls_replay_with_recorded_latency(self):
+        """Test LLM replies are replayed at original speed or as fast as possible"""
+        messages = [{"role": "user", "content": "India is a country."}]
+        with srh.NetworkTape(self.path, "record"):
+            recorded = srh.FakeLLMBackend(latency=0.05).invoke(messages)
+        offline = srh.FakeLLMBackend()
+        offline._generate = Mock(side_effect=AssertionError("network used during replay"))
+        for speed, slow in ((1.0, True), (0, False)):
+            with srh.NetworkTape(self.path, "replay", speed=speed):
+                t0 = time.perf_counter()
+                self.assertEqual(offline.invoke(messages), recorded)
+                elapsed = time.perf_counter() - t0
+            self.assertEqual(elapsed >= 0.05, slow)
+        self.assertIsNone(srh.active_tape())
+    
+    def test_tts_stream_and_wiki_replay_offline(self):
+        """Test TTS chunks and Wikipedia pages come back from the archive"""
+        pcm = (np.arange(100, dtype=np.int16) * 50).tobytes()
+        client = MagicMock()
+        client.text_to_speech.convert.return_value = iter([pcm[:60], pcm[60:]])
+        with patch('SyntheticRadioHost.stlit', False), \
+             patch('SyntheticRadioHost.wiki.page', return_value=Mock(summary="India is a country.")), \
+             srh.NetworkTape(self.path, "record") as tape:
+            audio = np.concatenate(list(srh.tts_stream(client, "A", "Namaste", "pcm_44100")))
+            srh.fetch_article_from_wiki("India")
+        self.assertEqual(tape.summary()["tts.convert"]["calls"], 1)
+        
+        client.text_to_speech.convert.side_effect = AssertionError("network used during replay")
+        with patch('SyntheticRadioHost.stlit', False), \
+             patch('SyntheticRadioHost.wiki.page', side_effect=AssertionError("network used")), \
+             srh.NetworkTape(self.path, "replay", speed=0):
+            replayed = list(srh.tts_stream(client, "A", "Namaste", "pcm_44100"))
+            article = srh.fetch_article_from_wiki("India")
+        np.testing.assert_array_equal(np.concatenate(replayed), audio)
+        self.assertEqual(article, "India is a country.")
+    
+    def test_unrecorded_request_and_errors(self):
+        """Test unknown requests raise LookupError and recorded failures replay as errors"""
+        backend = srh.FakeLLMBackend()
+        backend._generate = Mock(side_effect=ConnectionError("refused"))
+        with srh.NetworkTape(self.path, "record"), self.assertRaises(ConnectionError):
+            backend.invoke([{"role": "user", "content": "a"}])
+        with srh.NetworkTape(self.path, "replay", speed=0):
+            with self.assertRaises(ConnectionError):
+                backend.invoke([{"role": "user", "content": "a"}])
+            with self.assertRaises(LookupError):
+                backend.invoke([{"role": "user", "content": "b"}])
+    
+    def test_recorded_errors_replay_as_their_own_class(self):
+        """Test replayed failures keep their exception class so callers take the same branch"""
+        class Unknown(Exception):
+            pass
+        failures = {"disambiguation": srh.wiki.exceptions.DisambiguationError("Mercury", ["Mercury (planet)"]),
+                    "timeout": TimeoutError("slow"), "cancelled": srh.RunCancelled("interrupted"),
+                    "unknown": Unknown("odd")}
+        
+        def fail(ex):
+            raise ex
+        with srh.NetworkTape(self.path, "record"):
+            for name, ex in failures.items():
+                with self.assertRaises(type(ex)):
+                    srh.tape_call("wiki.page", {"topic": name}, lambda ex=ex: fail(ex))
+        with srh.NetworkTape(self.path, "replay", speed=0):
+            for name, ex in failures.items():
+                expected = RuntimeError if name == "unknown" else type(ex)
+                with self.assertRaises(expected) as ctx:
+                    srh.tape_call("wiki.page", {"topic": name}, lambda: None)
+                self.assertIs(type(ctx.exception), expected)
+        self.assertEqual(ctx.exception.args[0], "Unknown: odd")
+        with srh.NetworkTape(self.path, "replay", speed=0), \
+             self.assertRaises(srh.wiki.exceptions.DisambiguationError) as ctx:
+            srh.tape_call("wiki.page", {"topic": "disambiguation"}, lambda: None)
+        self.assertEqual(ctx.exception.options, ["Mercury (planet)"])
+    
+    def test_tape_records_only_its_own_run(self):
+        """Test pool threads of the run are recorded and other threads are not"""
+        import threading
+        backend = srh.FakeLLMBackend()
+        outsider = threading.Thread(target=backend.invoke, args=([{"role": "user", "content": "x"}],))
+        with srh.NetworkTape(self.path, "record") as tape:
+            backend.batch([[{"role": "user", "content": c}] for c in "abc"], max_concurrency=3)
+            outsider.start()
+            outsider.join(5)
+            recorded = [entry["request"]["messages"][0]["content"] for entry in tape.entries]
+        self.assertEqual(sorted(recorded), ["a", "b", "c"])
+
+
+class TestSpeakerCast(unittest.TestCase):
+    """Test cases for N speakers, voice pools and API key spreading"""
+    
+    def test_voice_pool_spreads_shows(self):
+        """Test concurrent shows get different voices from a role's pool"""
+        keys = ("", "pool_a1, pool_a2", "pool_b1")
+        first, second, third = (srh.show_cast(keys) for _ in range(3))
+        self.assertEqual([first[0][0], second[0][0], third[0][0]], ["pool_a1", "pool_a2", "pool_a1"])
+        self.assertEqual({c[1][0] for c in (first, second, third)}, {"pool_b1"})
+        self.assertEqual(first[1][1], "Kirti ")
+    
+    def test_cast_is_released_and_never_doubles_a_voice(self):
+        """Test overlapping pools give a show distinct voices and ended shows free theirs"""
+        keys = ("", "overlap_1,overlap_2", "overlap_1, overlap_2")
+        with srh.cast_of_show(keys) as cast:
+            self.assertEqual([voice for voice, _ in cast], ["overlap_1", "overlap_2"])
+            # an incidental lookup with the picked cast does not advance the pools
+            with srh.cast_of_show(keys, cast) as same:
+                self.assertIs(same, cast)
+            self.assertEqual(srh.voice_pool(keys[1]).assigned, {"overlap_1": 1, "overlap_2": 0})
+            self.assertEqual(srh.voice_pool(keys[2]).assigned, {"overlap_1": 0, "overlap_2": 1})
+        self.assertEqual(srh.voice_pool(keys[1]).assigned, {"overlap_1": 0, "overlap_2": 0})
+        self.assertEqual(srh.voice_pool(keys[2]).assigned, {"overlap_1": 0, "overlap_2": 0})
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.sf.write')
+    @patch('SyntheticRadioHost.Speaker_Names', ("Priya", "Kirti", "Arjun"))
+    def test_three_speakers_take_turns(self, mock_write):
+        """Test lines rotate over three speakers and their voices"""
+        backend = srh.ToneTTSBackend(sample_rate=8000)
+        backend.synthesize = Mock(side_effect=lambda voice, text: np.ones(10, dtype=np.float32))
+        srh.generate_audio(["Ek.", "Do.", "Teen.", "Char."], ("", "va", "vb", "vc"), backend=backend)
+        spoken = [c.args for c in backend.synthesize.call_args_list]
+        self.assertEqual(spoken, [("va", "Priya Ek."), ("vb", "Kirti Do."), ("vc", "Arjun Teen."),
+                                  ("va", "Priya Char.")])
+        self.assertIn("<speaker_C>", srh.Conversation_Prompt("v1"))
+        with self.assertRaises(ValueError):
+            srh.show_cast(("", "va", "vb"))
+    
+    @patch('SyntheticRadioHost.Speaker_Names', ("Priya", "Kirti", "Arjun"))
+    @patch.dict(os.environ, {"ELEVENLABS_API_KEY": "k", "ELEVENLABS_voice_id_A": "a",
+                             "ELEVENLABS_voice_id_B": "b", "ELEVENLABS_voice_id_C": "c"})
+    def test_env_keys_for_extra_speakers(self):
+        """Test voices of further speakers are read from the environment"""
+        self.assertEqual(srh.Get_Key_Env_varibles(), ("k", "a", "b", "c"))
+    
+    @patch('SyntheticRadioHost.tts_convert')
+    @patch('SyntheticRadioHost.ElevenLabs')
+    def test_requests_spread_over_api_keys(self, mock_elevenlabs, mock_convert):
+        """Test requests go to the least busy key and respect the per-key limit"""
+        mock_elevenlabs.side_effect = lambda api_key: Mock(name=api_key)
+        busiest = []
+        
+        def convert(client, voice, text, output_format):
+            busiest.append(max(backend.in_flight))
+            time.sleep(0.02)
+            return np.zeros(4, dtype=np.float32)
+        mock_convert.side_effect = convert
+        backend = srh.ElevenLabsTTSBackend("key1, key2", max_per_key=1)
+        self.assertEqual(len(backend.clients), 2)
+        srh.map_concurrent(lambda text: backend.synthesize("v", text), ["a", "b", "c", "d"], 4)
+        self.assertEqual(backend.requests, [2, 2])
+        self.assertEqual(max(busiest), 1)
+        self.assertEqual(backend.in_flight, [0, 0])
+
+
+class TestShowVariants(unittest.TestCase):
+    """Test cases for several show variants from one fetched article"""
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.fetch_article_from_wiki',
+           return_value="India is a country in South Asia. It has many languages.")
+    def test_variants_share_one_fetch(self, mock_fetch):
+        """Test one fetch feeds every variant and each gets its own prompt and file"""
+        import tempfile
+        llm = srh.FakeLLMBackend()
+        prompts = []
+        generate = llm._generate
+        llm._generate = lambda messages: prompts.append(messages[0]["content"]) or generate(messages)
+        with tempfile.TemporaryDirectory() as tmp:
+            report = srh.run_variants("India", ["hinglish", "english", "kids"], ("", "A", "B"), tmp,
+                                      show_kwargs={"max_sentences": 2}, llm_backend=llm,
+                                      backend=srh.ToneTTSBackend(sample_rate=8000))
+            files = sorted(os.listdir(tmp))
+        mock_fetch.assert_called_once()
+        self.assertEqual(report["variants"], {"hinglish": "ok", "english": "ok", "kids": "ok"})
+        self.assertEqual(len(prompts), 6)
+        self.assertEqual(set(prompts), {srh.Conversation_Prompt(), srh.Show_Variants["english"],
+                                        srh.Show_Variants["kids"]})
+        self.assertIn("India_english.wav", files)
+        self.assertIn("India_variants.json", files)
+        # the same lines are voiced once across variants (FakeLLM ignores the prompt)
+        self.assertGreater(report["tts"]["duplicates_saved"], 0)
+    
+    def test_unknown_variant(self):
+        """Test an unknown variant fails before anything is fetched"""
+        with patch('SyntheticRadioHost.fetch_article_from_wiki') as mock_fetch, \
+             self.assertRaises(ValueError):
+            srh.run_variants("India", ["klingon"], ("", "A", "B"), "unused")
+        mock_fetch.assert_not_called()
+
+
+class TestRunDeadline(unittest.TestCase):
+    """Test cases for timeouts, run deadlines and cooperative cancellation"""
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.LLM_Concurrency', 2)
+    def test_deadline_stops_queued_llm_work(self):
+        """Test work queued after the deadline fails fast and finished replies are kept"""
+        backend = srh.FakeLLMBackend()
+        generate = backend._generate
+        sentences = [f"Sentence number {i}." for i in range(20)]
+        
+        def expire_after_three(messages):
+            # the deadline passes during the third call; no wall-clock timing involved
+            if backend._generate.call_count >= 3:
+                run.deadline = time.monotonic() - 1
+            return generate(messages)
+        backend._generate = Mock(side_effect=expire_after_three)
+        with srh.RunDeadline(60) as run:
+            lines = srh.hinglish_converter(sentences, backend=backend)
+        # calls already running when the deadline passed finish; nothing queued starts
+        self.assertLessEqual(backend._generate.call_count, 3 + 1)
+        self.assertTrue(run.cancelled)
+        self.assertEqual(run.reason, "deadline passed")
+        self.assertTrue(0 < len(lines) < 2 * len(sentences))
+        self.assertIsNone(srh.active_deadline())
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.sf.write')
+    def test_cancel_flushes_partial_audio(self, mock_write):
+        """Test a cancelled show is still written with the lines done so far"""
+        backend = srh.ToneTTSBackend(sample_rate=8000)
+        spoken = []
+        
+        def synthesize(voice, text):
+            spoken.append(text)
+            if len(spoken) == 2:
+                srh.active_deadline().cancel("interrupted")
+            return np.ones(100, dtype=np.float32)
+        backend.synthesize = synthesize
+        with srh.RunDeadline():
+            srh.generate_audio(["Ek.", "Do.", "Teen.", "Char."], ("", "A", "B"), backend=backend)
+        self.assertEqual(len(spoken), 2)
+        self.assertEqual(len(mock_write.call_args[0][1]), 200)
+    
+    def test_call_timeouts(self):
+        """Test per-call timeouts are cut to the deadline and hung calls are abandoned"""
+        self.assertEqual(srh.call_timeout(30), 30)
+        with srh.RunDeadline(5):
+            self.assertLessEqual(srh.call_timeout(30), 5)
+            self.assertEqual(srh.call_timeout(2), 2)
+        with self.assertRaises(TimeoutError):
+            srh.call_with_timeout(lambda: time.sleep(1), 0.05)
+        self.assertEqual(srh.call_with_timeout(lambda: 7, 1), 7)
+        with self.assertRaises(KeyError), srh.RunDeadline() as run:
+            raise KeyError("rerun")
+        self.assertTrue(run.cancelled)
+        with self.assertRaises(srh.RunCancelled):
+            run.check()
+    
+    def test_cancel_releases_blocked_call(self):
+        """Test a call blocked without a timeout gives up as soon as its run is cancelled"""
+        import threading
+        release = threading.Event()
+        with srh.RunDeadline() as run:
+            threading.Timer(0.05, run.cancel, args=("interrupted",)).start()
+            with self.assertRaises(srh.RunCancelled) as ctx:
+                srh.call_with_timeout(lambda: release.wait(10), 0)
+        release.set()
+        self.assertEqual(str(ctx.exception), "interrupted")
+    
+    def test_deadline_is_per_run_not_per_process(self):
+        """Test concurrent runs (e.g. Streamlit sessions) keep separate deadlines"""
+        import threading
+        seen = {}
+        cancelled = threading.Event()
+        
+        def session(name, cancel):
+            with srh.RunDeadline() as run:
+                if cancel:
+                    run.cancel("stopped")
+                    cancelled.set()
+                else:
+                    cancelled.wait(5)
+                # pool workers see the deadline of the run that queued them
+                seen[name] = srh.map_concurrent(lambda _: (srh.active_deadline() is run,
+                                                           srh.run_cancelled()), range(2), 2)
+        threads = [threading.Thread(target=session, args=(name, name == "a")) for name in "ab"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertIsInstance(seen["a"][0], srh.RunCancelled)
+        self.assertEqual(seen["b"], [(True, False), (True, False)])
+        self.assertIsNone(srh.active_deadline())
+
+
+class TestTitleIndex(unittest.TestCase):
+    """Test cases for the offline Wikipedia title index"""
+    
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        titles = os.path.join(self.tmp.name, "titles.txt")
+        with open(titles, "w", encoding="utf-8") as fh:
+            fh.write("page_title\nIndia\nIndian_Ocean\nIndia_Gate\nIndia_(disambiguation)\n"
+                     "Albert_Einstein\nMercury\nMercury_(planet)\nMercury_(element)\n")
+        redirects = os.path.join(self.tmp.name, "redirects.tsv")
+        with open(redirects, "w", encoding="utf-8") as fh:
+            fh.write("Bharat\tIndia\nEinstein\tAlbert_Einstein\n")
+        disambiguations = os.path.join(self.tmp.name, "disambiguations.txt")
+        with open(disambiguations, "w", encoding="utf-8") as fh:
+            fh.write("Mercury\nIndia_(disambiguation)\n")
+        self.path = os.path.join(self.tmp.name, "titles.idx")
+        srh.TitleIndex.build(titles, redirects, disambiguations).save(self.path)
+        self.index = srh.TitleIndex.load(self.path)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_prefix_fuzzy_and_resolve(self):
+        """Test autocomplete, misspellings, redirects and disambiguation pages"""
+        self.assertEqual(self.index.prefix("ind", 3), ["India", "India Gate", "Indian Ocean"])
+        self.assertEqual(self.index.fuzzy("albert einstien"), ["Albert Einstein"])
+        self.assertEqual(self.index.fuzzy("Elbert Einstein"), ["Albert Einstein"])
+        # a "(disambiguation)" sibling does not make the primary topic ambiguous
+        self.assertEqual(self.index.resolve("  india "), {"title": "India", "match": "exact", "suggestions": []})
+        self.assertEqual(self.index.resolve("bharat"), {"title": "India", "match": "redirect", "suggestions": []})
+        ambiguous = self.index.resolve("mercury")
+        self.assertEqual(ambiguous["match"], "ambiguous")
+        self.assertEqual(sorted(ambiguous["suggestions"]), ["Mercury (element)", "Mercury (planet)"])
+        missing = self.index.resolve("Albert Einstien")
+        self.assertEqual((missing["title"], missing["suggestions"]), (None, ["Albert Einstein"]))
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.wiki.page')
+    def test_topics_resolved_before_network(self, mock_page):
+        """Test fetches use canonical titles and bad topics never reach wiki.page"""
+        mock_page.return_value = Mock(summary="Einstein was a physicist.")
+        with patch('SyntheticRadioHost.Title_Index_Path', self.path):
+            self.assertEqual(srh.fetch_article_from_wiki("einstein"), "Einstein was a physicist.")
+            mock_page.assert_called_once_with("Albert Einstein", auto_suggest=False)
+            self.assertIsNone(srh.fetch_article_from_wiki("Mercury"))
+            self.assertIsNone(srh.fetch_article_from_wiki("Xyzzy plugh"))
+            report = srh.run_batch(["Mercury"], ("", "A", "B"), self.tmp.name,
+                                   llm_backend=srh.FakeLLMBackend())
+        self.assertEqual(mock_page.call_count, 1)
+        self.assertEqual(report["topics"], {"Mercury": "rejected: ambiguous"})
+    
+    def test_case_distinct_titles_are_kept(self):
+        """Test titles differing only in case keep their own spelling"""
+        index = srh.TitleIndex(["US", "Us", "India"])
+        self.assertEqual(index.resolve("US")["title"], "US")
+        self.assertEqual(index.resolve("us")["title"], "Us")
+        self.assertEqual(index.resolve("Us")["title"], "Us")
+        index.save(self.path)
+        self.assertEqual(srh.TitleIndex.load(self.path).resolve("US")["title"], "US")
+    
+    @patch('SyntheticRadioHost.stlit', True)
+    @patch('SyntheticRadioHost._title_index', None)
+    def test_streamlit_reruns_reuse_loaded_index(self):
+        """Test the Streamlit path loads the pickle once across reruns"""
+        srh._streamlit_title_index.clear()
+        with patch.object(srh.TitleIndex, 'load', wraps=srh.TitleIndex.load) as mock_load:
+            first = srh.get_title_index(self.path)
+            srh._title_index = None   # a rerun starts with a fresh module
+            self.assertIs(srh.get_title_index(self.path), first)
+        self.assertEqual(mock_load.call_count, 1)
+        srh._streamlit_title_index.clear()
+    
+    @patch('SyntheticRadioHost.stlit', False)
+    @patch('SyntheticRadioHost.build_show_corpus', return_value=[])
+    def test_batch_resolves_each_topic_once(self, mock_corpus):
+        """Test run_batch passes the canonical title down instead of resolving again"""
+        with patch('SyntheticRadioHost.Title_Index_Path', self.path), \
+                patch.object(srh.TitleIndex, 'resolve', autospec=True,
+                             side_effect=srh.TitleIndex.resolve) as mock_resolve:
+            report = srh.run_batch(["einstein"], ("", "A", "B"), self.tmp.name,
+                                   llm_backend=srh.FakeLLMBackend())
+        self.assertEqual(mock_resolve.call_count, 1)
+        self.assertEqual(mock_corpus.call_args[0][0], "Albert Einstein")
+        self.assertTrue(mock_corpus.call_args[1]["resolved"])
+        self.assertEqual(report["topics"], {"einstein": "fetch failed"})
+
+
 class TestIntegrationScenarios(unittest.TestCase):
     """Integration test cases for complete workflows"""
     